@@ -37,6 +37,11 @@ def create_app() -> Flask:
         template_folder=os.getenv("FLASK_TEMPLATES_FOLDER", "templates"),
     )
 
+    # Uploads: escritura a disco por bloques con sha256 y límite (app/services/ingest.py)
+    from app.services.ingest import IngestRequest, discard_request_uploads
+    app.request_class = IngestRequest
+    app.teardown_request(discard_request_uploads)
+
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret")
 
     # IMPORTANTÍSIMO: .strip() para matar el '\n' fantasma
@@ -77,6 +82,8 @@ def create_app() -> Flask:
     from app import models  # noqa: F401
     from app import models_auth  # noqa: F401
     from app import models_payment  # noqa: F401
+    from app import models_cache  # noqa: F401
+    from app import models_balance  # noqa: F401
     try:
         from app import models_user  # noqa: F401
     except Exception:
@@ -105,8 +112,18 @@ def create_app() -> Flask:
     from app.routes.pricing_page import bp as pricing_page_bp
     app.register_blueprint(pricing_page_bp)
 
+    # CLI: flask credits-reconcile
+    from app.services.credits import reconcile_command
+    app.cli.add_command(reconcile_command)
+
     @app.get("/healthz")
     def healthz():
         return {"ok": True}
 
+    @app.get("/healthz/cache")
+    def healthz_cache():
+        # Aciertos/fallos de la caché de resúmenes y traducciones (por proceso)
+        from app.services import llm_cache
+        return {"ok": True, "llm_cache": llm_cache.stats()}
+
     return app
@@ -1,19 +1,20 @@
 # app/celery_app.py
 # -*- coding: utf-8 -*-
 import os
-import io
 import json
-import time
+import random
+import shutil
 import logging
 from datetime import datetime
+from typing import Optional
 
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
-from celery import Celery
-from dotenv import load_dotenv
+from celery import Celery, Task, chain, chord, group
 
-from app.database import SessionLocal
-from app.models import AudioJob, UsageLedger
+from app.extensions import db as _db
+from app.models import AudioJob
+from app.services import langid, provider, s3_download, timings, transcript_cache
 
 # -----------------------------------------------------------------------------
 # Logging
@@ -37,42 +38,88 @@ else:
     logger.info("[celery] BROKER=%s BACKEND=%s", _broker, _backend)
 
 # -----------------------------------------------------------------------------
-# OpenAI: creación perezosa del cliente
+# Pipeline por etapas (ver "Pipeline por etapas" más abajo)
+#   CELERY_PIPELINE   staged | single (default staged; single = una tarea monolítica)
+#   CELERY_CPU_QUEUE  cola de ffmpeg: descarga, segmentación, unión, exportes
+#   CELERY_IO_QUEUE   cola de llamadas a APIs: ASR por parte y resumen
+# Sin CELERY_CPU_QUEUE / CELERY_IO_QUEUE las etapas van a task_default_queue
+# ("celery"): un worker existente con "-Q celery" (o sin -Q) las consume igual.
 # -----------------------------------------------------------------------------
-_openai_client = None
+CELERY_PIPELINE = (os.getenv("CELERY_PIPELINE", "staged") or "staged").strip().lower()
+CELERY_CPU_QUEUE = (os.getenv("CELERY_CPU_QUEUE") or "").strip()
+CELERY_IO_QUEUE = (os.getenv("CELERY_IO_QUEUE") or "").strip()
+
+_stage_queues = {
+    "pipeline.prepare": CELERY_CPU_QUEUE,
+    "pipeline.transcribe_part": CELERY_IO_QUEUE,
+    "pipeline.merge": CELERY_CPU_QUEUE,
+    "pipeline.summarize": CELERY_IO_QUEUE,
+    "pipeline.finalize": CELERY_CPU_QUEUE,
+}
+celery_app.conf.task_routes = {name: {"queue": q} for name, q in _stage_queues.items() if q}
 
+# -----------------------------------------------------------------------------
+# OpenAI: cliente compartido del proceso (pool HTTP, ver app/services/openai_client.py)
+# -----------------------------------------------------------------------------
 def _get_openai():
     """
-    Crea el cliente OpenAI cuando realmente se necesita (evita fallos por
-    cargar .env después del import).
+    Devuelve el cliente OpenAI compartido; se crea cuando realmente se
+    necesita (evita fallos por cargar .env después del import).
     """
-    global _openai_client
-    if _openai_client is not None:
-        return _openai_client
+    from app.services.openai_client import get_client
 
-    # Intenta cargar .env si aún no se cargó
-    if not os.getenv("OPENAI_API_KEY"):
-        load_dotenv(override=False)
-
-    from openai import OpenAI
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    client = get_client()
+    if client is None:
         raise RuntimeError("OPENAI_API_KEY no está configurado.")
+    return client
+
+
+# -----------------------------------------------------------------------------
+# Flask app (el worker usa los mismos modelos / db que la web)
+# -----------------------------------------------------------------------------
+_flask_app = None
+
+def _get_flask_app():
+    """
+    En modo EAGER la tarea corre dentro del request y reutiliza current_app;
+    en un worker real creamos la app una sola vez por proceso.
+    """
+    global _flask_app
+    from flask import current_app, has_app_context
 
-    _openai_client = OpenAI(api_key=api_key)
-    return _openai_client
+    if has_app_context():
+        return current_app._get_current_object()
+    if _flask_app is None:
+        from app import create_app
+        _flask_app = create_app()
+    return _flask_app
 
 
 # -----------------------------------------------------------------------------
 # Utilidades DB
 # -----------------------------------------------------------------------------
-def _db_get_job(db, job_id: int):
+def _db_get_job(db, job_id: str):
     return db.get(AudioJob, job_id)
 
-def _job_set_status(db, job: AudioJob, status: str, error: str | None = None):
+def _job_set_status(
+    db,
+    job: AudioJob,
+    status: str,
+    error: str | None = None,
+    progress: int | None = None,
+):
+    from app.services import credits
+
+    # done/error: transición condicional + saldo (misma transacción); si otro
+    # proceso ya cerró el job, no se pisa su estado
+    if status in credits.FINAL_STATUSES and not credits.settle_job(job, status):
+        db.rollback()
+        return
     job.status = status
     if error:
-        job.error = error
+        job.error_message = error
+    if progress is not None:
+        job.progress = max(0, min(100, int(progress)))
     job.updated_at = datetime.utcnow()
     db.add(job)
     db.commit()
@@ -83,25 +130,13 @@ def _save_transcript_and_summary(
     job: AudioJob,
     transcript: str,
     language: str,
-    summary_text: str | None
+    summary_text: str | None,
+    segments: bytes | None = None,
 ):
     job.transcript = transcript
-    job.language = (language or "es").lower()
-
-    # summaries: dict {"es": "...", "pt": "..."}
-    summaries_dict = {}
-    if isinstance(job.summaries, dict):
-        summaries_dict = dict(job.summaries)
-    elif isinstance(job.summaries, str) and job.summaries.strip():
-        try:
-            summaries_dict = json.loads(job.summaries)
-        except Exception:
-            summaries_dict = {}
-
-    if summary_text:
-        summaries_dict[job.language] = summary_text
-
-    job.summaries = summaries_dict
+    job.language_detected = (language or "es").lower()
+    job.summary = summary_text or ""
+    job.segments = segments
     job.updated_at = datetime.utcnow()
     db.add(job)
     db.commit()
@@ -112,28 +147,12 @@ def _save_transcript_and_summary(
 # S3 helpers
 # -----------------------------------------------------------------------------
 def _s3_client():
-    return boto3.client("s3", region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
-
-def _s3_read_all(bucket: str, key: str, max_retries: int = 3) -> bytes:
-    """
-    Descarga el objeto S3 completo a memoria con reintentos por si hay
-    errores de streaming (ResponseStreamingError / IncompleteRead).
-    """
-    client = _s3_client()
-    last_exc = None
-    for attempt in range(1, max_retries + 1):
-        try:
-            obj = client.get_object(Bucket=bucket, Key=key)
-            # Nota: Body es botocore.response.StreamingBody
-            data = obj["Body"].read()
-            if not data or len(data) < 16:
-                raise IOError("Archivo vacío o dañado (bytes insuficientes).")
-            return data
-        except Exception as e:
-            last_exc = e
-            logger.warning("S3 read failed (attempt %d/%d): %s", attempt, max_retries, e)
-            time.sleep(0.6 * attempt)
-    raise last_exc or RuntimeError("Fallo desconocido leyendo S3")
+    # S3_ENDPOINT_URL: S3 compatible / local (MinIO, moto server) para desarrollo y pruebas
+    return boto3.client(
+        "s3",
+        region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
+        endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+    )
 
 
 # -----------------------------------------------------------------------------
@@ -190,13 +209,14 @@ def _normalize_lang(lang: str | None) -> str:
 
 # -----------------------------------------------------------------------------
 # Detección de idioma (con OpenAI, salida ISO-639-1)
+# Sólo como último recurso de langid.resolve (texto ambiguo y Whisper sin idioma)
 # -----------------------------------------------------------------------------
 def _detect_language_with_openai(text: str) -> str:
     """
     Devuelve un código ISO-639-1 en minúsculas. Si falla, 'es'.
     """
     try:
-        client = _get_openai()
+        _get_openai()
         # Modelo ligero y barato
         model = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
         prompt = (
@@ -204,7 +224,7 @@ def _detect_language_with_openai(text: str) -> str:
             "Responde únicamente con el código ISO-639-1 (2 letras), en minúsculas. "
             "Si dudas entre varios, elige el más probable. Texto:\n\n" + text[:4000]
         )
-        resp = client.chat.completions.create(
+        resp = provider.chat(
             model=model,
             messages=[
                 {"role": "system", "content": "Eres un detector de idioma. Respondes solo el código ISO-639-1."},
@@ -225,34 +245,70 @@ def _detect_language_with_openai(text: str) -> str:
 # -----------------------------------------------------------------------------
 # Resumen en el mismo idioma que la transcripción
 # -----------------------------------------------------------------------------
-def _summarize_in_language(transcript: str, lang_code: str) -> str:
+# Subir si cambian los prompts de _summarize_in_language (invalida llm_cache)
+_SUMMARY_PROMPT_VERSION = "1"
+
+
+def _summarize_in_language(transcript: str, lang_code: str, offline: bool = False) -> str:
     """
     Crea un resumen breve (5-8 líneas) en el idioma indicado por lang_code.
+    Transcripciones largas: por partes en paralelo y luego combinadas (long_summary).
+    Mismo transcript + idioma + modelo => desde llm_cache, sin llamar al LLM.
+    offline=True o si el LLM falla: resumen extractivo local (app/services/extractive.py).
     """
+    from app.services import extractive, llm_cache, long_summary, repetition
+
+    # Bucles de Whisper y frases casi duplicadas fuera antes de contar tokens
+    transcript = repetition.remove_repetitions(transcript)[0]
+    if offline:
+        return extractive.summarize(transcript, 5)
     try:
-        client = _get_openai()
+        _get_openai()
         model = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
         idioma_nombre = LANG_NAME.get(lang_code, "español")
         system = (
             f"Eres un asistente que resume textos en {idioma_nombre}. "
             f"Debes mantener el idioma {idioma_nombre} siempre."
         )
-        user = (
-            f"Resume claramente el siguiente texto en {idioma_nombre}. "
-            f"Extensión objetivo: 5–8 líneas.\n\n{transcript}"
+        instructions = {
+            long_summary.SINGLE: (
+                f"Resume claramente el siguiente texto en {idioma_nombre}. "
+                f"Extensión objetivo: 5–8 líneas."
+            ),
+            long_summary.MAP: (
+                f"El siguiente texto es una parte de una transcripción más larga. "
+                f"Resume sus puntos clave en {idioma_nombre} en 3–6 líneas."
+            ),
+            long_summary.REDUCE: (
+                f"Estos son resúmenes parciales, en orden, de una misma transcripción. "
+                f"Combínalos en un único resumen claro en {idioma_nombre}. "
+                f"Extensión objetivo: 5–8 líneas."
+            ),
+        }
+
+        def _call(text: str, stage: str) -> str:
+            resp = provider.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": f"{instructions[stage]}\n\n{text}"},
+                ],
+                temperature=0.2,
+            )
+            return (resp.choices[0].message.content or "").strip()
+
+        return llm_cache.cached(
+            "summary:celery",
+            transcript,
+            lang_code,
+            model,
+            _SUMMARY_PROMPT_VERSION,
+            0.2,
+            lambda: long_summary.summarize_long(transcript, _call),
         )
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=0.2,
-        )
-        return (resp.choices[0].message.content or "").strip()
     except Exception as e:
-        logger.warning("Fallo creando resumen: %s", e)
-        return ""
+        logger.warning("Fallo creando resumen, se usa el extractivo: %s", e)
+        return extractive.summarize(transcript, 5)
 
 
 # -----------------------------------------------------------------------------
@@ -271,33 +327,68 @@ def _estimate_seconds_from_transcript(transcript: str) -> int:
     return max(secs, 1)
 
 
-def _add_usage_seconds(db, user_id: int, seconds: int):
+def _ensure_billable_seconds(db, job: AudioJob, transcript: str):
     """
-    Suma 'seconds' al ledger del mes actual para 'user_id'.
+    El saldo se calcula sumando duration_seconds de los jobs 'done'.
+    POST /jobs ya guarda la duración medida con ffprobe; si el job llegó
+    sin ella (p.ej. encolado desde otro cliente), usamos la estimación.
     """
-    from sqlalchemy import select
-    month_key = datetime.utcnow().strftime("%Y-%m")
-    row = db.execute(
-        select(UsageLedger).where(
-            UsageLedger.user_id == user_id,
-            UsageLedger.month_key == month_key,
-        )
-    ).scalar_one_or_none()
+    if job.duration_seconds:
+        return
+    job.duration_seconds = _estimate_seconds_from_transcript(transcript)
+    db.add(job)
+    db.commit()
 
-    if row is None:
-        row = UsageLedger(user_id=user_id, month_key=month_key, seconds=0)
 
-    row.seconds = int(row.seconds or 0) + int(seconds)
-    row.updated_at = datetime.utcnow()
-    db.add(row)
-    db.commit()
+# -----------------------------------------------------------------------------
+# Encolado: pipeline por etapas o tarea única
+# -----------------------------------------------------------------------------
+def _chords_supported() -> bool:
+    """El chord del ASR necesita un result backend que lo soporte (redis, db...); rpc/ninguno no."""
+    if celery_app.conf.task_always_eager:
+        return True
+    try:
+        celery_app.backend.ensure_chords_allowed()
+    except NotImplementedError:
+        return False
+    return True
+
+
+def enqueue_job(job_id: str, content_sha256: Optional[str] = None) -> None:
+    """
+    Encola el procesamiento de un AudioJob con audio_s3_key. Por etapas si
+    CELERY_PIPELINE=staged y el backend soporta chords; si no, la tarea única.
+    content_sha256 (si el upload pasó por Flask) es la clave de la caché de
+    transcripciones; sin él el worker lo calcula sobre el audio descargado.
+    """
+    if CELERY_PIPELINE == "staged" and _chords_supported():
+        stage_prepare.delay(job_id=job_id, content_sha256=content_sha256)
+    else:
+        transcribe_and_summarize.delay(job_id, content_sha256=content_sha256)
+
+
+def _store_in_cache(job: AudioJob, content_sha256: Optional[str]) -> None:
+    """Job terminado => caché de transcripciones, como JOBS_MODE=sync/thread."""
+    if not content_sha256 or not job.transcript:
+        return
+    language = job.language or "auto"
+    transcript_cache.store(
+        transcript_cache.cache_key(content_sha256, language),
+        content_sha256,
+        language,
+        job.transcript,
+        job.language_detected,
+        job.summary,
+        job.duration_seconds,
+        segments=job.segments,
+    )
 
 
 # -----------------------------------------------------------------------------
-# Tarea principal
+# Tarea única (CELERY_PIPELINE=single o backend sin chords)
 # -----------------------------------------------------------------------------
 @celery_app.task(name="transcribe_and_summarize", bind=True, max_retries=0)
-def transcribe_and_summarize(self, job_id: int):
+def transcribe_and_summarize(self, job_id: str, content_sha256: Optional[str] = None):
     """
     1) Leer job de DB.
     2) Descargar audio de S3.
@@ -305,72 +396,339 @@ def transcribe_and_summarize(self, job_id: int):
     4) Determinar idioma (si usuario eligió auto).
     5) Resumir en ese mismo idioma.
     6) Guardar transcript + summary + language + status=done.
-    7) Registrar consumo estimado.
+    7) Asegurar duración facturable.
+    8) Guardar en la caché de transcripciones (content_sha256).
     """
-    db = SessionLocal()
+    with _get_flask_app().app_context():
+        _transcribe_and_summarize(job_id, content_sha256)
+
+
+def _transcribe_and_summarize(job_id: str, content_sha256: Optional[str] = None):
+    db = _db.session
+    audio_path = None
     try:
         job = _db_get_job(db, job_id)
         if not job:
             logger.error("Job %s no existe", job_id)
             return
 
-        _job_set_status(db, job, "processing")
+        _job_set_status(db, job, "processing", progress=5)
 
         bucket = os.getenv("S3_BUCKET")
         if not bucket:
             raise RuntimeError("S3_BUCKET no está configurado.")
 
-        # 1) Descargar bytes del audio
-        data = _s3_read_all(bucket, job.audio_s3_key)
+        # 1) Descargar el audio a un temporal (GETs por rango en paralelo, memoria constante)
+        filename = job.filename or "audio.webm"
+        audio_path = s3_download.download(
+            _s3_client(), bucket, job.audio_s3_key, suffix=os.path.splitext(filename)[1]
+        )
+        if os.path.getsize(audio_path) < 16:
+            raise IOError("Archivo vacío o dañado (bytes insuficientes).")
+        content_sha256 = content_sha256 or transcript_cache.file_sha256(audio_path)
+        _job_set_status(db, job, "processing", progress=15)
 
         # 2) Transcribir (OpenAI)
-        client = _get_openai()
+        _get_openai()
         model_asr = os.getenv("TRANSCRIBE_MODEL", "whisper-1")
         lang_hint = job.language if (job.language and job.language != "auto") else None
 
-        # openai>=1.0 — archivo como file-like con nombre
-        memfile = io.BytesIO(data)
-        # Añadimos nombre para que la lib detecte el tipo (no es obligatorio pero ayuda)
-        filename = job.filename or "audio.webm"
-        # openai python SDK espera 'file' tipo archivo
-        memfile.name = filename
-
-        asr = client.audio.transcriptions.create(
+        # (nombre, archivo): el nombre original ayuda a detectar el tipo;
+        # el SDK lee el archivo desde disco, sin copia completa en memoria
+        asr = provider.transcribe(
+            audio_path,
+            filename,
             model=model_asr,
-            file=memfile,
-            language=lang_hint  # si el usuario eligió un idioma específico
+            language=lang_hint,  # si el usuario eligió un idioma específico
+            response_format="verbose_json",  # incluye tiempos por segmento (SRT/VTT)
         )
         transcript = (asr.text or "").strip()
+        segments = timings.segments_from_response(asr)
         if not transcript:
             raise RuntimeError("Transcripción vacía.")
+        _job_set_status(db, job, "processing", progress=70)
 
-        # 3) Determinar idioma final
+        # 3) Determinar idioma final: modelo local + idioma de Whisper; LLM sólo si ambos dudan
         if job.language and job.language != "auto":
             final_lang = _normalize_lang(job.language)
         else:
-            final_lang = _detect_language_with_openai(transcript)
+            final_lang = _normalize_lang(
+                langid.resolve(
+                    transcript,
+                    hint=getattr(asr, "language", None),
+                    fallback=_detect_language_with_openai,
+                )
+            )
 
         # 4) Resumen en el mismo idioma
-        summary = _summarize_in_language(transcript, final_lang)
+        from app.services import extractive
+
+        summary = _summarize_in_language(
+            transcript, final_lang, offline=extractive.is_offline_user(job.user_id)
+        )
+        _job_set_status(db, job, "processing", progress=90)
 
         # 5) Guardar en DB
-        _save_transcript_and_summary(db, job, transcript, final_lang, summary)
-        _job_set_status(db, job, "done")
+        _save_transcript_and_summary(
+            db, job, transcript, final_lang, summary,
+            segments=timings.pack_segments(segments) if segments else None,
+        )
+        _ensure_billable_seconds(db, job, transcript)
+        _job_set_status(db, job, "done", progress=100)
+        _store_in_cache(job, content_sha256)
 
-        # 6) Registrar consumo estimado
-        seconds = _estimate_seconds_from_transcript(transcript)
-        try:
-            _add_usage_seconds(db, job.user_id or 1, seconds)
-        except Exception as e:
-            logger.warning("No se pudo actualizar usage ledger: %s", e)
+        # Formatos de EXPORT_PRERENDER listos para la primera descarga
+        from app.services import export_store
+
+        export_store.prerender(job_id)
 
     except Exception as e:
         logger.exception("Error en transcribe_and_summarize: %s", e)
         try:
+            db.rollback()
             job = _db_get_job(db, job_id)
             if job:
-                _job_set_status(db, job, "error", error=str(e))
+                _job_set_status(db, job, "error", error=str(e), progress=100)
         except Exception as e2:
             logger.error("No se pudo marcar error en DB: %s", e2)
     finally:
-        db.close()
+        if audio_path:
+            try:
+                os.remove(audio_path)
+            except OSError:
+                pass
+
+
+# -----------------------------------------------------------------------------
+# Pipeline por etapas
+# -----------------------------------------------------------------------------
+# prepare (cpu) --> chord[ transcribe_part x N (io) ] --> merge (cpu) --> summarize (io) --> finalize (cpu)
+#
+#   prepare:         baja el audio, lo parte con ffmpeg (mismo _prepare_for_openai
+#                    que JOBS_MODE=thread) y sube las partes a S3 (work/<job>/...)
+#   transcribe_part: una llamada ASR por parte, con reintentos propios
+#   merge:           une textos y tiempos, decide el idioma y borra las partes
+#   summarize:       resumen en el idioma detectado
+#   finalize:        duración facturable, status=done (cobra) y exportes
+#
+# Con CELERY_CPU_QUEUE=cpu y CELERY_IO_QUEUE=io cada cola se dimensiona por separado, p.ej.:
+#   celery -A app.celery_app worker -Q cpu -c <núcleos> --prefetch-multiplier=1
+#   celery -A app.celery_app worker -Q io -P threads -c 32 --prefetch-multiplier=4
+# Las partes de un job largo se intercalan en la cola io con las de los cortos
+# en vez de bloquear un worker durante todo el job. Si una etapa falla sin más
+# reintentos, el job queda en error (y se libera la reserva de saldo).
+
+
+def _bucket() -> str:
+    bucket = os.getenv("S3_BUCKET")
+    if not bucket:
+        raise RuntimeError("S3_BUCKET no está configurado.")
+    return bucket
+
+
+def _delete_keys(keys) -> None:
+    keys = list(keys or [])
+    if not keys:
+        return
+    try:
+        client, bucket = _s3_client(), _bucket()
+        for i in range(0, len(keys), 1000):
+            client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": k} for k in keys[i:i + 1000]], "Quiet": True},
+            )
+    except Exception as e:
+        logger.warning("No se pudieron borrar %d partes temporales de S3: %s", len(keys), e)
+
+
+def _job_in_final_status(job) -> bool:
+    from app.services import credits
+
+    return job is None or job.status in credits.FINAL_STATUSES
+
+
+class _StageTask(Task):
+    """Etapa del pipeline: si falla sin más reintentos, el job queda en error."""
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        job_id = (kwargs or {}).get("job_id")
+        logger.error("Etapa %s falló (job=%s): %s", self.name, job_id, exc)
+        _delete_keys((kwargs or {}).get("work_keys"))
+        if not job_id:
+            return
+        with _get_flask_app().app_context():
+            db = _db.session
+            try:
+                db.rollback()
+                job = _db_get_job(db, job_id)
+                if not _job_in_final_status(job):
+                    _job_set_status(db, job, "error", error=str(exc), progress=100)
+            except Exception as e2:
+                logger.error("No se pudo marcar error en DB: %s", e2)
+
+
+@celery_app.task(name="pipeline.prepare", bind=True, base=_StageTask, max_retries=0)
+def stage_prepare(self, job_id: str, content_sha256: Optional[str] = None):
+    with _get_flask_app().app_context():
+        _stage_prepare(job_id, content_sha256)
+
+
+def _stage_prepare(job_id: str, content_sha256: Optional[str] = None):
+    from app.routes import jobs as pipeline  # helpers de ffmpeg compartidos con JOBS_MODE=thread
+
+    db = _db.session
+    job = _db_get_job(db, job_id)
+    if _job_in_final_status(job):
+        return
+    _job_set_status(db, job, "processing", progress=5)
+
+    client, bucket = _s3_client(), _bucket()
+    filename = job.filename or "audio.webm"
+    audio_path = s3_download.download(client, bucket, job.audio_s3_key, suffix=os.path.splitext(filename)[1])
+    spans = []
+    work_keys = []
+    try:
+        if os.path.getsize(audio_path) < 16:
+            raise IOError("Archivo vacío o dañado (bytes insuficientes).")
+        content_sha256 = content_sha256 or transcript_cache.file_sha256(audio_path)
+        spans = pipeline._prepare_for_openai(
+            audio_path, pipeline.OPENAI_FILE_HARD_LIMIT_MB, duration=job.duration_seconds
+        )
+        if not spans:
+            raise RuntimeError("AUDIO_PREP_FAILED")
+
+        parts = []
+        for path, start, end in spans:
+            if path == audio_path:
+                key = job.audio_s3_key  # cabe tal cual: la parte es el original
+            else:
+                key = f"work/{job.id}/{os.path.basename(path)}"
+                client.upload_file(path, bucket, key)
+                work_keys.append(key)
+            parts.append((key, start, end))
+    except BaseException:
+        _delete_keys(work_keys)
+        raise
+    finally:
+        for d in {os.path.dirname(p) for p, _, _ in spans if p != audio_path}:
+            if os.path.basename(d).startswith("prep_"):
+                shutil.rmtree(d, ignore_errors=True)
+        try:
+            os.remove(audio_path)
+        except OSError:
+            pass
+
+    _job_set_status(db, job, "processing", progress=15)
+    language = job.language or "auto"
+    chord(
+        group(
+            stage_transcribe_part.s(key, start, end, language, job_id=job_id, work_keys=work_keys)
+            for key, start, end in parts
+        ),
+        chain(
+            stage_merge.s(job_id=job_id, work_keys=work_keys),
+            stage_summarize.si(job_id=job_id),
+            stage_finalize.si(job_id=job_id, content_sha256=content_sha256),
+        ),
+    ).apply_async()
+    logger.info("Job %s: %d partes encoladas para ASR", job_id, len(parts))
+
+
+@celery_app.task(name="pipeline.transcribe_part", bind=True, base=_StageTask)
+def stage_transcribe_part(self, key: str, start: float, end: float, language: str, job_id: str, work_keys=()):
+    """
+    Transcribe una parte. Reintenta con backoff + jitter (ASR_MAX_RETRIES) y,
+    si se agotan, devuelve texto vacío como JOBS_MODE=thread: una parte
+    perdida no tira el job entero. work_keys sólo se usa en on_failure (si
+    el chord se corta, merge no llega a borrar las partes).
+    """
+    from app.routes import jobs as pipeline
+
+    with _get_flask_app().app_context():
+        _get_openai()  # sin API key no tiene sentido reintentar
+        try:
+            with s3_download.downloaded(_s3_client(), _bucket(), key, suffix=os.path.splitext(key)[1]) as path:
+                res = pipeline._transcribe_audio_once(path, language)
+        except Exception as e:
+            attempt = self.request.retries + 1
+            if attempt <= pipeline.ASR_MAX_RETRIES:
+                delay = pipeline.ASR_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+                delay += random.uniform(0, delay / 2)
+                logger.info("ASR retry %d/%d en %.1fs (%s): %s", attempt, pipeline.ASR_MAX_RETRIES, delay, key, e)
+                raise self.retry(exc=e, countdown=delay, max_retries=pipeline.ASR_MAX_RETRIES)
+            logger.warning("ASR failed (%s, %d intentos): %s", key, attempt, e)
+            res = {"transcript": "", "language_detected": "", "segments": []}
+
+    res["start"], res["end"] = float(start), float(end)
+    return res
+
+
+@celery_app.task(name="pipeline.merge", bind=True, base=_StageTask, max_retries=0)
+def stage_merge(self, results, job_id: str, work_keys=()):
+    _delete_keys(work_keys)  # las partes ya no hacen falta, pase lo que pase
+    with _get_flask_app().app_context():
+        _stage_merge(results or [], job_id)
+
+
+def _stage_merge(results, job_id: str):
+    from app.services.chunking import merge_segments, stitch_transcripts
+
+    db = _db.session
+    job = _db_get_job(db, job_id)
+    if _job_in_final_status(job):
+        return
+
+    # Las partes se solapan unos segundos: quitar las palabras repetidas al unir
+    transcript = stitch_transcripts([r.get("transcript") or "" for r in results])
+    if not transcript:
+        _job_set_status(db, job, "error", error="ASR_EMPTY", progress=100)
+        return
+    segments = merge_segments(
+        [(r["start"], r["end"], [tuple(seg) for seg in r.get("segments") or []]) for r in results]
+    )
+
+    if job.language and job.language != "auto":
+        final_lang = _normalize_lang(job.language)
+    else:
+        first = next((r.get("language_detected") for r in results if r.get("transcript")), None)
+        final_lang = _normalize_lang(
+            langid.resolve(transcript, hint=first, fallback=_detect_language_with_openai)
+        )
+
+    _save_transcript_and_summary(
+        db, job, transcript, final_lang, None,
+        segments=timings.pack_segments(segments) if segments else None,
+    )
+    _job_set_status(db, job, "processing", progress=80)
+
+
+@celery_app.task(name="pipeline.summarize", bind=True, base=_StageTask, max_retries=0)
+def stage_summarize(self, job_id: str):
+    from app.services import extractive
+
+    with _get_flask_app().app_context():
+        db = _db.session
+        job = _db_get_job(db, job_id)
+        if _job_in_final_status(job):
+            return
+        job.summary = _summarize_in_language(
+            job.transcript or "", job.language_detected or "es", offline=extractive.is_offline_user(job.user_id)
+        )
+        _job_set_status(db, job, "processing", progress=90)
+
+
+@celery_app.task(name="pipeline.finalize", bind=True, base=_StageTask, max_retries=0)
+def stage_finalize(self, job_id: str, content_sha256: Optional[str] = None):
+    from app.services import export_store
+
+    with _get_flask_app().app_context():
+        db = _db.session
+        job = _db_get_job(db, job_id)
+        if _job_in_final_status(job):
+            return
+        _ensure_billable_seconds(db, job, job.transcript or "")
+        _job_set_status(db, job, "done", progress=100)
+        _store_in_cache(job, content_sha256)
+
+        # Formatos de EXPORT_PRERENDER listos para la primera descarga
+        export_store.prerender(job_id)
@@ -16,37 +16,54 @@ def _minutes_from_seconds(sec: Optional[float]) -> int:
 def _charge_minutes(user: User, seconds: Optional[float]) -> None:
     user.minutes_used = int(user.minutes_used or 0) + _minutes_from_seconds(seconds or 60)
 
+_SUMMARY_PROMPTS = {
+    "single": "Resume con 5–8 líneas claras. Devuelve sólo el resumen.",
+    "map": "Este texto es una parte de una transcripción más larga. Resume sus puntos clave en 3–6 líneas. Devuelve sólo el resumen.",
+    "reduce": (
+        "Estos son resúmenes parciales, en orden, de partes consecutivas de una misma transcripción. "
+        "Combínalos en un resumen de 5–8 líneas claras sin repetir ideas. Devuelve sólo el resumen."
+    ),
+}
+
 def _summarize_openai(text: str, lang: str | None) -> str:
-    # SDK “nuevo” de OpenAI
+    # SDK “nuevo” de OpenAI; textos largos por partes (map-reduce) en vez de recortar
     try:
-        from openai import OpenAI
-        client = OpenAI()
-        prompt = (
-            "Resume con 5–8 líneas claras. Devuelve sólo el resumen.\n\n"
-            f"Idioma objetivo: {lang or 'es'}.\n\nTexto:\n{text[:12000]}"
-        )
-        resp = client.chat.completions.create(
-            model=os.getenv("OPENAI_SUMMARY_MODEL", "gpt-4o-mini"),
-            messages=[{"role":"user","content":prompt}],
-            temperature=0.3,
-        )
-        return (resp.choices[0].message.content or "").strip()
+        from app.services import long_summary, provider, repetition
+        from app.services.openai_client import get_client
+        if get_client() is None:
+            return ""
+        text = repetition.remove_repetitions(text)[0]
+
+        def _call(part: str, stage: str) -> str:
+            prompt = (
+                f"{_SUMMARY_PROMPTS[stage]}\n\n"
+                f"Idioma objetivo: {lang or 'es'}.\n\nTexto:\n{part}"
+            )
+            resp = provider.chat(
+                model=os.getenv("OPENAI_SUMMARY_MODEL", "gpt-4o-mini"),
+                messages=[{"role":"user","content":prompt}],
+                temperature=0.3,
+            )
+            return (resp.choices[0].message.content or "").strip()
+
+        return long_summary.summarize_long(text, _call)
     except Exception as e:
         log.exception("Fallo resumiendo con OpenAI: %s", e)
         return ""
 
 def _transcribe_openai(filepath: str, lang_hint: str | None):
     # Devuelve (texto, idioma_detectado, dur_seconds)
-    from openai import OpenAI
-    client = OpenAI()
-    with open(filepath, "rb") as f:
-        tr = client.audio.transcriptions.create(
-            model=os.getenv("OPENAI_TRANSCRIBE_MODEL", "whisper-1"),
-            file=f,
-            language=(lang_hint or None),          # puede ser None
-            response_format="verbose_json",
-            temperature=0
-        )
+    from app.services import provider
+    from app.services.openai_client import get_client
+    if get_client() is None:
+        raise RuntimeError("OpenAI no disponible (SDK u OPENAI_API_KEY).")
+    tr = provider.transcribe(
+        filepath,
+        model=os.getenv("OPENAI_TRANSCRIBE_MODEL", "whisper-1"),
+        language=(lang_hint or None),          # puede ser None
+        response_format="verbose_json",
+        temperature=0
+    )
     text = tr.text or ""
     lang = getattr(tr, "language", None) or (lang_hint or None)
     dur = getattr(tr, "duration", None)  # algunos SDKs lo traen; si no, None
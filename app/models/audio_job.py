@@ -19,6 +19,7 @@ class AudioJob(db.Model):
     # Archivo
     filename = db.Column(db.String(255), nullable=True)
     size_bytes = db.Column(db.Integer, nullable=True)
+    audio_s3_key = db.Column(db.String(512), nullable=True)  # JOBS_MODE=celery: audio subido para el worker
 
     # Idiomas
     language = db.Column(db.String(16), nullable=True)           # seleccionado (auto/es/en/..)
@@ -26,14 +27,17 @@ class AudioJob(db.Model):
 
     # Estado
     status = db.Column(db.String(32), nullable=False, default="done")  # queued/processing/done/error
+    progress = db.Column(db.Integer, nullable=False, default=0)         # 0..100 (para polling del front)
     error_message = db.Column(db.Text, nullable=True)
 
     # Resultados
     transcript = db.Column(db.Text, nullable=True)
     summary = db.Column(db.Text, nullable=True)
+    segments = db.Column(db.LargeBinary, nullable=True)  # tiempos por segmento empaquetados (app/services/timings.py)
 
     # Para cobro / minutos
     duration_seconds = db.Column(db.Integer, nullable=True)
+    reserved_seconds = db.Column(db.Integer, nullable=False, default=0)  # reservado en user_balances hasta terminar
 
     # Fechas
     created_at = db.Column(db.DateTime, nullable=False, default=dt.datetime.utcnow)
@@ -43,3 +47,12 @@ class AudioJob(db.Model):
         default=dt.datetime.utcnow,
         onupdate=dt.datetime.utcnow,
     )
+
+
+# Historial por usuario (más reciente primero) con paginación por cursor
+db.Index(
+    "ix_audio_jobs_user_id_created_at",
+    AudioJob.user_id,
+    AudioJob.created_at.desc(),
+    AudioJob.id.desc(),
+)
@@ -0,0 +1,37 @@
+# app/models_balance.py
+from __future__ import annotations
+
+import datetime as dt
+
+from app.extensions import db
+
+
+def utcnow():
+    return dt.datetime.utcnow()
+
+
+class UserBalance(db.Model):
+    """
+    Saldo materializado por usuario (segundos). Se mantiene de forma
+    incremental (pago capturado, reserva al crear un job, job terminado) y se
+    puede reconstruir desde Payment/AudioJob con `flask credits-reconcile`.
+
+    disponible = allowance_seconds - used_seconds - reserved_seconds
+    """
+
+    __tablename__ = "user_balances"
+
+    user_id = db.Column(db.String(255), primary_key=True)
+
+    allowance_seconds = db.Column(db.BigInteger, nullable=False, default=0)  # free tier + pagos captured
+    used_seconds = db.Column(db.BigInteger, nullable=False, default=0)       # jobs "done"
+    reserved_seconds = db.Column(db.BigInteger, nullable=False, default=0)   # jobs en curso
+
+    version = db.Column(db.Integer, nullable=False, default=0)  # +1 en cada cambio
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+
+    def __repr__(self) -> str:
+        return (
+            f"<UserBalance user_id={self.user_id} allowance={self.allowance_seconds} "
+            f"used={self.used_seconds} reserved={self.reserved_seconds} v={self.version}>"
+        )
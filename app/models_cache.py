@@ -0,0 +1,60 @@
+# app/models_cache.py
+from __future__ import annotations
+
+import datetime as dt
+
+from app.extensions import db
+
+
+def utcnow():
+    return dt.datetime.utcnow()
+
+
+class TranscriptCache(db.Model):
+    """
+    Resultado de procesar un audio, direccionado por contenido:
+    key = sha256(sha256(audio) + idioma + modelos + versión del pipeline).
+    """
+
+    __tablename__ = "transcript_cache"
+
+    key = db.Column(db.String(64), primary_key=True)
+    content_sha256 = db.Column(db.String(64), nullable=False, index=True)
+    language = db.Column(db.String(16), nullable=True)  # seleccionado (auto/es/en/..)
+
+    transcript = db.Column(db.Text, nullable=False)
+    language_detected = db.Column(db.String(16), nullable=True)
+    summary = db.Column(db.Text, nullable=True)
+    duration_seconds = db.Column(db.Integer, nullable=True)
+    segments = db.Column(db.LargeBinary, nullable=True)  # tiempos por segmento (app/services/timings.py)
+
+    size_bytes = db.Column(db.Integer, nullable=False, default=0)  # transcript + summary (utf-8) + segments
+    hits = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
+
+    def __repr__(self) -> str:
+        return f"<TranscriptCache key={self.key[:12]} hits={self.hits} size={self.size_bytes}>"
+
+
+class LLMCache(db.Model):
+    """
+    Resultado de un resumen / traducción del LLM (nivel SQL de app/services/llm_cache.py):
+    key = sha256(tipo + sha256(texto normalizado) + idioma + modelo + versión del prompt + temperatura).
+    """
+
+    __tablename__ = "llm_cache"
+
+    key = db.Column(db.String(64), primary_key=True)
+    kind = db.Column(db.String(32), nullable=False, default="")  # summary:jobs, translate, ...
+    value = db.Column(db.Text, nullable=False)
+
+    size_bytes = db.Column(db.Integer, nullable=False, default=0)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
+
+    def __repr__(self) -> str:
+        return f"<LLMCache key={self.key[:12]} kind={self.kind} hits={self.hits}>"
@@ -4,8 +4,7 @@ from __future__ import annotations
 import os
 from flask import Blueprint, jsonify, request, session
 
-from app import db
-from app.models import AudioJob
+from app.services import history
 
 bp = Blueprint("history", __name__, url_prefix="/api/history")
 
@@ -25,14 +24,9 @@ def _get_user_id() -> str:
 @bp.get("")
 def history_list():
     user_id = _get_user_id()
-    limit = int(request.args.get("limit", "100") or 100)
-    limit = max(1, min(limit, 500))
-
-    q = (
-        db.session.query(AudioJob)
-        .filter(AudioJob.user_id == user_id)
-        .order_by(AudioJob.created_at.desc())
-        .limit(limit)
+    items, next_cursor = history.list_jobs(
+        user_id,
+        limit=history.page_size(request.args.get("limit")),
+        cursor=request.args.get("cursor"),
     )
-    items = [j.to_dict() for j in q.all()]
-    return jsonify({"ok": True, "items": items, "count": len(items)})
+    return jsonify({"ok": True, "items": items, "count": len(items), "next_cursor": next_cursor})
@@ -3,25 +3,48 @@ from __future__ import annotations
 
 import os
 import re
+import json
 import math
+import time
+import random
+import shutil
 import tempfile
+import threading
+import uuid
 import datetime as dt
 import subprocess
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Callable, Tuple
 
-from flask import Blueprint, request, jsonify, current_app, session
+from flask import Blueprint, request, jsonify, current_app, send_file, session
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
 
 from app.extensions import db
 from app.models import AudioJob
 from app.models_user import User  # ✅ ÚNICA fuente de User (NO models_auth)
+from app.services import (
+    credits,
+    export_pool,
+    export_store,
+    exporters,
+    extractive,
+    history,
+    ingest,
+    langid,
+    llm_cache,
+    long_summary,
+    provider,
+    repetition,
+    timings,
+    transcript_cache,
+    upload_sessions,
+)
+from app.services.openai_client import get_client
+from app.services.chunking import merge_segments, parse_silencedetect, plan_chunks, stitch_transcripts
 
 
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None  # type: ignore
-
-_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", "")) if OpenAI else None
 ASR_MODEL = os.getenv("OPENAI_TRANSCRIBE_MODEL", "whisper-1")
 CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
 
@@ -29,6 +52,35 @@ MB = 1024 * 1024
 MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "100") or 100)
 OPENAI_FILE_HARD_LIMIT_MB = int(os.getenv("OPENAI_FILE_LIMIT_MB", "25"))
 MAX_CHUNK_SECONDS = int(os.getenv("MAX_CHUNK_SECONDS", "600"))
+# ffprobe sobre la URL prefirmada (subida directa): tope total y por lectura de red
+UPLOAD_PROBE_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_PROBE_TIMEOUT_SECONDS", "30") or 30)
+OPUS_BITRATE = os.getenv("OPUS_BITRATE", "48k")
+
+# Segmentación en stream copy (sin decodificar) cuando el códec ya lo acepta Whisper.
+AUDIO_STREAM_COPY = os.getenv("AUDIO_STREAM_COPY", "1") == "1"
+_STREAM_COPY_EXT: Dict[str, str] = {"mp3": "mp3", "opus": "ogg", "vorbis": "ogg", "flac": "flac"}
+
+# Cortes en silencios + solape entre partes (ver app/services/chunking.py).
+# PARALLEL_CHUNK_SECONDS > 0 parte también archivos que caben en el límite
+# de OpenAI, para transcribirlos en paralelo (0 = sólo partir si no caben).
+AUDIO_SILENCE_SPLIT = os.getenv("AUDIO_SILENCE_SPLIT", "1") == "1"
+CHUNK_OVERLAP_SECONDS = float(os.getenv("CHUNK_OVERLAP_SECONDS", "1.5") or 1.5)
+SILENCE_NOISE_DB = os.getenv("SILENCE_NOISE_DB", "-35dB")
+SILENCE_MIN_SECONDS = float(os.getenv("SILENCE_MIN_SECONDS", "0.35") or 0.35)
+SILENCE_SEARCH_SECONDS = float(os.getenv("SILENCE_SEARCH_SECONDS", "30") or 30)
+PARALLEL_CHUNK_SECONDS = int(os.getenv("PARALLEL_CHUNK_SECONDS", "0") or 0)
+
+# ASR en paralelo por partes: máximo de llamadas simultáneas al proveedor
+# (global por proceso, compartido entre jobs) y reintentos por parte.
+ASR_MAX_IN_FLIGHT = max(1, int(os.getenv("ASR_MAX_IN_FLIGHT", "4") or 4))
+ASR_MAX_RETRIES = max(0, int(os.getenv("ASR_MAX_RETRIES", "3") or 3))
+ASR_RETRY_BASE_SECONDS = float(os.getenv("ASR_RETRY_BASE_SECONDS", "2") or 2)
+_asr_slots = threading.BoundedSemaphore(ASR_MAX_IN_FLIGHT)
+
+# sync: todo dentro del request (200 con resultado)
+# thread: pool en proceso (202 + polling de GET /jobs/<id>)
+# celery: sube a S3 y encola el pipeline de app/celery_app.py (202 + polling)
+JOBS_MODE = (os.getenv("JOBS_MODE", "sync") or "sync").strip().lower()
 
 bp = Blueprint("jobs", __name__)  # ✅ sin url_prefix: tus rutas ya están completas
 
@@ -59,7 +111,8 @@ def _normalize_lang(code_or_name: Optional[str], default: str = "es") -> str:
         p = s.split("-", 1)[0]
         if p in _LANG_ALIASES:
             return _LANG_ALIASES[p]
-    return _LANG_ALIASES.get(s[:2], default)
+    # Nombres de Whisper ('dutch') y resto del catálogo (langid.LANGUAGES)
+    return _LANG_ALIASES.get(s[:2]) or langid.normalize(s) or default
 
 
 def _require_auth_user_id() -> str | None:
@@ -111,13 +164,20 @@ def _file_size_mb(path: str) -> float:
         return 0.0
 
 
-def _duration_seconds(path: str) -> float:
+def _duration_seconds(path: str, timeout: Optional[float] = None) -> float:
+    """
+    Duración según ffprobe (0.0 si no se pudo medir). 'path' puede ser una
+    URL; con timeout se corta el proceso y, en URLs, cada lectura de red
+    (-rw_timeout) para que un bucket lento no retenga al worker web.
+    """
+    net = ["-rw_timeout", str(int(timeout * 1_000_000))] if timeout and "://" in path else []
     try:
         r = subprocess.run(
             [
                 _ffprobe(),
                 "-v",
                 "error",
+                *net,
                 "-show_entries",
                 "format=duration",
                 "-of",
@@ -126,9 +186,13 @@ def _duration_seconds(path: str) -> float:
             ],
             capture_output=True,
             check=False,
+            timeout=timeout,
         )
         s = (r.stdout.decode(errors="ignore").strip() or "0")
         return float(s)
+    except subprocess.TimeoutExpired:
+        current_app.logger.warning("ffprobe: sin respuesta en %.0fs", timeout)
+        return 0.0
     except Exception:
         return 0.0
 
@@ -156,53 +220,243 @@ def _compress_to_opus(src: str, dst: str, bitrate: str = "64k") -> bool:
         return False
 
 
-def _split_audio(src: str, out_dir: str, chunk_seconds: int) -> List[str]:
-    dur = _duration_seconds(src)
-    if dur <= 0:
-        return [src]
-    parts: List[str] = []
-    start, idx = 0.0, 1
-    while start < dur - 0.1:
-        out = os.path.join(out_dir, f"part_{idx:03d}.ogg")
-        cmd = [
-            _ffmpeg(),
-            "-y",
-            "-ss",
-            f"{start:.2f}",
-            "-i",
-            src,
-            "-t",
-            str(chunk_seconds),
-            "-ac",
+def _probe_audio(path: str) -> Dict[str, Any]:
+    """
+    Un solo ffprobe para duración + códec del primer stream de audio.
+    Devuelve {"duration": float (0.0 si no se pudo), "codec": str ("" si no se pudo)}.
+    """
+    info: Dict[str, Any] = {"duration": 0.0, "codec": ""}
+    try:
+        r = subprocess.run(
+            [
+                _ffprobe(),
+                "-v",
+                "error",
+                "-select_streams",
+                "a:0",
+                "-show_entries",
+                "format=duration:stream=codec_name",
+                "-of",
+                "json",
+                path,
+            ],
+            capture_output=True,
+            check=False,
+        )
+        data = json.loads(r.stdout.decode(errors="ignore") or "{}")
+        info["duration"] = float((data.get("format") or {}).get("duration") or 0.0)
+        streams = data.get("streams") or []
+        if streams:
+            info["codec"] = str(streams[0].get("codec_name") or "").lower()
+    except Exception:
+        pass
+    return info
+
+
+def _detect_silences(path: str, duration: float) -> List[Tuple[float, float]]:
+    """
+    Pasada barata (sólo decodifica, 8 kHz mono) con el filtro silencedetect.
+    Devuelve [(inicio, fin), ...] ordenados; [] si ffmpeg falla.
+    """
+    af = (
+        "aresample=8000,aformat=channel_layouts=mono,"
+        f"silencedetect=noise={SILENCE_NOISE_DB}:d={SILENCE_MIN_SECONDS}"
+    )
+    try:
+        r = subprocess.run(
+            [_ffmpeg(), "-hide_banner", "-nostats", "-i", path, "-map", "0:a:0", "-af", af, "-f", "null", "-"],
+            capture_output=True,
+            check=False,
+        )
+        return parse_silencedetect(r.stderr.decode(errors="ignore"), duration)
+    except Exception:
+        return []
+
+
+def _plan_spans(path: str, duration: float, chunk_seconds: int) -> Optional[List[Tuple[float, float]]]:
+    """Tramos con corte en silencio + solape; None => segment muxer a ciegas."""
+    if not AUDIO_SILENCE_SPLIT or duration <= 0:
+        return None
+    silences = _detect_silences(path, duration)
+    return plan_chunks(
+        duration,
+        silences,
+        chunk_seconds,
+        overlap_seconds=CHUNK_OVERLAP_SECONDS,
+        search_seconds=SILENCE_SEARCH_SECONDS,
+    )
+
+
+def _segment_audio(
+    src: str,
+    out_dir: str,
+    chunk_seconds: int,
+    copy_ext: Optional[str] = None,
+    bitrate: str = OPUS_BITRATE,
+    spans: Optional[List[Tuple[float, float]]] = None,
+) -> List[str]:
+    """
+    Corta src en partes con UNA sola invocación de ffmpeg. copy_ext => stream
+    copy sin re-codificar (el códec ya es aceptado por Whisper); si no,
+    transcodifica a Opus mono 16 kHz en la misma pasada.
+      - spans=None: segment muxer cada ~chunk_seconds.
+      - spans=[(ini, fin), ...]: una salida por tramo (-ss/-to de salida),
+        lo que permite tramos solapados leyendo el origen una sola vez.
+    Devuelve part_001.<ext>, part_002.<ext>, ... en orden.
+    """
+    ext = copy_ext or "ogg"
+    if copy_ext:
+        codec_args = ["-c:a", "copy"]
+    else:
+        codec_args = ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", bitrate]
+
+    cmd = [_ffmpeg(), "-y", "-i", src]
+    if spans:
+        for i, (a, b) in enumerate(spans, 1):
+            cmd += ["-map", "0:a:0", "-vn"] + codec_args
+            cmd += ["-ss", f"{a:.3f}", "-to", f"{b:.3f}", os.path.join(out_dir, f"part_{i:03d}.{ext}")]
+    else:
+        cmd += ["-map", "0:a:0", "-vn"] + codec_args
+        cmd += [
+            "-f",
+            "segment",
+            "-segment_time",
+            str(int(chunk_seconds)),
+            "-segment_start_number",
             "1",
-            "-ar",
-            "16000",
-            "-c:a",
-            "libopus",
-            "-b:a",
-            "64k",
-            out,
+            "-reset_timestamps",
+            "1",
+            os.path.join(out_dir, f"part_%03d.{ext}"),
         ]
+    try:
         subprocess.run(cmd, capture_output=True, check=False)
-        if os.path.exists(out) and _file_size_mb(out) > 0:
-            parts.append(out)
-        idx += 1
-        start += float(chunk_seconds)
-    return parts or [src]
+    except Exception:
+        return []
+
+    parts = sorted(
+        os.path.join(out_dir, n)
+        for n in os.listdir(out_dir)
+        if n.startswith("part_") and n.endswith(f".{ext}")
+    )
+    return [p for p in parts if _file_size_mb(p) > 0]
+
+
+def _part_spans(
+    parts: List[str],
+    dur: float,
+    chunk_seconds: float = 0,
+    spans: Optional[List[Tuple[float, float]]] = None,
+) -> List[Tuple[str, float, float]]:
+    """(ruta, inicio, fin) de cada parte en segundos del audio original (part_NNN => tramo N)."""
+    out: List[Tuple[str, float, float]] = []
+    for p in parts:
+        name = os.path.basename(p)
+        if not chunk_seconds and not spans:
+            out.append((p, 0.0, float(dur or 0.0)))
+            continue
+        idx = int(name[5:8]) - 1 if name.startswith("part_") and name[5:8].isdigit() else len(out)
+        if spans and idx < len(spans):
+            out.append((p, float(spans[idx][0]), float(spans[idx][1])))
+        else:
+            a = idx * float(chunk_seconds)
+            b = a + float(chunk_seconds)
+            out.append((p, a, min(b, dur) if dur else b))
+    return out
 
 
-def _prepare_for_openai(path: str, hard_limit_mb: int) -> List[str]:
-    if _file_size_mb(path) <= hard_limit_mb:
-        return [path]
+def _prepare_for_openai(
+    path: str,
+    hard_limit_mb: int,
+    duration: Optional[float] = None,
+) -> List[Tuple[str, float, float]]:
+    """
+    Deja el audio listo para Whisper (<= hard_limit_mb por archivo) con una
+    sola pasada de ffmpeg sobre el original (más el análisis de silencios):
+      - cabe tal cual (y sin PARALLEL_CHUNK_SECONDS) -> [path]
+      - códec aceptado (mp3/opus/vorbis/flac) -> partes en stream copy
+      - resto -> Opus 16 kHz, en un archivo si cabe o partido en la misma pasada
+    Las partes se cortan en silencios y se solapan CHUNK_OVERLAP_SECONDS.
+    Devuelve [(ruta, inicio, fin), ...]: el tramo del original que cubre cada
+    parte, para llevar los tiempos de Whisper a la línea de tiempo completa.
+    """
+    fits = _file_size_mb(path) <= hard_limit_mb
+    want_parallel = PARALLEL_CHUNK_SECONDS > 0 and float(duration or 0) > PARALLEL_CHUNK_SECONDS * 1.5
+    if fits and not want_parallel:
+        return _part_spans([path], float(duration or 0.0))
     if not _have_ffmpeg():
-        return []
+        return _part_spans([path], float(duration or 0.0)) if fits else []
+
+    info = _probe_audio(path)
+    dur = float(duration or info["duration"] or 0.0)
     tmpdir = tempfile.mkdtemp(prefix="prep_")
+    try:
+        spans = _split_for_openai(path, tmpdir, info["codec"], dur, hard_limit_mb, fits, want_parallel)
+    except Exception:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        raise
+    if not any(os.path.dirname(p) == tmpdir for p, _, _ in spans):
+        # [] o el original tal cual: el tmpdir no tiene nada que conservar
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return spans
+
+
+def _split_for_openai(
+    path: str,
+    tmpdir: str,
+    codec: Optional[str],
+    dur: float,
+    hard_limit_mb: int,
+    fits: bool,
+    want_parallel: bool,
+) -> List[Tuple[str, float, float]]:
+    """Cuerpo de _prepare_for_openai: las partes nuevas se escriben en tmpdir."""
+    budget_bytes = hard_limit_mb * MB * 0.9  # margen por cabeceras / VBR
+    opus_bytes_per_sec = _bitrate_bps(OPUS_BITRATE) / 8.0
+
+    copy_ext = _STREAM_COPY_EXT.get(codec) if (AUDIO_STREAM_COPY and dur > 0) else None
+    chunk = 0
+    if copy_ext:
+        bytes_per_sec = os.path.getsize(path) / dur
+        chunk = min(MAX_CHUNK_SECONDS, int(budget_bytes / max(bytes_per_sec, 1.0)))
+        if chunk < 60:
+            copy_ext, chunk = None, 0
+    if not chunk and dur > 0 and (want_parallel or dur * opus_bytes_per_sec > budget_bytes):
+        chunk = MAX_CHUNK_SECONDS
+    if want_parallel and chunk:
+        chunk = min(chunk, PARALLEL_CHUNK_SECONDS)
+
+    if chunk and dur > chunk:
+        spans = _plan_spans(path, dur, chunk)
+        parts = _segment_audio(path, tmpdir, chunk, copy_ext=copy_ext, spans=spans)
+        if not parts and copy_ext:
+            parts = _segment_audio(path, tmpdir, chunk, spans=spans)
+        if parts:
+            return _part_spans(parts, dur, chunk, spans)
+
+    if fits:
+        return _part_spans([path], dur)
+
+    # Duración desconocida o cabe comprimido: un solo archivo Opus.
     compressed = os.path.join(tmpdir, "compressed.ogg")
-    if not _compress_to_opus(path, compressed, bitrate="48k"):
+    if not _compress_to_opus(path, compressed, bitrate=OPUS_BITRATE):
         return []
     if _file_size_mb(compressed) <= hard_limit_mb:
-        return [compressed]
-    return _split_audio(compressed, tmpdir, MAX_CHUNK_SECONDS)
+        return _part_spans([compressed], dur)
+    # Sólo si la duración no se pudo medir: re-segmentar el Opus sin re-codificar.
+    parts = _segment_audio(compressed, tmpdir, MAX_CHUNK_SECONDS, copy_ext="ogg")
+    return _part_spans(parts, dur, MAX_CHUNK_SECONDS)
+
+
+def _bitrate_bps(bitrate: str) -> float:
+    b = (bitrate or "").strip().lower()
+    try:
+        if b.endswith("k"):
+            return float(b[:-1]) * 1000.0
+        if b.endswith("m"):
+            return float(b[:-1]) * 1000000.0
+        return float(b)
+    except Exception:
+        return 48000.0
 
 
 def _dedupe_lines(txt: str) -> str:
@@ -217,116 +471,413 @@ def _dedupe_lines(txt: str) -> str:
     return "\n".join(out)
 
 
-def _fallback_extractive_summary(text: str, max_sents: int = 5) -> str:
-    sents = [s.strip() for s in re.split(r"(?<=[.!?])\s+", text or "") if s.strip()]
-    if not sents:
-        return ""
-    words = re.findall(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñ']+", text or "")
-    freq: Dict[str, int] = {}
-    for w in words:
-        wl = w.lower()
-        if len(wl) <= 2:
-            continue
-        freq[wl] = freq.get(wl, 0) + 1
-
-    def score(sent: str) -> float:
-        tokens = re.findall(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñ']+", sent.lower())
-        if not tokens:
-            return 0.0
-        return sum(freq.get(t, 0) for t in tokens) / math.sqrt(len(tokens))
-
-    ranked = sorted(((score(s), i, s) for i, s in enumerate(sents)), reverse=True)
-    top = sorted(ranked[:max_sents], key=lambda t: t[1])
-    return "\n".join("• " + s.strip() for _, _, s in top)
+# Subir si cambian los prompts de _SUMMARY_SYSTEM (invalida llm_cache)
+_SUMMARY_PROMPT_VERSION = "1"
+_SUMMARY_SYSTEM = {
+    long_summary.SINGLE: "Return 3–6 bullet points. Be abstract. Do not copy phrases.",
+    long_summary.MAP: (
+        "The text is one part of a longer transcript. "
+        "Return 3–6 bullet points with the key points of this part. Be abstract. Do not copy phrases."
+    ),
+    long_summary.REDUCE: (
+        "The text is a set of partial summaries of consecutive parts of one transcript, in order. "
+        "Merge them into 3–6 bullet points covering the whole transcript. Do not repeat points."
+    ),
+}
 
 
 def _summarize_llm(clean_text: str, language_code: str = "es") -> str:
-    if not _client:
+    """
+    Una llamada si el texto es corto; map-reduce en paralelo si es largo
+    (long_summary). Mismo texto + idioma + modelo => desde llm_cache.
+    """
+    if not get_client():
         return ""
-    system = (
-        f"You summarize in {language_code}. "
-        "Return 3–6 bullet points. Be abstract. Do not copy phrases."
-    )
-    user = f"Text:\n\n{clean_text}\n\nSummarize now."
-    resp = _client.chat.completions.create(
-        model=CHAT_MODEL,
-        temperature=0.3,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
+
+    def _call(text: str, stage: str) -> str:
+        system = f"You summarize in {language_code}. " + _SUMMARY_SYSTEM[stage]
+        user = f"Text:\n\n{text}\n\nSummarize now."
+        resp = provider.chat(
+            model=CHAT_MODEL,
+            temperature=0.3,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+        )
+        return (resp.choices[0].message.content or "").strip()
+
+    out = llm_cache.cached(
+        "summary:jobs",
+        clean_text,
+        language_code,
+        CHAT_MODEL,
+        _SUMMARY_PROMPT_VERSION,
+        0.3,
+        lambda: long_summary.summarize_long(clean_text, _call),
     )
-    out = (resp.choices[0].message.content or "").strip()
     if "•" not in out:
         lines = [l.strip("-• ").strip() for l in out.splitlines() if l.strip()]
         out = "\n".join("• " + l for l in lines)
     return out
 
 
-def _summarize_robust(raw_text: str, language_code: str = "es") -> str:
-    cleaned = _dedupe_lines(raw_text or "")
+def _summarize_robust(raw_text: str, language_code: str = "es", offline: bool = False) -> str:
+    """
+    offline=True (SUMMARY_MODE / SUMMARY_OFFLINE_TIERS): resumen extractivo
+    local, sin llamar al LLM. También es el respaldo si el LLM falla.
+    """
+    # Bucles de Whisper y frases casi duplicadas fuera antes de contar tokens
+    cleaned = _dedupe_lines(repetition.remove_repetitions(raw_text or "")[0])
     if not cleaned:
         return ""
+    if offline:
+        return extractive.summarize(cleaned, 5)
     try:
         out = _summarize_llm(cleaned, _normalize_lang(language_code, "es"))
-        return out or _fallback_extractive_summary(cleaned, 5)
+        return out or extractive.summarize(cleaned, 5)
     except Exception:
-        return _fallback_extractive_summary(cleaned, 5)
+        return extractive.summarize(cleaned, 5)
+
+
+def _asr_params(language_code: Optional[str]) -> Dict[str, Any]:
+    lang = None if (not language_code or language_code == "auto") else _normalize_lang(language_code, "es")
+    return {"model": ASR_MODEL or "whisper-1", "language": lang, "response_format": "verbose_json"}
+
+
+def _asr_result(res: Any, lang: Optional[str]) -> Dict[str, Any]:
+    text = (res.text or "").strip()
+    det_raw = getattr(res, "language", None) or lang or "es"
+    det = _normalize_lang(det_raw, "es")
+    # Tiempos por segmento (relativos a esta parte) para SRT/VTT reales
+    return {"transcript": text, "language_detected": det, "segments": timings.segments_from_response(res)}
+
+
+def _transcribe_audio_once(path: str, language_code: Optional[str], retries: Optional[int] = 0) -> Dict[str, Any]:
+    """
+    Una llamada ASR; deja propagar la excepción. Por defecto sin reintentos
+    del SDK: los hace quien llama (ASR_MAX_RETRIES), en una sola capa.
+    """
+    params = _asr_params(language_code)
+    return _asr_result(provider.transcribe(path, retries=retries, **params), params["language"])
 
 
 def _transcribe_audio(path: str, language_code: Optional[str]) -> Dict[str, Any]:
-    if not _client:
+    if not get_client():
         return {"transcript": "", "language_detected": _normalize_lang(language_code, "es")}
 
-    model = ASR_MODEL or "whisper-1"
     lang = None if (not language_code or language_code == "auto") else _normalize_lang(language_code, "es")
+    try:
+        return _transcribe_audio_once(path, language_code, retries=None)
+    except Exception as e:
+        current_app.logger.warning("ASR failed: %s", e)
+        return {"transcript": "", "language_detected": _normalize_lang(lang or "es", "es")}
 
-    with open(path, "rb") as f:
-        try:
-            res = _client.audio.transcriptions.create(
-                model=model,
-                file=f,
-                language=lang,
-                response_format="verbose_json",
-            )
-            text = (res.text or "").strip()
-            det_raw = getattr(res, "language", None) or lang or "es"
-            det = _normalize_lang(det_raw, "es")
-            return {"transcript": text, "language_detected": det}
-        except Exception as e:
-            current_app.logger.warning("ASR failed: %s", e)
+
+def _transcribe_part_with_retry(path: str, language_code: Optional[str]) -> Dict[str, Any]:
+    """
+    Transcribe una parte respetando el límite global de llamadas en vuelo.
+    Reintenta con backoff exponencial + jitter (429/5xx/timeouts); si se
+    agotan los intentos devuelve transcript vacío como _transcribe_audio.
+    """
+    if not get_client():
+        return _transcribe_audio(path, language_code)
+
+    attempt = 0
+    while True:
+        with _asr_slots:
+            try:
+                return _transcribe_audio_once(path, language_code)
+            except Exception as e:
+                err = e
+        attempt += 1
+        if attempt > ASR_MAX_RETRIES:
+            current_app.logger.warning("ASR failed (%s, %d intentos): %s", os.path.basename(path), attempt, err)
+            lang = None if (not language_code or language_code == "auto") else language_code
             return {"transcript": "", "language_detected": _normalize_lang(lang or "es", "es")}
+        delay = ASR_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+        delay += random.uniform(0, delay / 2)
+        current_app.logger.info("ASR retry %d/%d en %.1fs (%s): %s", attempt, ASR_MAX_RETRIES, delay, os.path.basename(path), err)
+        time.sleep(delay)
 
 
-def _get_allowance_seconds(user_id: str) -> int:
-    free_min = int(current_app.config.get("FREE_TIER_MINUTES", 10))
+def _transcribe_parts(
+    parts: List[str],
+    language_code: Optional[str],
+    on_part_done: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Transcribe las partes en paralelo (máx. ASR_MAX_IN_FLIGHT en vuelo) y
+    devuelve los resultados en el MISMO orden que 'parts'.
+    on_part_done(hechas, total) se invoca desde el hilo llamador, así que
+    puede tocar db.session sin problemas.
+    """
+    if not parts:
+        return []
 
-    paid_min = 0
-    try:
-        from app.models_payment import Payment
+    total = len(parts)
+    if total == 1:
+        res = _transcribe_part_with_retry(parts[0], language_code)
+        if on_part_done:
+            on_part_done(1, 1)
+        return [res]
 
-        q = db.session.query(Payment).filter(
-            Payment.user_id == user_id,
-            Payment.status == "captured",
-        )
-        paid_min = sum(int(p.minutes or 0) for p in q.all())
-    except Exception as e:
-        current_app.logger.error("allowance: error leyendo pagos: %s", e)
+    if provider.PROVIDER_ASYNC and get_client():
+        return _transcribe_parts_async(parts, language_code, on_part_done)
+
+    app = current_app._get_current_object()
+
+    def _work(part: str) -> Dict[str, Any]:
+        with app.app_context():
+            return _transcribe_part_with_retry(part, language_code)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * total
+    with ThreadPoolExecutor(max_workers=min(total, ASR_MAX_IN_FLIGHT), thread_name_prefix="asr") as pool:
+        futures = {pool.submit(_work, part): i for i, part in enumerate(parts)}
+        done = 0
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+            done += 1
+            if on_part_done:
+                on_part_done(done, total)
+
+    return [r or {"transcript": "", "language_detected": ""} for r in results]
 
-    allowance_min = free_min + paid_min
-    return int(allowance_min * 60)
 
+def _transcribe_parts_async(
+    parts: List[str],
+    language_code: Optional[str],
+    on_part_done: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    PROVIDER_ASYNC=1: todas las partes van al event loop de provider a la vez
+    (el semáforo del proceso limita las que están en vuelo), sin un hilo por
+    parte. Mismo contrato que _transcribe_parts.
+    """
+    params = _asr_params(language_code)
+    lang = params["language"]
+    futures = {
+        provider.submit(provider.atranscribe_with_retry(p, ASR_MAX_RETRIES, ASR_RETRY_BASE_SECONDS, **params)): i
+        for i, p in enumerate(parts)
+    }
+    total = len(parts)
+    results: List[Dict[str, Any]] = [{"transcript": "", "language_detected": ""}] * total
+    done = 0
+    for fut in as_completed(futures):
+        i = futures[fut]
+        try:
+            results[i] = _asr_result(fut.result(), lang)
+        except Exception as e:
+            current_app.logger.warning("ASR failed (%s, %d intentos): %s", os.path.basename(parts[i]), ASR_MAX_RETRIES + 1, e)
+            results[i] = {"transcript": "", "language_detected": _normalize_lang(lang or "es", "es")}
+        done += 1
+        if on_part_done:
+            on_part_done(done, total)
+    return results
+
+
+def _set_job_progress(
+    job: AudioJob,
+    status: str,
+    progress: int,
+    error_message: Optional[str] = None,
+) -> None:
+    # done/error: transición condicional + saldo (misma transacción); si otro
+    # proceso ya cerró el job, no se pisa su estado
+    if status in credits.FINAL_STATUSES and not credits.settle_job(job, status):
+        db.session.rollback()
+        return
+    job.status = status
+    job.progress = max(0, min(100, int(progress)))
+    if error_message:
+        job.error_message = error_message
+    job.updated_at = dt.datetime.utcnow()
+    db.session.commit()
+
+
+def _run_job_pipeline(
+    job_id: str,
+    path: str,
+    language: str,
+    cleanup_dir: Optional[str] = None,
+    content_sha256: Optional[str] = None,
+) -> None:
+    """
+    Procesa un AudioJob ya creado (status=queued): prepara el audio, transcribe
+    cada parte, resume y guarda. Corre dentro del request (JOBS_MODE=sync) o en
+    el pool de workers (JOBS_MODE=thread); en ambos casos necesita app_context.
+    Con content_sha256 el resultado queda en la caché de transcripciones.
+    """
+    job = db.session.get(AudioJob, job_id)
+    if not job:
+        current_app.logger.error("pipeline: job %s no existe", job_id)
+        return
 
-def _get_used_seconds(user_id: str) -> int:
+    parts: List[str] = []
     try:
-        qj = db.session.query(AudioJob).filter(
-            AudioJob.user_id == user_id,
-            AudioJob.status == "done",
+        _set_job_progress(job, "processing", 5)
+
+        spans = _prepare_for_openai(path, OPENAI_FILE_HARD_LIMIT_MB, duration=job.duration_seconds)
+        parts = [p for p, _, _ in spans]
+        if not parts:
+            _set_job_progress(job, "error", 100, "AUDIO_PREP_FAILED")
+            return
+
+        results = _transcribe_parts(
+            parts,
+            language,
+            on_part_done=lambda n, total: _set_job_progress(job, "processing", 10 + int(70 * n / total)),
         )
-        return sum(int(j.duration_seconds or 0) for j in qj.all())
+        transcripts = [r.get("transcript", "") or "" for r in results]
+        detected_first = _normalize_lang(results[0].get("language_detected") or language or "es", "es")
+
+        # Las partes se solapan unos segundos: quitar las palabras repetidas al unir
+        transcript = stitch_transcripts(transcripts)
+        # Tiempos de cada parte llevados al audio original (sin duplicar el solape)
+        segments = merge_segments(
+            [(a, b, r.get("segments") or []) for (_, a, b), r in zip(spans, results)]
+        )
+        # auto: el idioma del texto (modelo local) si es claro; si no, el que dio Whisper
+        if language == "auto":
+            detected_lang = langid.resolve(transcript, hint=detected_first)
+        else:
+            detected_lang = _normalize_lang(language, "en")
+        summary = _summarize_robust(transcript, detected_lang, offline=extractive.is_offline_user(job.user_id))
+
+        job.language_detected = detected_lang
+        job.transcript = transcript
+        job.summary = summary
+        job.segments = timings.pack_segments(segments) if segments else None
+        _set_job_progress(
+            job,
+            "done" if transcript else "error",
+            100,
+            None if transcript else "ASR_EMPTY",
+        )
+
+        if transcript:
+            # Formatos de EXPORT_PRERENDER listos para la primera descarga
+            export_store.schedule_prerender(current_app._get_current_object(), job.id)
+
+        if transcript and content_sha256:
+            transcript_cache.store(
+                transcript_cache.cache_key(content_sha256, language),
+                content_sha256,
+                language,
+                transcript,
+                detected_lang,
+                summary,
+                job.duration_seconds,
+                segments=job.segments,
+            )
+
     except Exception as e:
-        current_app.logger.error("used_seconds: error leyendo jobs: %s", e)
-        return 0
+        current_app.logger.exception("pipeline job=%s SERVER_ERROR: %s", job_id, e)
+        db.session.rollback()
+        job = db.session.get(AudioJob, job_id)
+        if job:
+            _set_job_progress(job, "error", 100, "SERVER_ERROR")
+
+    finally:
+        # Directorios temporales de _prepare_for_openai (prep_*) + el del upload
+        for d in {os.path.dirname(p) for p in parts if p != path}:
+            if os.path.basename(d).startswith("prep_"):
+                shutil.rmtree(d, ignore_errors=True)
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+
+def _enqueue_celery(job: AudioJob, tmp_path: str, content_sha256: Optional[str] = None) -> None:
+    """
+    JOBS_MODE=celery: el worker lee el audio desde S3 (job.audio_s3_key),
+    así que primero subimos el archivo y luego encolamos la tarea.
+    """
+    from app.celery_app import _s3_client, enqueue_job
+
+    bucket = os.getenv("S3_BUCKET")
+    if not bucket:
+        raise RuntimeError("S3_BUCKET no está configurado (requerido por JOBS_MODE=celery).")
+
+    key = f"uploads/{job.user_id}/{job.id}/{os.path.basename(tmp_path)}"
+    _s3_client().upload_file(tmp_path, bucket, key)
+
+    job.audio_s3_key = key
+    db.session.commit()
+
+    enqueue_job(job.id, content_sha256=content_sha256)
+
+
+def _job_payload(job: AudioJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "job_id": job.id,
+        "status": job.status,
+        "progress": int(job.progress or 0),
+        "filename": job.filename,
+        "language": job.language,
+        "language_detected": job.language_detected,
+        "error_message": job.error_message,
+    }
+
+
+def _too_big():
+    return jsonify({"error": f"El archivo supera {MAX_UPLOAD_MB} MB."}), 413
+
+
+def _reserve_credits(uid: str, required_seconds: int, charge: bool = False):
+    """
+    Aparta (o cobra directo, charge=True) required_seconds del saldo con un
+    UPDATE condicional atómico. None si alcanzó (el caller hace commit junto
+    con el job); si no, la respuesta 402 lista para devolver.
+    """
+    if charge:
+        ok = credits.charge_seconds(uid, required_seconds)
+    else:
+        ok = credits.reserve_seconds(uid, required_seconds)
+    if ok:
+        return None
+
+    db.session.rollback()
+    return jsonify(
+        {
+            "error": "NO_CREDITS",
+            "required_seconds": required_seconds,
+            "remain_seconds": credits.get_remaining_seconds(uid),
+        }
+    ), 402
+
+
+def _create_job_from_cache(uid: str, filename: str, size: int, language: str, cached) -> Any:
+    """Hit de caché: se cobra igual (misma duración) pero sin ffmpeg ni OpenAI."""
+    required_seconds = int(cached.duration_seconds or 0)
+    denied = _reserve_credits(uid, required_seconds, charge=True)
+    if denied is not None:
+        return denied
+
+    now = dt.datetime.utcnow()
+    job = AudioJob(
+        user_id=uid,
+        filename=filename,
+        size_bytes=size,
+        language=language,
+        language_detected=cached.language_detected,
+        status="done",
+        progress=100,
+        transcript=cached.transcript,
+        summary=cached.summary,
+        segments=cached.segments,
+        duration_seconds=required_seconds,
+        created_at=now,
+        updated_at=now,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    body = _job_payload(job)
+    body["transcript"] = job.transcript or ""
+    body["summary"] = job.summary or ""
+    body["cached"] = True
+    return jsonify(body), 200
 
 
 @bp.route("/jobs", methods=["POST"])
@@ -338,97 +889,310 @@ def create_job():
     # ✅ Nota: la verificación ya está aplicada en _require_auth_user_id()
     # si AUTH_REQUIRE_VERIFIED_EMAIL=True
 
+    # Content-Length declarado > límite: rechazamos sin leer el body
+    if ingest.content_length_exceeds_limit(request.content_length):
+        return _too_big()
+
+    tmpdir: Optional[str] = None  # del upload; se borra si el request falla antes de pasarlo al job
     try:
-        file = request.files.get("file")
+        # El parser multipart escribe el archivo a disco por bloques (IngestFile),
+        # calculando sha256 y cortando apenas se pasa de MAX_UPLOAD_MB.
+        try:
+            file = request.files.get("file")
+            language_raw = (request.form.get("language") or "auto").strip().lower()
+        except RequestEntityTooLarge:
+            return _too_big()
+
         if not file or not file.filename:
             return jsonify({"error": "Falta archivo"}), 400
 
-        # size (sin romper stream)
-        file.stream.seek(0, os.SEEK_END)
-        size = file.stream.tell()
-        file.stream.seek(0)
+        language = "auto" if language_raw == "auto" else _normalize_lang(language_raw, "en")
 
-        if MAX_UPLOAD_MB > 0 and size > MAX_UPLOAD_MB * MB:
-            return jsonify({"error": f"El archivo supera {MAX_UPLOAD_MB} MB."}), 400
+        stream = file.stream
+        if isinstance(stream, ingest.IngestFile):
+            stream.flush()
+            tmpdir, tmp_path = stream.dir, stream.path
+            size = stream.size
+            content_sha256 = stream.sha256
+        else:
+            # request_class distinto (tests/otros WSGI): guardar y hashear aparte
+            tmpdir = tempfile.mkdtemp(prefix="polyscribe_")
+            tmp_path = os.path.join(tmpdir, secure_filename(file.filename) or "upload.bin")
+            file.save(tmp_path)
+            size = os.path.getsize(tmp_path)
+            content_sha256 = transcript_cache.file_sha256(tmp_path)
 
-        language_raw = (request.form.get("language") or "auto").strip().lower()
-        language = "auto" if language_raw == "auto" else _normalize_lang(language_raw, "en")
+        if MAX_UPLOAD_MB > 0 and size > MAX_UPLOAD_MB * MB:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            return _too_big()
 
-        tmpdir = tempfile.mkdtemp(prefix="polyscribe_")
-        tmp_path = os.path.join(tmpdir, file.filename)
-        file.save(tmp_path)
+        # Mismo audio + mismo idioma/modelos ya procesado => respuesta inmediata
+        cached = transcript_cache.lookup(transcript_cache.cache_key(content_sha256, language))
+        if cached is not None and cached.duration_seconds:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            return _create_job_from_cache(uid, file.filename, int(size), language, cached)
 
         dur = _duration_seconds(tmp_path)
 
         # En PROD: si no se puede medir, bloqueamos (para cobrar serio)
         if not dur or dur <= 0:
+            shutil.rmtree(tmpdir, ignore_errors=True)
             return jsonify({"error": "CANNOT_MEASURE_DURATION"}), 400
 
-        # Bloqueo real por créditos
-        allowance_seconds = _get_allowance_seconds(uid)
-        used_seconds = _get_used_seconds(uid)
-        remain_seconds = max(0, allowance_seconds - used_seconds)
-
+        # Bloqueo real por créditos (reserva atómica; se liberan/cobran al terminar el job)
         required_seconds = int(math.ceil(dur))
-        if required_seconds > remain_seconds:
-            return jsonify(
-                {
-                    "error": "NO_CREDITS",
-                    "required_seconds": required_seconds,
-                    "remain_seconds": remain_seconds,
-                }
-            ), 402
-
-        parts = _prepare_for_openai(tmp_path, OPENAI_FILE_HARD_LIMIT_MB)
-        if not parts:
+        denied = _reserve_credits(uid, required_seconds)
+        if denied is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            return denied
+
+        now = dt.datetime.utcnow()
+        job = AudioJob(
+            user_id=uid,
+            filename=file.filename,
+            size_bytes=int(size),
+            language=language,
+            status="queued",
+            progress=0,
+            duration_seconds=required_seconds,
+            reserved_seconds=required_seconds,
+            created_at=now,
+            updated_at=now,
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        if JOBS_MODE in ("thread", "celery"):
+            if JOBS_MODE == "thread":
+                from app.services import job_runner
+
+                if isinstance(stream, ingest.IngestFile):
+                    stream.keep()  # el tmpdir lo borra _run_job_pipeline, no el teardown
+                job_runner.submit(
+                    current_app._get_current_object(),
+                    _run_job_pipeline,
+                    job.id,
+                    tmp_path,
+                    language,
+                    cleanup_dir=tmpdir,
+                    content_sha256=content_sha256,
+                )
+                tmpdir = None  # ahora es del worker
+            else:
+                try:
+                    _enqueue_celery(job, tmp_path, content_sha256=content_sha256)
+                except Exception as e:
+                    current_app.logger.exception("create_job ENQUEUE_FAILED job=%s: %s", job.id, e)
+                    db.session.rollback()
+                    _set_job_progress(job, "error", 100, "ENQUEUE_FAILED")
+                    return jsonify({"error": "ENQUEUE_FAILED", "job_id": job.id}), 503
+                finally:
+                    shutil.rmtree(tmpdir, ignore_errors=True)
+
+            body = _job_payload(job)
+            body["poll_url"] = f"/jobs/{job.id}"
+            return jsonify(body), 202
+
+        _run_job_pipeline(job.id, tmp_path, language, cleanup_dir=tmpdir, content_sha256=content_sha256)
+        db.session.refresh(job)
+
+        if job.error_message == "AUDIO_PREP_FAILED":
             return jsonify({"error": "No se pudo preparar el audio (falta ffmpeg/archivo muy grande)."}), 400
+        if job.error_message == "SERVER_ERROR":
+            return jsonify({"error": "SERVER_ERROR"}), 500
 
-        transcripts: List[str] = []
-        detected_first = ""
+        body = _job_payload(job)
+        body["transcript"] = job.transcript or ""
+        body["summary"] = job.summary or ""
+        return jsonify(body), 200
 
-        for i, part in enumerate(parts, 1):
-            asr = _transcribe_audio(part, language)
-            if i == 1:
-                detected_first = _normalize_lang(asr.get("language_detected") or language or "es", "es")
-            transcripts.append(asr.get("transcript", "") or "")
+    except Exception as e:
+        current_app.logger.exception("create_job SERVER_ERROR: %s", e)
+        db.session.rollback()
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        return jsonify({"error": "SERVER_ERROR"}), 500
+
+
+# ---------------------------------------------------------------------------
+# Subida directa al bucket (JOBS_MODE=celery): el navegador hace PUT de las
+# partes con URLs prefirmadas y Flask sólo verifica y encola. La sesión viaja
+# firmada en upload_token (sin tabla nueva); ver app/services/upload_sessions.py.
+# ---------------------------------------------------------------------------
+def _upload_serializer() -> URLSafeTimedSerializer:
+    secret = current_app.config.get("SECRET_KEY") or os.getenv("SECRET_KEY", "dev-secret")
+    return URLSafeTimedSerializer(secret_key=secret, salt="polyscribe-direct-upload")
 
-        transcript = "\n".join(t for t in transcripts if t).strip()
-        detected_lang = detected_first if language == "auto" else _normalize_lang(language, "en")
-        summary = _summarize_robust(transcript, detected_lang)
+
+def _direct_upload_target():
+    """(cliente S3, bucket) o la respuesta 409 si la subida directa no aplica."""
+    bucket = os.getenv("S3_BUCKET")
+    if JOBS_MODE != "celery" or not bucket:
+        return None, None, (jsonify({"error": "DIRECT_UPLOAD_DISABLED"}), 409)
+    from app.celery_app import _s3_client
+
+    return _s3_client(), bucket, None
+
+
+def _load_upload_session(uid: str):
+    """Sesión del upload_token del body JSON, o la respuesta de error."""
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = _upload_serializer().loads(
+            str(data.get("upload_token") or ""), max_age=upload_sessions.UPLOAD_URL_EXPIRES
+        )
+    except BadSignature:  # incluye SignatureExpired
+        return data, None, (jsonify({"error": "UPLOAD_SESSION_INVALID"}), 400)
+    if str(upload.get("uid")) != str(uid):
+        return data, None, (jsonify({"error": "UPLOAD_SESSION_INVALID"}), 403)
+    return data, upload, None
+
+
+@bp.route("/jobs/uploads", methods=["POST"])
+def start_upload():
+    uid = _require_auth_user_id()
+    if not uid:
+        return jsonify({"error": "AUTH_REQUIRED"}), 401
+
+    client, bucket, disabled = _direct_upload_target()
+    if disabled is not None:
+        return disabled
+
+    data = request.get_json(silent=True) or {}
+    filename = str(data.get("filename") or "").strip()
+    try:
+        size = int(data.get("size") or 0)
+    except (TypeError, ValueError):
+        size = 0
+    if not filename or size <= 0:
+        return jsonify({"error": "Falta archivo"}), 400
+    if MAX_UPLOAD_MB > 0 and size > MAX_UPLOAD_MB * MB:
+        return _too_big()
+
+    language_raw = str(data.get("language") or "auto").strip().lower()
+    language = "auto" if language_raw == "auto" else _normalize_lang(language_raw, "en")
+
+    key = f"uploads/{uid}/direct/{uuid.uuid4().hex}/{secure_filename(filename) or 'upload.bin'}"
+    try:
+        plan = upload_sessions.start(client, bucket, key, size, str(data.get("content_type") or ""))
+    except Exception as e:
+        current_app.logger.exception("start_upload S3 error: %s", e)
+        return jsonify({"error": "STORAGE_UNAVAILABLE"}), 503
+
+    token = _upload_serializer().dumps(
+        {
+            "uid": uid,
+            "key": key,
+            "upload_id": plan["upload_id"],
+            "filename": filename,
+            "size": size,
+            "language": language,
+        }
+    )
+    return jsonify(
+        {
+            "upload_token": token,
+            "part_size": plan["part_size"],
+            "parts": plan["parts"],
+            "expires_in": upload_sessions.UPLOAD_URL_EXPIRES,
+        }
+    ), 201
+
+
+@bp.route("/jobs/uploads", methods=["DELETE"])
+def abort_upload():
+    uid = _require_auth_user_id()
+    if not uid:
+        return jsonify({"error": "AUTH_REQUIRED"}), 401
+
+    client, bucket, disabled = _direct_upload_target()
+    if disabled is not None:
+        return disabled
+    _, upload, error = _load_upload_session(uid)
+    if error is not None:
+        return error
+
+    upload_sessions.abort(client, bucket, upload["key"], upload["upload_id"])
+    return jsonify({"ok": True}), 200
+
+
+@bp.route("/jobs/uploads/complete", methods=["POST"])
+def complete_upload():
+    uid = _require_auth_user_id()
+    if not uid:
+        return jsonify({"error": "AUTH_REQUIRED"}), 401
+
+    client, bucket, disabled = _direct_upload_target()
+    if disabled is not None:
+        return disabled
+    data, upload, error = _load_upload_session(uid)
+    if error is not None:
+        return error
+
+    key, size, language = upload["key"], int(upload["size"]), upload["language"]
+    try:
+        upload_sessions.complete(client, bucket, key, upload["upload_id"], size, data.get("parts"))
+    except upload_sessions.UploadIncomplete as e:
+        return jsonify({"error": "UPLOAD_INCOMPLETE", "detail": str(e)}), 409
+    except Exception as e:
+        current_app.logger.exception("complete_upload S3 error key=%s: %s", key, e)
+        return jsonify({"error": "STORAGE_UNAVAILABLE"}), 503
+
+    def _discard():
+        try:
+            client.delete_object(Bucket=bucket, Key=key)
+        except Exception as e:
+            current_app.logger.warning("complete_upload: no se pudo borrar %s: %s", key, e)
+
+    try:
+        # ffprobe lee sólo la cabecera (por rangos) desde la URL prefirmada;
+        # si no responde a tiempo se mide 0 y el objeto se borra igual
+        dur = _duration_seconds(
+            upload_sessions.presigned_get(client, bucket, key), timeout=UPLOAD_PROBE_TIMEOUT_SECONDS
+        )
+        if not dur or dur <= 0:
+            _discard()
+            return jsonify({"error": "CANNOT_MEASURE_DURATION"}), 400
+
+        required_seconds = int(math.ceil(dur))
+        denied = _reserve_credits(uid, required_seconds)
+        if denied is not None:
+            _discard()
+            return denied
 
         now = dt.datetime.utcnow()
         job = AudioJob(
             user_id=uid,
-            filename=file.filename,
-            size_bytes=int(size),
+            filename=upload["filename"],
+            size_bytes=size,
             language=language,
-            language_detected=detected_lang,
-            status="done" if transcript else "error",
-            error_message=None if transcript else "ASR_EMPTY",
-            transcript=transcript,
-            summary=summary,
+            status="queued",
+            progress=0,
             duration_seconds=required_seconds,
+            reserved_seconds=required_seconds,
+            audio_s3_key=key,
             created_at=now,
             updated_at=now,
         )
         db.session.add(job)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": job.id,
-                "job_id": job.id,
-                "status": job.status,
-                "filename": file.filename,
-                "language": language,
-                "language_detected": detected_lang,
-                "transcript": transcript,
-                "summary": summary,
-            }
-        ), 200
+        try:
+            from app.celery_app import enqueue_job
+
+            enqueue_job(job.id)
+        except Exception as e:
+            current_app.logger.exception("complete_upload ENQUEUE_FAILED job=%s: %s", job.id, e)
+            db.session.rollback()
+            _set_job_progress(job, "error", 100, "ENQUEUE_FAILED")
+            return jsonify({"error": "ENQUEUE_FAILED", "job_id": job.id}), 503
+
+        body = _job_payload(job)
+        body["poll_url"] = f"/jobs/{job.id}"
+        return jsonify(body), 202
 
     except Exception as e:
-        current_app.logger.exception("create_job SERVER_ERROR: %s", e)
+        current_app.logger.exception("complete_upload SERVER_ERROR: %s", e)
         db.session.rollback()
         return jsonify({"error": "SERVER_ERROR"}), 500
 
@@ -453,38 +1217,95 @@ def get_job(job_id: str):
             "transcript": job.transcript or "",
             "summary": job.summary or "",
             "status": job.status,
+            "progress": int(job.progress or 0),
+            "error_message": job.error_message,
             "created_at": str(job.created_at),
             "updated_at": str(job.updated_at),
         }
     ), 200
 
 
+@bp.route("/jobs/<job_id>/resummarize", methods=["POST"])
+def resummarize_job(job_id: str):
+    """
+    Body JSON: { "lang": "es|en|..." }. Rehace el resumen del job en ese idioma.
+    Repetir el mismo idioma no vuelve a llamar al LLM (llm_cache).
+    """
+    uid = _require_auth_user_id()
+    if not uid:
+        return jsonify({"error": "AUTH_REQUIRED"}), 401
+
+    job = db.session.get(AudioJob, job_id)
+    if not job or str(job.user_id) != str(uid):
+        return jsonify({"error": "No existe"}), 404
+    if not (job.transcript or "").strip():
+        return jsonify({"error": "JOB_NOT_READY", "status": job.status}), 409
+
+    data = request.get_json(silent=True) or {}
+    lang = _normalize_lang(data.get("lang") or job.language_detected, "es")
+    summary = _summarize_robust(job.transcript, lang, offline=extractive.is_offline_user(uid))
+    if summary != (job.summary or ""):
+        job.summary = summary
+        db.session.commit()
+    return jsonify({"job_id": job.id, "summary": summary, "language_used": lang}), 200
+
+
+@bp.route("/jobs/<job_id>/export/<fmt>", methods=["GET"])
+def export_job(job_id: str, fmt: str):
+    """
+    Exporta un job (srt/vtt/docx/pdf) leyendo transcript/summary de la DB.
+    El archivo se genera una vez y se sirve desde la caché en disco con
+    ETag + Range (send_file conditional); ver app/services/export_store.py.
+    """
+    uid = _require_auth_user_id()
+    if not uid:
+        return jsonify({"error": "AUTH_REQUIRED"}), 401
+
+    fmt = (fmt or "").lower()
+    if fmt not in exporters.FORMATS:
+        return jsonify({"error": f"Formato no soportado: {fmt}"}), 400
+
+    job = db.session.get(AudioJob, job_id)
+    if not job or str(job.user_id) != str(uid):
+        return jsonify({"error": "No existe"}), 404
+    if job.status != "done" or not job.transcript:
+        return jsonify({"error": "JOB_NOT_READY", "status": job.status}), 409
+
+    try:
+        path, key = export_store.get_or_render(job, fmt, user_id=uid)
+    except export_pool.ExportBusy as e:
+        return jsonify({"error": "EXPORT_BUSY", "message": str(e)}), 429, {"Retry-After": "5"}
+    except export_pool.ExportTimeout as e:
+        current_app.logger.warning("export job=%s fmt=%s: %s", job_id, fmt, e)
+        return jsonify({"error": "EXPORT_TIMEOUT", "message": str(e)}), 504
+    except Exception as e:
+        current_app.logger.exception("export job=%s fmt=%s: %s", job_id, fmt, e)
+        return jsonify({"error": f"No se pudo exportar: {e}"}), 500
+
+    base = os.path.splitext(secure_filename(job.filename or "") or "resultado")[0] or "resultado"
+    resp = send_file(
+        path,
+        mimetype=exporters.FORMATS[fmt],
+        as_attachment=True,
+        download_name=f"{base}.{fmt}",
+        conditional=True,
+        etag=key,
+        max_age=0,
+    )
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
 @bp.route("/api/history", methods=["GET"])
 def history_api():
     uid = _require_auth_user_id()
     if not uid:
         return jsonify({"error": "AUTH_REQUIRED"}), 401
 
-    limit = max(1, min(200, int(request.args.get("limit", "100"))))
-    q = (
-        db.session.query(AudioJob)
-        .filter(AudioJob.user_id == uid)
-        .order_by(AudioJob.created_at.desc())
-        .limit(limit)
+    # Sólo metadatos + paginación por cursor (ver app/services/history.py)
+    items, next_cursor = history.list_jobs(
+        uid,
+        limit=history.page_size(request.args.get("limit")),
+        cursor=request.args.get("cursor"),
     )
-
-    items = []
-    for r in q.all():
-        items.append(
-            {
-                "id": r.id,
-                "job_id": r.id,
-                "filename": r.filename or "",
-                "language": r.language or "",
-                "language_detected": r.language_detected or "",
-                "status": r.status or "done",
-                "created_at": str(r.created_at),
-                "updated_at": str(r.updated_at),
-            }
-        )
-    return jsonify({"items": items}), 200
+    return jsonify({"items": items, "next_cursor": next_cursor}), 200
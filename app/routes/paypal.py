@@ -8,8 +8,8 @@ from typing import Dict, Any, Optional
 import requests
 from flask import Blueprint, current_app, jsonify, request
 
-from app import db
 from app.models_payment import Payment
+from app.services import credits
 
 # ✅ Mantener ambos Blueprints porque app/__init__.py los importa
 bp = Blueprint("paypal_pages", __name__, url_prefix="/paypal")
@@ -259,15 +259,15 @@ def paypal_capture_order():
             status="captured",
             raw_payload=cap,
         )
-        db.session.add(payment)
-        db.session.commit()
+        # Pago + saldo materializado en la misma transacción
+        credits.record_payment(payment)
 
         current_app.logger.info(
             "PAYPAL_CAPTURE_OK user=%s plan=%s minutes=%s order_id=%s",
             user_id, plan_key, minutes, order_id
         )
 
-        # ✅ usage.py ya sumará esto automáticamente (paid_min)
+        # ✅ /api/usage/balance ya refleja estos minutos (user_balances)
         return jsonify({"ok": True, "user_id": user_id, "credited_minutes": minutes})
 
     except Exception as e:
@@ -5,9 +5,8 @@ import os
 
 from flask import Blueprint, current_app, jsonify, request, session
 
-from app import db
-from app.models import AudioJob
-from app.models_payment import Payment
+from app.extensions import db
+from app.services import credits
 
 bp = Blueprint("usage", __name__, url_prefix="/api/usage")
 
@@ -30,39 +29,18 @@ def _get_user_id() -> str:
 @bp.get("/balance")
 def usage_balance():
     user_id = _get_user_id()
-    free_min = int(current_app.config.get("FREE_TIER_MINUTES", 10))
-
-    # Minutos pagados (captured)
-    paid_min = 0
-    try:
-        q = db.session.query(Payment).filter(
-            Payment.user_id == user_id,
-            Payment.status == "captured",
-        )
-        paid_min = sum(int(p.minutes or 0) for p in q.all())
-    except Exception as e:
-        current_app.logger.error("usage_balance: error leyendo pagos: %s", e)
-        paid_min = 0
-
-    # Segundos usados (sumando duration_seconds de jobs por user)
-    used_seconds = 0
-    try:
-        qj = db.session.query(AudioJob).filter(AudioJob.user_id == user_id)
-        used_seconds = sum(int(j.duration_seconds or 0) for j in qj.all())
-    except Exception as e:
-        current_app.logger.error("usage_balance: error leyendo jobs: %s", e)
-        used_seconds = 0
-
-    allowance_min = free_min + paid_min
-    allowance_seconds = int(allowance_min * 60)
+    # Saldo materializado (lookup por PK); mismo criterio que POST /jobs.
+    # Lo reservado por jobs en curso ya cuenta como usado para el badge.
+    balance = credits.get_balance(user_id)
+    db.session.commit()  # la primera lectura materializa la fila de user_balances
+    used_seconds = balance["used_seconds"] + balance["reserved_seconds"]
+    allowance_seconds = balance["allowance_seconds"]
 
     current_app.logger.info(
-        "USAGE_BALANCE uid=%s used_seconds=%s allowance_seconds=%s free_min=%s paid_min=%s",
+        "USAGE_BALANCE uid=%s used_seconds=%s allowance_seconds=%s",
         user_id,
         used_seconds,
         allowance_seconds,
-        free_min,
-        paid_min,
     )
 
     return jsonify(
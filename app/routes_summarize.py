@@ -16,12 +16,12 @@ except Exception:
         except Exception:
             return None
 
-# OpenAI client (opcional; si no está, devolvemos error amigable)
-try:
-    from openai import OpenAI
-    _client = OpenAI()
-except Exception:
-    _client = None
+# OpenAI client compartido (opcional; si no está, devolvemos error amigable)
+from app.services import llm_cache, provider, ratelimit
+from app.services.openai_client import get_client
+
+# Subir si cambia el prompt (invalida llm_cache)
+PROMPT_VERSION = "1"
 
 @bp.post("/summarize")
 def summarize_api():
@@ -47,29 +47,36 @@ def summarize_api():
     if not (job.transcript and job.transcript.strip()):
         return jsonify({"ok": False, "error": "no_transcript"}), 400
 
-    if not _client:
-        return jsonify({"ok": False, "error": "openai_not_available"}), 503
-
     # Modelo ligero para resumen
     model = os.getenv("SUMMARIZER_MODEL", "gpt-4o-mini")
+    transcript = job.transcript.strip()
+
+    # Ya resumido (mismo texto, idioma, modelo y prompt): sin llamar al LLM
+    key = llm_cache.make_key("summary:api", transcript, lang, model, PROMPT_VERSION, 0.3)
+    summary = llm_cache.get(key)
+
+    client = get_client()
+    if summary is None and not client:
+        return jsonify({"ok": False, "error": "openai_not_available"}), 503
 
     prompt = (
         f"Resumen conciso en {lang} del siguiente texto. "
         "Devuelve 5–8 viñetas con lo esencial y, si procede, acciones clave.\n\n"
-        f"Texto:\n{job.transcript.strip()}\n"
+        f"Texto:\n{transcript}\n"
     )
 
     try:
-        # puedes usar responses.create si prefieres
-        chat = _client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "Eres un asistente que resume transcripciones con claridad."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-        )
-        summary = (chat.choices[0].message.content or "").strip()
+        if summary is None:
+            chat = provider.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "Eres un asistente que resume transcripciones con claridad."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.3,
+            )
+            summary = (chat.choices[0].message.content or "").strip()
+            llm_cache.put(key, summary, "summary:api")
 
         job.summary = summary
         db.session.commit()
@@ -77,5 +84,10 @@ def summarize_api():
         return jsonify({"ok": True, "job_id": job.id, "summary": summary}), 200
 
     except Exception as e:
+        # provider.chat ya pasó por el limitador y agotó sus reintentos: 429 para el cliente
+        wait = ratelimit.retry_after(e)
+        if wait is not None:
+            current_app.logger.warning("summarize rate limited (%.1fs): %s", wait, e)
+            return jsonify({"ok": False, "error": "rate_limited"}), 429, {"Retry-After": str(max(1, int(wait + 0.999)))}
         current_app.logger.exception("summarize failed: %s", e)
         return jsonify({"ok": False, "error": "summarize_failed", "detail": str(e)}), 500
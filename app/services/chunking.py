@@ -0,0 +1,178 @@
+# app/services/chunking.py
+# -*- coding: utf-8 -*-
+"""
+Planificación de cortes de audio y unión de transcripciones por partes.
+
+Funciones públicas:
+    parse_silencedetect(stderr) -> [(inicio, fin), ...]
+    plan_chunks(duration, silences, max_seconds, ...) -> [(inicio, fin), ...]
+    stitch_transcripts(texts, ...) -> str
+    merge_segments(parts) -> [(inicio, fin, texto), ...]
+
+Comportamiento:
+  - Los cortes se buscan en el silencio más largo dentro de una ventana antes
+    del límite de cada parte; si no hay silencio se corta "a ciegas" en el límite.
+  - Cada parte (salvo la primera) empieza overlap_seconds antes del corte, así
+    ninguna palabra queda partida; stitch_transcripts elimina después las
+    palabras repetidas en la zona solapada.
+  - Sin dependencias externas (sólo parsea la salida de ffmpeg silencedetect).
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+_RE_SIL_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_RE_SIL_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+_RE_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def parse_silencedetect(stderr: str, duration: Optional[float] = None) -> List[Tuple[float, float]]:
+    """
+    Extrae los intervalos de silencio de la salida (stderr) de
+    `ffmpeg -af silencedetect -f null -`. Un silence_start sin silence_end
+    (silencio hasta el final) se cierra con 'duration' si se conoce.
+    """
+    silences: List[Tuple[float, float]] = []
+    start: Optional[float] = None
+    for line in (stderr or "").splitlines():
+        m = _RE_SIL_START.search(line)
+        if m:
+            start = max(0.0, float(m.group(1)))
+            continue
+        m = _RE_SIL_END.search(line)
+        if m and start is not None:
+            end = float(m.group(1))
+            if end > start:
+                silences.append((start, end))
+            start = None
+    if start is not None and duration and duration > start:
+        silences.append((start, float(duration)))
+    return silences
+
+
+def plan_chunks(
+    duration: float,
+    silences: Sequence[Tuple[float, float]],
+    max_seconds: float,
+    overlap_seconds: float = 1.5,
+    search_seconds: float = 30.0,
+) -> List[Tuple[float, float]]:
+    """
+    Devuelve los tramos (inicio, fin) en segundos a extraer. Ningún tramo
+    supera max_seconds contando el solape, para no pasarse del límite de
+    tamaño que se usó para calcular max_seconds.
+    """
+    duration = float(duration or 0.0)
+    max_seconds = float(max_seconds)
+    overlap = max(0.0, min(float(overlap_seconds), max_seconds / 4.0))
+    if duration <= 0 or duration <= max_seconds:
+        return [(0.0, duration)] if duration > 0 else []
+
+    cuts: List[float] = []
+    prev = 0.0
+    while duration - prev > max_seconds - (overlap if cuts else 0.0):
+        limit = prev + max_seconds - (overlap if cuts else 0.0)
+        lo = max(prev + overlap + 1.0, limit - float(search_seconds))
+
+        best: Optional[Tuple[float, float]] = None  # (largo, punto medio)
+        for s, e in silences:
+            if e <= lo:
+                continue
+            if s >= limit:
+                break
+            a, b = max(s, lo), min(e, limit)
+            if b <= a:
+                continue
+            cand = (b - a, (a + b) / 2.0)
+            if best is None or cand > best:
+                best = cand
+
+        cut = best[1] if best else limit
+        cuts.append(cut)
+        prev = cut
+
+    spans: List[Tuple[float, float]] = []
+    start = 0.0
+    for cut in cuts:
+        spans.append((round(max(0.0, start), 3), round(cut, 3)))
+        start = cut - overlap
+    spans.append((round(max(0.0, start), 3), round(duration, 3)))
+    return spans
+
+
+def _norm_words(text: str) -> List[str]:
+    return [w.lower() for w in _RE_WORD.findall(text or "")]
+
+
+def _overlap_len(prev_words: List[str], next_words: List[str], max_words: int, max_skip: int) -> int:
+    """
+    Cuántas palabras iniciales de next_words repiten el final de prev_words.
+    Se permite saltar hasta max_skip palabras al inicio de next_words (la
+    palabra cortada justo en el borde suele salir mal transcrita).
+    Devuelve 0 si no hay coincidencia fiable.
+    """
+    tail = prev_words[-max_words:]
+    for k in range(min(len(tail), len(next_words), max_words), 0, -1):
+        for skip in range(0, max_skip + 1):
+            head = next_words[skip:skip + k]
+            if len(head) < k:
+                continue
+            if head == tail[-k:]:
+                # 1 sola palabra sólo si es "larga" (evita "y", "de", "the"...)
+                if k == 1 and len(head[0]) < 5:
+                    continue
+                return skip + k
+    return 0
+
+
+def stitch_transcripts(
+    texts: Sequence[str],
+    max_overlap_words: int = 40,
+    max_skip_words: int = 2,
+    sep: str = "\n",
+) -> str:
+    """
+    Une las transcripciones de partes consecutivas quitando del inicio de
+    cada parte las palabras que ya aparecen al final de la anterior (zona
+    solapada). Las partes vacías se ignoran.
+    """
+    out: List[str] = []
+    prev_words: List[str] = []
+    for raw in texts:
+        text = (raw or "").strip()
+        if not text:
+            continue
+        if prev_words:
+            n = _overlap_len(prev_words, _norm_words(text), max_overlap_words, max_skip_words)
+            if n:
+                # Recortar n palabras del texto original conservando la puntuación posterior.
+                matches = list(_RE_WORD.finditer(text))
+                cut_at = matches[n - 1].end() if n <= len(matches) else len(text)
+                text = text[cut_at:].lstrip(" ,;:.!?-—–").strip()
+                if not text:
+                    continue
+        out.append(text)
+        prev_words = (prev_words + _norm_words(text))[-max_overlap_words:]
+    return sep.join(out).strip()
+
+
+def merge_segments(
+    parts: Sequence[Tuple[float, float, Sequence[Tuple[float, float, str]]]],
+) -> List[Tuple[float, float, str]]:
+    """
+    Une los segmentos con tiempos de cada parte en la línea de tiempo del
+    audio original. parts = [(inicio, fin, segmentos relativos a la parte)].
+    En la zona solapada entre dos partes cada segmento se queda en una sola:
+    el corte es el punto medio del solape (según el centro del segmento).
+    """
+    out: List[Tuple[float, float, str]] = []
+    for i, (start, end, segments) in enumerate(parts):
+        lo = (start + parts[i - 1][1]) / 2.0 if i > 0 else float("-inf")
+        hi = (parts[i + 1][0] + end) / 2.0 if i + 1 < len(parts) else float("inf")
+        for s, e, text in segments:
+            a, b = start + s, start + e
+            if lo <= (a + b) / 2.0 < hi:
+                out.append((a, b, text))
+    return out
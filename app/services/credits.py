@@ -1,28 +1,273 @@
 from __future__ import annotations
+
+from typing import Dict, Optional
+
+import click
 from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
 from app.extensions import db
 from app.models import AudioJob
+from app.models_balance import UserBalance
 from app.models_payment import Payment
 
-def get_allowance_seconds(user_id: str) -> int:
-    free_min = int(current_app.config.get("FREE_TIER_MINUTES", 10))
+# Saldo de créditos (segundos) de un usuario.
+#
+# El saldo vive materializado en user_balances (una fila por usuario) y se
+# mantiene de forma incremental; leerlo es un lookup por PK. La fila se crea
+# la primera vez desde el historial (SUM() sobre Payment/AudioJob, sólo las
+# columnas necesarias) y `flask credits-reconcile` la reconstruye igual.
+#
+# Criterio único para toda la app (POST /jobs, /api/usage/balance):
+#   - permitido = FREE_TIER_MINUTES + minutos de pagos "captured"
+#   - usado     = duration_seconds de jobs en estado "done"
+#   - reservado = segundos apartados por jobs que todavía no terminaron
+#
+# Ciclo de un job:
+#   reserve_seconds()  al crearlo (UPDATE condicional: dos uploads simultáneos
+#                      no pueden gastar el mismo saldo)
+#   settle_job()       al pasar a done/error (libera la reserva y, si terminó
+#                      bien, suma duration_seconds a usado). La transición es
+#                      un UPDATE ... WHERE status NOT IN (done, error): si dos
+#                      procesos cierran el mismo job, sólo uno toca el saldo.
+
+FINAL_STATUSES = ("done", "error")
+
 
-    paid_min = 0
-    q = db.session.query(Payment).filter(
-        Payment.user_id == user_id,
-        Payment.status == "captured",
+def _free_seconds() -> int:
+    return int(current_app.config.get("FREE_TIER_MINUTES", 10)) * 60
+
+
+# -----------------------------------------------------------------------------
+# Historial (agregados)
+# -----------------------------------------------------------------------------
+def get_paid_minutes(user_id: str) -> int:
+    total = (
+        db.session.query(func.coalesce(func.sum(Payment.minutes), 0))
+        .filter(Payment.user_id == str(user_id), Payment.status == "captured")
+        .scalar()
+    )
+    return int(total or 0)
+
+
+def _history_totals(user_id: str) -> Dict[str, int]:
+    used = (
+        db.session.query(func.coalesce(func.sum(AudioJob.duration_seconds), 0))
+        .filter(AudioJob.user_id == str(user_id), AudioJob.status == "done")
+        .scalar()
+    )
+    reserved = (
+        db.session.query(func.coalesce(func.sum(AudioJob.reserved_seconds), 0))
+        .filter(AudioJob.user_id == str(user_id), AudioJob.status.notin_(FINAL_STATUSES))
+        .scalar()
     )
-    paid_min = sum(int(p.minutes or 0) for p in q.all())
+    return {
+        "allowance_seconds": _free_seconds() + get_paid_minutes(user_id) * 60,
+        "used_seconds": int(used or 0),
+        "reserved_seconds": int(reserved or 0),
+    }
+
+
+# -----------------------------------------------------------------------------
+# Saldo materializado
+# -----------------------------------------------------------------------------
+def ensure_balance(user_id: str) -> UserBalance:
+    """
+    Fila de user_balances del usuario; si no existe se crea desde el historial
+    dentro de un SAVEPOINT (sin commit: se confirma con la transacción del
+    caller). Llamar ANTES de agregar a la sesión el pago/job que se va a
+    contabilizar, para no contarlo dos veces.
+    """
+    uid = str(user_id)
+    row = db.session.get(UserBalance, uid)
+    if row is not None:
+        return row
+
+    row = UserBalance(user_id=uid, version=0, **_history_totals(uid))
+    try:
+        with db.session.begin_nested():
+            db.session.add(row)
+    except IntegrityError:
+        # Otro request la creó a la vez: sólo se deshace el savepoint; usamos esa
+        row = db.session.get(UserBalance, uid)
+    return row
+
+
+def _apply(user_id: str, condition=None, **deltas: int) -> bool:
+    """
+    UPDATE atómico col = col + delta (sin leer antes) con condición opcional.
+    No hace commit: el cambio va en la misma transacción que el pago/job.
+    """
+    values = {name: getattr(UserBalance, name) + int(delta) for name, delta in deltas.items()}
+    values["version"] = UserBalance.version + 1
+    values["updated_at"] = func.now()
+
+    stmt = update(UserBalance).where(UserBalance.user_id == str(user_id))
+    if condition is not None:
+        stmt = stmt.where(condition)
+    stmt = stmt.values(**values).execution_options(synchronize_session=False)
+    return db.session.execute(stmt).rowcount == 1
+
+
+def _available_expr():
+    return UserBalance.allowance_seconds - UserBalance.used_seconds - UserBalance.reserved_seconds
+
+
+def get_balance(user_id: str) -> Dict[str, int]:
+    """allowance/used/reserved/remaining en segundos (lookup por PK)."""
+    row = ensure_balance(user_id)
+    db.session.refresh(row)
+    allow = int(row.allowance_seconds or 0)
+    used = int(row.used_seconds or 0)
+    reserved = int(row.reserved_seconds or 0)
+    return {
+        "allowance_seconds": allow,
+        "used_seconds": used,
+        "reserved_seconds": reserved,
+        "remaining_seconds": max(0, allow - used - reserved),
+    }
+
+
+def get_allowance_seconds(user_id: str) -> int:
+    return get_balance(user_id)["allowance_seconds"]
 
-    allowance_seconds = int((free_min + paid_min) * 60)
-    return allowance_seconds
 
 def get_used_seconds(user_id: str) -> int:
-    qj = db.session.query(AudioJob).filter(AudioJob.user_id == user_id)
-    used_seconds = sum(int(j.duration_seconds or 0) for j in qj.all())
-    return int(used_seconds)
+    return get_balance(user_id)["used_seconds"]
+
 
 def get_remaining_seconds(user_id: str) -> int:
-    allow = get_allowance_seconds(user_id)
-    used = get_used_seconds(user_id)
-    return max(0, allow - used)
+    return get_balance(user_id)["remaining_seconds"]
+
+
+def record_payment(payment: Payment) -> None:
+    """Guarda un pago y, si está "captured", suma sus minutos al saldo (misma transacción)."""
+    ensure_balance(payment.user_id)
+    db.session.add(payment)
+    if payment.status == "captured":
+        _apply(payment.user_id, allowance_seconds=int(payment.minutes or 0) * 60)
+    db.session.commit()
+
+
+def reserve_seconds(user_id: str, seconds: int) -> bool:
+    """
+    Aparta 'seconds' si hay saldo disponible; False si no alcanza. El chequeo y
+    la reserva son un único UPDATE ... WHERE disponible >= seconds. El caller
+    hace commit junto con el job (guardando job.reserved_seconds).
+    """
+    ensure_balance(user_id)
+    seconds = int(seconds)
+    return _apply(user_id, _available_expr() >= seconds, reserved_seconds=seconds)
+
+
+def charge_seconds(user_id: str, seconds: int) -> bool:
+    """Como reserve_seconds pero cobrando directo (jobs que nacen "done", p.ej. caché)."""
+    ensure_balance(user_id)
+    seconds = int(seconds)
+    return _apply(user_id, _available_expr() >= seconds, used_seconds=seconds)
+
+
+def settle_job(job: AudioJob, status: str) -> bool:
+    """
+    Job que pasa a done/error: libera su reserva y, si terminó bien, cobra
+    duration_seconds. Llamar ANTES de asignar job.status (el caller hace
+    commit). La transición es un UPDATE condicional sobre audio_jobs; False
+    si el job ya estaba en done/error (otro proceso lo cerró): el saldo no
+    se toca y el caller no debe pisar ese estado.
+    """
+    if status not in FINAL_STATUSES:
+        return False
+    if job.status in FINAL_STATUSES:
+        return False
+    ensure_balance(job.user_id)
+    stmt = (
+        update(AudioJob)
+        .where(AudioJob.id == job.id, AudioJob.status.notin_(FINAL_STATUSES))
+        .values(status=status, reserved_seconds=0)
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(stmt).rowcount != 1:
+        return False
+    reserved = int(job.reserved_seconds or 0)
+    used = int(job.duration_seconds or 0) if status == "done" else 0
+    if reserved or used:
+        _apply(job.user_id, reserved_seconds=-reserved, used_seconds=used)
+    job.reserved_seconds = 0
+    return True
+
+
+# -----------------------------------------------------------------------------
+# Reconciliación: flask credits-reconcile [--user-id X]
+# -----------------------------------------------------------------------------
+def reconcile(user_id: Optional[str] = None) -> int:
+    """
+    Reconstruye user_balances desde el historial (todos los usuarios o uno).
+    Devuelve cuántas filas cambiaron.
+    """
+    free = _free_seconds()
+
+    def _grouped(q, col):
+        q = q.filter(col == str(user_id)) if user_id else q
+        return {str(k): int(v or 0) for k, v in q.group_by(col).all()}
+
+    paid = _grouped(
+        db.session.query(Payment.user_id, func.sum(Payment.minutes)).filter(Payment.status == "captured"),
+        Payment.user_id,
+    )
+    used = _grouped(
+        db.session.query(AudioJob.user_id, func.sum(AudioJob.duration_seconds)).filter(AudioJob.status == "done"),
+        AudioJob.user_id,
+    )
+    reserved = _grouped(
+        db.session.query(AudioJob.user_id, func.sum(AudioJob.reserved_seconds)).filter(
+            AudioJob.status.notin_(FINAL_STATUSES)
+        ),
+        AudioJob.user_id,
+    )
+
+    q = db.session.query(UserBalance)
+    if user_id:
+        q = q.filter(UserBalance.user_id == str(user_id))
+    rows = {r.user_id: r for r in q.all()}
+
+    uids = set(paid) | set(used) | set(reserved) | set(rows)
+    if user_id:
+        uids.add(str(user_id))
+
+    changed = 0
+    for uid in uids:
+        want = {
+            "allowance_seconds": free + paid.get(uid, 0) * 60,
+            "used_seconds": used.get(uid, 0),
+            "reserved_seconds": reserved.get(uid, 0),
+        }
+        row = rows.get(uid)
+        if row is None:
+            db.session.add(UserBalance(user_id=uid, version=0, **want))
+            changed += 1
+            continue
+        if any(int(getattr(row, k) or 0) != v for k, v in want.items()):
+            current_app.logger.warning(
+                "credits-reconcile uid=%s %s -> %s",
+                uid,
+                {k: int(getattr(row, k) or 0) for k in want},
+                want,
+            )
+            for k, v in want.items():
+                setattr(row, k, v)
+            row.version = int(row.version or 0) + 1
+            changed += 1
+
+    db.session.commit()
+    return changed
+
+
+@click.command("credits-reconcile")
+@click.option("--user-id", default=None, help="Sólo este usuario (por defecto, todos).")
+@with_appcontext
+def reconcile_command(user_id: Optional[str]) -> None:
+    """Reconstruye user_balances desde pagos y jobs."""
+    changed = reconcile(user_id)
+    click.echo(f"user_balances: {changed} fila(s) actualizada(s)")
@@ -0,0 +1,205 @@
+# app/services/export_pool.py
+# -*- coding: utf-8 -*-
+"""
+Pool de procesos para generar PDF / DOCX fuera del hilo del request.
+
+reportlab y el writer DOCX son CPU puro y retienen el GIL: un PDF grande
+generado en el hilo de gunicorn frena al resto de requests del mismo worker.
+Aquí se generan en procesos aparte (otros núcleos); el hilo del request solo
+espera el resultado. SRT / VTT son baratos y se siguen generando en el hilo.
+
+Funciones públicas:
+    render(fmt, transcript, summary, segments=None, user_id=None) -> bytes
+    warm()        arranca el pool (cada proceso ya importa reportlab/exporters)
+
+Errores:
+    ExportBusy     el usuario ya tiene EXPORT_MAX_PER_USER exportaciones en curso (-> 429)
+    ExportTimeout  la generación superó EXPORT_TIMEOUT_SECONDS (-> 504)
+
+Comportamiento:
+  - Procesos con contexto 'forkserver' (o 'spawn'): no se hace fork de un
+    worker con hilos y sockets abiertos.
+  - El límite por usuario es por proceso web (como ASR_MAX_IN_FLIGHT) y el
+    cupo se libera cuando el proceso termina de generar, no al expirar el
+    timeout: un PDF colgado sigue contando.
+  - Si el pool está desactivado (EXPORT_POOL_WORKERS=0) o el proceso actual
+    es daemon (worker prefork de celery, no puede tener hijos) se genera en línea.
+
+Variables de entorno:
+    EXPORT_POOL_WORKERS     procesos del pool (default min(2, núcleos); 0 = sin pool)
+    EXPORT_TIMEOUT_SECONDS  espera máxima por archivo (default 120)
+    EXPORT_MAX_PER_USER     exportaciones simultáneas por usuario (default 2)
+    EXPORT_POOL_PREWARM     "1" (default) run_auth_wrapper.py (gunicorn) arranca el pool al
+                            cargar; en otro caso se crea en el primer render PDF/DOCX
+"""
+
+from __future__ import annotations
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from app.services import exporters, timings
+
+log = logging.getLogger(__name__)
+
+EXPORT_POOL_WORKERS = int(os.getenv("EXPORT_POOL_WORKERS", str(min(2, os.cpu_count() or 1))) or 0)
+EXPORT_TIMEOUT_SECONDS = float(os.getenv("EXPORT_TIMEOUT_SECONDS", "120") or 120)
+EXPORT_MAX_PER_USER = int(os.getenv("EXPORT_MAX_PER_USER", "2") or 2)
+EXPORT_POOL_PREWARM = os.getenv("EXPORT_POOL_PREWARM", "1") == "1"
+
+# Formatos que vale la pena mandar a otro proceso
+_POOL_FORMATS = ("docx", "pdf")
+
+
+class ExportBusy(RuntimeError):
+    pass
+
+
+class ExportTimeout(RuntimeError):
+    pass
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_lock = threading.Lock()
+_in_flight: Dict[str, int] = {}
+_in_flight_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Lado del proceso hijo
+# ---------------------------------------------------------------------------
+def _init_worker() -> None:
+    """
+    Initializer de cada hijo: reportlab/exporters ya quedan importados al
+    cargar este módulo; un PDF/DOCX mínimo carga fuentes y caches.
+    """
+    try:
+        exporters.build_pdf("warm", "")
+        exporters.build_docx("warm", "")
+    except Exception as e:  # pragma: no cover
+        log.warning("export_pool: warm-up falló: %s", e)
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+def _render_in_child(fmt: str, transcript: str, summary: str) -> bytes:
+    return exporters.render(fmt, transcript, summary)
+
+
+# ---------------------------------------------------------------------------
+# Lado del proceso web
+# ---------------------------------------------------------------------------
+def _enabled() -> bool:
+    return EXPORT_POOL_WORKERS > 0 and not multiprocessing.current_process().daemon
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _lock:
+            if _executor is None or _executor_pid != pid:
+                methods = multiprocessing.get_all_start_methods()
+                ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _executor = ProcessPoolExecutor(
+                    max_workers=EXPORT_POOL_WORKERS,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    """Un hijo murió (OOM, segfault): el pool queda inutilizable, se crea otro en la próxima llamada."""
+    global _executor
+    with _lock:
+        if _executor is broken:
+            _executor = None
+    try:
+        broken.shutdown(wait=False, cancel_futures=True)
+    except Exception:
+        pass
+
+
+def warm() -> None:
+    """Arranca todos los procesos del pool sin esperar (no bloquea create_app)."""
+    if not _enabled():
+        return
+    try:
+        ex = _get_executor()
+        for _ in range(EXPORT_POOL_WORKERS):
+            ex.submit(_noop)
+    except Exception as e:
+        log.warning("export_pool: no se pudo pre-arrancar el pool: %s", e)
+
+
+def _acquire(user_id: Optional[str]) -> None:
+    if not user_id or EXPORT_MAX_PER_USER <= 0:
+        return
+    with _in_flight_lock:
+        n = _in_flight.get(user_id, 0)
+        if n >= EXPORT_MAX_PER_USER:
+            raise ExportBusy(f"Ya tienes {n} exportaciones en curso; espera a que terminen.")
+        _in_flight[user_id] = n + 1
+
+
+def _release(user_id: Optional[str]) -> None:
+    if not user_id or EXPORT_MAX_PER_USER <= 0:
+        return
+    with _in_flight_lock:
+        n = _in_flight.get(user_id, 0) - 1
+        if n > 0:
+            _in_flight[user_id] = n
+        else:
+            _in_flight.pop(user_id, None)
+
+
+def render(
+    fmt: str,
+    transcript: str,
+    summary: str,
+    segments: Optional[List[timings.Segment]] = None,
+    user_id: Optional[str] = None,
+) -> bytes:
+    """
+    Igual que exporters.render, pero PDF/DOCX se generan en el pool.
+    user_id (opcional) aplica EXPORT_MAX_PER_USER; sin él no hay límite
+    (p.ej. prerender en segundo plano).
+    """
+    if fmt not in _POOL_FORMATS or not _enabled():
+        return exporters.render(fmt, transcript, summary, segments)
+
+    uid = str(user_id) if user_id else None
+    _acquire(uid)
+    ex: Optional[ProcessPoolExecutor] = None
+    try:
+        ex = _get_executor()
+        fut: Future = ex.submit(_render_in_child, fmt, transcript, summary)
+    except BrokenProcessPool:
+        _release(uid)
+        if ex is not None:
+            _reset_executor(ex)
+        raise
+    except Exception:
+        _release(uid)
+        raise
+    fut.add_done_callback(lambda _f: _release(uid))
+
+    try:
+        return fut.result(timeout=EXPORT_TIMEOUT_SECONDS if EXPORT_TIMEOUT_SECONDS > 0 else None)
+    except FutureTimeout:
+        fut.cancel()  # si aún no empezó, no se genera
+        raise ExportTimeout(f"La exportación {fmt} tardó más de {EXPORT_TIMEOUT_SECONDS:.0f}s.")
+    except BrokenProcessPool:
+        _reset_executor(ex)
+        raise
@@ -0,0 +1,158 @@
+# app/services/export_store.py
+# -*- coding: utf-8 -*-
+"""
+Caché en disco de archivos exportados por job (GET /jobs/<id>/export/<fmt>).
+
+Cada archivo se genera una sola vez y queda guardado con nombre direccionado
+por contenido: sha256(job.id | job.updated_at | fmt | EXPORT_RENDER_VERSION).
+Si el job cambia, cambia updated_at y con él la clave, así que nunca se sirve
+un archivo viejo; las descargas repetidas son un send_file de un archivo
+estático (ETag = la clave, Range / If-None-Match los resuelve Werkzeug).
+
+Funciones públicas:
+    artifact_key(job, fmt) -> str
+    get_or_render(job, fmt, user_id=None) -> (path, key)   (PDF/DOCX en export_pool)
+    prerender(job_id)                 (todos los EXPORT_PRERENDER)
+    schedule_prerender(app, job_id)   (en segundo plano, vía job_runner)
+
+Variables de entorno:
+    EXPORT_CACHE_DIR     carpeta de la caché (default <tmp>/polyscribe_exports)
+    EXPORT_CACHE_MAX_MB  tamaño máximo; al superarlo se borran los menos usados (default 512)
+    EXPORT_PRERENDER     formatos a generar al terminar un job, p.ej. "pdf,docx" (default vacío)
+"""
+
+from __future__ import annotations
+
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+
+from app.extensions import db
+from app.models import AudioJob
+from app.services import export_pool, exporters, timings
+
+log = logging.getLogger(__name__)
+
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "polyscribe_exports")
+EXPORT_CACHE_MAX_MB = float(os.getenv("EXPORT_CACHE_MAX_MB", "512") or 512)
+EXPORT_PRERENDER = [
+    f.strip().lower()
+    for f in (os.getenv("EXPORT_PRERENDER", "") or "").split(",")
+    if f.strip().lower() in exporters.FORMATS
+]
+
+# Subir cuando cambie el formato de salida (plantillas, motores) para no servir archivos viejos.
+EXPORT_RENDER_VERSION = "2"  # 2: motores PDF/DOCX rápidos (exporters.py)
+
+_evict_lock = threading.Lock()
+
+
+def artifact_key(job: AudioJob, fmt: str) -> str:
+    updated = job.updated_at.isoformat() if job.updated_at else ""
+    raw = "|".join([str(job.id), updated, fmt, EXPORT_RENDER_VERSION])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _artifact_path(key: str, fmt: str) -> str:
+    # Subcarpeta por prefijo para no tener miles de archivos en un directorio
+    return os.path.join(EXPORT_CACHE_DIR, key[:2], f"{key}.{fmt}")
+
+
+def _render_bytes(job: AudioJob, fmt: str, user_id: Optional[str] = None) -> bytes:
+    segments = timings.unpack_segments(job.segments) if fmt in ("srt", "vtt") else None
+    return export_pool.render(fmt, job.transcript or "", job.summary or "", segments, user_id=user_id)
+
+
+def get_or_render(job: AudioJob, fmt: str, user_id: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Ruta del archivo ya generado (lo genera si falta) y su clave/ETag.
+    La escritura es atómica (tmp + os.replace): dos requests a la vez pueden
+    generarlo ambos, pero nunca se sirve un archivo a medio escribir.
+    user_id aplica el límite de exportaciones simultáneas de export_pool
+    (ExportBusy / ExportTimeout); el prerender no lo pasa.
+    """
+    key = artifact_key(job, fmt)
+    path = _artifact_path(key, fmt)
+    if os.path.exists(path):
+        try:
+            os.utime(path, None)  # "último uso" para la evicción LRU
+        except OSError:
+            pass
+        return path, key
+
+    data = _render_bytes(job, fmt, user_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+    _evict()
+    return path, key
+
+
+def _evict() -> None:
+    """Si la caché supera EXPORT_CACHE_MAX_MB, borra por mtime (último uso) más antiguo."""
+    max_bytes = int(EXPORT_CACHE_MAX_MB * 1024 * 1024)
+    if max_bytes <= 0 or not _evict_lock.acquire(blocking=False):
+        return
+    try:
+        files: List[Tuple[float, int, str]] = []
+        total = 0
+        for root, _, names in os.walk(EXPORT_CACHE_DIR):
+            for n in names:
+                p = os.path.join(root, n)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        if total <= max_bytes:
+            return
+        removed = 0
+        for _, size, p in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(p)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        log.info("export_store: %d archivos expulsados (LRU)", removed)
+    finally:
+        _evict_lock.release()
+
+
+def prerender(job_id: str) -> None:
+    """Genera los formatos de EXPORT_PRERENDER de un job terminado. Nunca lanza."""
+    if not EXPORT_PRERENDER:
+        return
+    job = db.session.get(AudioJob, job_id)
+    if not job or job.status != "done" or not job.transcript:
+        return
+    for fmt in EXPORT_PRERENDER:
+        try:
+            get_or_render(job, fmt)
+        except Exception as e:
+            log.warning("export_store: prerender %s job=%s falló: %s", fmt, job_id, e)
+
+
+def schedule_prerender(app, job_id: str) -> None:
+    """prerender en el pool de job_runner (no bloquea la respuesta ni el pipeline)."""
+    if not EXPORT_PRERENDER:
+        return
+    from app.services import job_runner
+
+    job_runner.submit(app, prerender, job_id)
@@ -0,0 +1,403 @@
+# app/services/exporters.py
+# -*- coding: utf-8 -*-
+"""
+Generación de archivos de exportación (SRT / VTT / DOCX / PDF) a partir de
+transcript + summary (y, para subtítulos, los tiempos por segmento).
+
+La usan POST /api/exports/<fmt> (texto enviado por el front) y
+GET /jobs/<id>/export/<fmt> (lee el job; ver app/services/export_store.py).
+
+Funciones públicas:
+    render(fmt, transcript, summary, segments=None) -> bytes
+    build_srt / build_vtt / build_docx / build_pdf
+    FORMATS: fmt -> mimetype
+"""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
+from xml.sax.saxutils import escape as xml_escape
+
+# PDF (añade a tu venv: pip install reportlab). El DOCX se escribe directo (zip + XML).
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib import colors
+
+from app.services import timings
+
+FORMATS = {
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+
+def build_srt(transcript: str, segments: Optional[List[timings.Segment]] = None) -> str:
+    """
+    Con segments (tiempos reales de Whisper) => un cue por segmento.
+    Sin tiempos (placeholder): cada línea = 3s aprox para que players no fallen.
+    """
+    if segments:
+        return timings.build_srt(segments)
+    lines = [l for l in (transcript or "").splitlines() if l.strip()]
+    out = []
+    t = 0
+    idx = 1
+    step = 3
+
+    for l in lines:
+        t0 = t
+        t1 = t + step
+        hh0, mm0, ss0 = t0 // 3600, (t0 % 3600) // 60, t0 % 60
+        hh1, mm1, ss1 = t1 // 3600, (t1 % 3600) // 60, t1 % 60
+
+        out.append(f"{idx}")
+        out.append(
+            f"{hh0:02d}:{mm0:02d}:{ss0:02d},000 --> "
+            f"{hh1:02d}:{mm1:02d}:{ss1:02d},000"
+        )
+        out.append(l.strip())
+        out.append("")
+
+        t += step
+        idx += 1
+
+    return "\n".join(out) or (
+        "1\n00:00:00,000 --> 00:00:02,000\n(Transcripción vacía)\n"
+    )
+
+
+def build_vtt(transcript: str, segments: Optional[List[timings.Segment]] = None) -> str:
+    if segments:
+        return timings.build_vtt(segments)
+    lines = [l for l in (transcript or "").splitlines() if l.strip()]
+    out = ["WEBVTT", ""]
+    t = 0
+    step = 3
+
+    for l in lines:
+        t0 = t
+        t1 = t + step
+        hh0, mm0, ss0 = t0 // 3600, (t0 % 3600) // 60, t0 % 60
+        hh1, mm1, ss1 = t1 // 3600, (t1 % 3600) // 60, t1 % 60
+
+        out.append(
+            f"{hh0:02d}:{mm0:02d}:{ss0:02d}.000 --> "
+            f"{hh1:02d}:{mm1:02d}:{ss1:02d}.000"
+        )
+        out.append(l.strip())
+        out.append("")
+        t += step
+
+    if len(out) == 2:
+        out += [
+            "00:00:00.000 --> 00:00:02.000",
+            "(Transcripción vacía)",
+        ]
+
+    return "\n".join(out)
+
+
+# -----------------------------------------------------------------------------
+# Utilidades comunes
+# -----------------------------------------------------------------------------
+# Caracteres de control no válidos en XML 1.0 (DOCX y el markup de reportlab)
+_XML_BAD = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+def _clean(text: str) -> str:
+    return (text or "").translate(_XML_BAD)
+
+
+def _stamp() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+
+
+# -----------------------------------------------------------------------------
+# DOCX: escritor directo de WordprocessingML
+# -----------------------------------------------------------------------------
+# En vez del modelo de objetos de python-docx (un objeto + nodo lxml por
+# párrafo, y el documento completo en memoria) se escribe el XML mínimo de un
+# .docx directamente dentro del zip, en streaming.
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    "</Types>"
+)
+
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+
+_DOCX_DOC_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    "</Relationships>"
+)
+
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+_DOCX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f"<w:styles {_W_NS}>"
+    "<w:docDefaults><w:rPrDefault><w:rPr>"
+    '<w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:eastAsia="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/><w:szCs w:val="22"/>'
+    "</w:rPr></w:rPrDefault>"
+    '<w:pPrDefault><w:pPr><w:spacing w:after="160" w:line="259" w:lineRule="auto"/></w:pPr></w:pPrDefault>'
+    "</w:docDefaults>"
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+    "</w:styles>"
+)
+
+_DOCX_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f"<w:document {_W_NS}><w:body>"
+)
+
+# Carta (como la plantilla de python-docx) con márgenes de 2 cm (1134 twips)
+_DOCX_TAIL = (
+    "<w:sectPr>"
+    '<w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1134" w:right="1134" w:bottom="1134" w:left="1134" '
+    'w:header="720" w:footer="720" w:gutter="0"/>'
+    "</w:sectPr></w:body></w:document>"
+)
+
+
+def _w_p(text: str = "", rpr: str = "") -> str:
+    if not text:
+        return "<w:p/>"
+    return f'<w:p><w:r>{rpr}<w:t xml:space="preserve">{xml_escape(text)}</w:t></w:r></w:p>'
+
+
+_RPR_TITLE = '<w:rPr><w:b/><w:sz w:val="32"/></w:rPr>'    # 16 pt
+_RPR_HEADING = '<w:rPr><w:b/><w:sz w:val="26"/></w:rPr>'  # 13 pt
+_RPR_ITALIC = "<w:rPr><w:i/></w:rPr>"
+
+# Párrafos por escritura al zip (menos llamadas write con strings medianos)
+_DOCX_BATCH = 256
+
+
+def _docx_lines(out, text: str) -> None:
+    batch: List[str] = []
+    for line in _clean(text).splitlines():
+        batch.append(_w_p(line))
+        if len(batch) >= _DOCX_BATCH:
+            out.write("".join(batch))
+            batch = []
+    if batch:
+        out.write("".join(batch))
+
+
+def build_docx(transcript: str, summary: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        z.writestr("_rels/.rels", _DOCX_RELS)
+        z.writestr("word/_rels/document.xml.rels", _DOCX_DOC_RELS)
+        z.writestr("word/styles.xml", _DOCX_STYLES)
+
+        with z.open("word/document.xml", "w") as raw:
+            out = io.TextIOWrapper(raw, encoding="utf-8", write_through=False)
+            out.write(_DOCX_HEAD)
+            out.write(_w_p("PolyScribe · Resultado", _RPR_TITLE))
+            out.write(_w_p(_stamp(), _RPR_ITALIC))
+            out.write(_w_p())
+
+            out.write(_w_p("Transcripción", _RPR_HEADING))
+            _docx_lines(out, transcript)
+            out.write(_w_p())
+
+            out.write(_w_p("Resumen", _RPR_HEADING))
+            _docx_lines(out, summary)
+
+            out.write(_DOCX_TAIL)
+            out.flush()
+            out.detach()
+
+    return buf.getvalue()
+
+
+# -----------------------------------------------------------------------------
+# PDF: dibujo directo en el canvas de reportlab
+# -----------------------------------------------------------------------------
+# platypus crea un Paragraph (parseo de markup + wrap + split) por línea; con
+# miles de líneas ese costo fijo domina. Aquí el texto es plano: se parte en
+# renglones con los anchos de palabra cacheados y cada página se escribe con
+# un único text object (todos sus renglones en un bloque BT/ET). Fuentes y
+# métricas: las estándar de reportlab, mismas que los estilos de muestra
+# (Title / Heading3 / Normal), cargadas una vez por proceso.
+
+_PDF_W, _PDF_H = A4
+_PDF_MARGIN = 2 * cm
+_PDF_TEXT_W = _PDF_W - 2 * _PDF_MARGIN
+
+# (fuente, tamaño, interlineado, espacio antes, espacio después)
+_PDF_TITLE = ("Helvetica-Bold", 18, 22, 0, 6)
+_PDF_HEADING = ("Helvetica-BoldOblique", 12, 14, 12, 6)
+_PDF_NORMAL = ("Helvetica", 10, 12, 0, 0)
+_PDF_TITLE_COLOR = colors.HexColor("#0b62e0")
+
+
+@lru_cache(maxsize=65536)
+def _word_width(word: str, font: str, size: float) -> float:
+    return pdfmetrics.stringWidth(word, font, size)
+
+
+def _wrap(line: str, font: str, size: float, max_w: float) -> List[str]:
+    """Reparto greedy por palabras; una palabra más ancha que max_w se corta por caracteres."""
+    space = _word_width(" ", font, size)
+    out: List[str] = []
+    cur: List[str] = []
+    cur_w = 0.0
+    for word in line.split():
+        w = _word_width(word, font, size)
+        if w > max_w:
+            if cur:
+                out.append(" ".join(cur))
+                cur, cur_w = [], 0.0
+            piece = ""
+            for ch in word:
+                if piece and pdfmetrics.stringWidth(piece + ch, font, size) > max_w:
+                    out.append(piece)
+                    piece = ""
+                piece += ch
+            cur, cur_w = [piece], pdfmetrics.stringWidth(piece, font, size)
+            continue
+        if cur and cur_w + space + w > max_w:
+            out.append(" ".join(cur))
+            cur, cur_w = [word], w
+        else:
+            cur_w = cur_w + space + w if cur else w
+            cur.append(word)
+    if cur:
+        out.append(" ".join(cur))
+    return out
+
+
+class _PdfWriter:
+    """Cursor vertical + text object por página sobre un canvas de reportlab."""
+
+    def __init__(self, buf: io.BytesIO):
+        self.c = canvas.Canvas(buf, pagesize=A4)
+        self.text = None
+        self.y = _PDF_H - _PDF_MARGIN
+        self.font = None
+
+    def _flush(self) -> None:
+        if self.text is not None:
+            self.c.drawText(self.text)
+            self.text = None
+            self.font = None
+
+    def _new_page(self) -> None:
+        self._flush()
+        self.c.showPage()
+        self.y = _PDF_H - _PDF_MARGIN
+
+    def space(self, pts: float) -> None:
+        self.y -= pts
+
+    def lines(self, rows: List[str], style, color=None, centered: bool = False) -> None:
+        font, size, leading, before, after = style
+        self.y -= before
+        for row in rows:
+            if self.y - leading < _PDF_MARGIN:
+                self._new_page()
+            self.y -= leading
+            x = _PDF_MARGIN
+            if centered:
+                x = (_PDF_W - pdfmetrics.stringWidth(row, font, size)) / 2.0
+            if color is not None or centered:
+                # Títulos: dibujo directo (pocos)
+                self._flush()
+                self.c.setFont(font, size)
+                self.c.setFillColor(color or colors.black)
+                self.c.drawString(x, self.y + (leading - size), row)
+                self.c.setFillColor(colors.black)
+                continue
+            if self.text is None:
+                self.text = self.c.beginText()
+            if self.font != (font, size):
+                self.text.setFont(font, size, leading)
+                self.font = (font, size)
+            self.text.setTextOrigin(x, self.y + (leading - size))
+            self.text.textOut(row)
+        self.y -= after
+
+    def paragraph(self, text: str, style, **kw) -> None:
+        font, size = style[0], style[1]
+        self.lines(_wrap(text, font, size, _PDF_TEXT_W) or [""], style, **kw)
+
+    def body(self, text: str) -> None:
+        font, size = _PDF_NORMAL[0], _PDF_NORMAL[1]
+        rows: List[str] = []
+        for line in _clean(text).splitlines():
+            if line.strip():
+                rows.extend(_wrap(line, font, size, _PDF_TEXT_W))
+        self.lines(rows, _PDF_NORMAL)
+
+    def finish(self) -> None:
+        self._flush()
+        self.c.showPage()
+        self.c.save()
+
+
+def build_pdf(transcript: str, summary: str) -> bytes:
+    buf = io.BytesIO()
+    w = _PdfWriter(buf)
+    w.paragraph("PolyScribe · Resultado", _PDF_TITLE, color=_PDF_TITLE_COLOR, centered=True)
+    w.space(0.3 * cm)
+    w.paragraph(_stamp(), _PDF_NORMAL)
+    w.space(0.5 * cm)
+
+    w.paragraph("Transcripción", _PDF_HEADING)
+    w.body(transcript)
+    w.space(0.4 * cm)
+
+    w.paragraph("Resumen", _PDF_HEADING)
+    w.body(summary)
+
+    w.finish()
+    return buf.getvalue()
+
+
+def render(
+    fmt: str,
+    transcript: str,
+    summary: str,
+    segments: Optional[List[timings.Segment]] = None,
+) -> bytes:
+    """Bytes del archivo en el formato pedido; ValueError si no está soportado."""
+    if fmt == "srt":
+        return build_srt(transcript, segments).encode("utf-8")
+    if fmt == "vtt":
+        return build_vtt(transcript, segments).encode("utf-8")
+    if fmt == "docx":
+        return build_docx(transcript, summary)
+    if fmt == "pdf":
+        return build_pdf(transcript, summary)
+    raise ValueError(f"Formato no soportado: {fmt}")
@@ -0,0 +1,201 @@
+# app/services/extractive.py
+# -*- coding: utf-8 -*-
+"""
+Resumen extractivo sin red (TextRank sobre vectores TF-IDF, con NumPy).
+
+Sirve para dos cosas:
+  - modo offline: planes listados en SUMMARY_OFFLINE_TIERS (o todos con
+    SUMMARY_MODE=extractive) reciben el resumen al instante y sin costo de API;
+  - respaldo cuando el LLM falla o no hay OPENAI_API_KEY.
+
+Pasos:
+  1) Frases: corte por puntuación final de cualquier idioma (. ! ? … 。 ！ ？ ؟ ।)
+     y saltos de línea; las "frases" gigantes de ASR sin puntuación se
+     parten en ventanas de ~SUMMARY_WINDOW_WORDS palabras.
+  2) Tokens Unicode (\\w sin dígitos) en minúsculas; en chino/japonés, que no
+     separan palabras, bigramas de caracteres.
+  3) Matriz TF-IDF dispersa (filas normalizadas) en arrays COO de NumPy.
+  4) TextRank: PageRank sobre el grafo de similitud coseno S·Sᵀ sin
+     materializarlo (cada iteración son dos bincount, O(no-ceros)).
+  5) Las mejores frases, sin casi-duplicados (coseno > 0.6), en orden original.
+
+Una transcripción de una hora (~10k palabras) se resume en decenas de ms.
+
+Funciones públicas:
+    summarize(text, max_sents=5) -> str      viñetas "• ..." (mismo formato que el LLM)
+    rank_sentences(text) -> [(puntaje, frase)] en orden original
+    is_offline(plan_tier) -> bool            ¿este plan se resume sin LLM?
+    is_offline_user(user_id) -> bool         igual, leyendo User.plan_tier (necesita app_context)
+
+Variables de entorno:
+    SUMMARY_MODE           "llm" (default) | "extractive" (nunca llama al LLM para resumir)
+    SUMMARY_OFFLINE_TIERS  planes (User.plan_tier) con resumen extractivo, p.ej. "free"
+    SUMMARY_WINDOW_WORDS   palabras por ventana en texto sin puntuación (default 30)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SUMMARY_MODE = (os.getenv("SUMMARY_MODE", "llm") or "llm").strip().lower()
+SUMMARY_OFFLINE_TIERS = {
+    t.strip().lower() for t in (os.getenv("SUMMARY_OFFLINE_TIERS", "") or "").split(",") if t.strip()
+}
+SUMMARY_WINDOW_WORDS = max(8, int(os.getenv("SUMMARY_WINDOW_WORDS", "30") or 30))
+
+_DAMPING = 0.85
+_MAX_ITER = 50
+_TOL = 1e-6
+_MAX_SIMILARITY = 0.6
+
+_RE_SENT_END = re.compile(r"(?<=[.!?…؟।])\s+|(?<=[。！？])|\s*\n+\s*")
+_RE_WORD = re.compile(r"[^\W\d_]+")
+_RE_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]")
+_RE_BULLET = re.compile(r"^\s*(?:[•\-–—*·]|\d+[.)])\s+")
+
+
+def is_offline(plan_tier: Optional[str]) -> bool:
+    if SUMMARY_MODE == "extractive":
+        return True
+    return bool(plan_tier) and plan_tier.strip().lower() in SUMMARY_OFFLINE_TIERS
+
+
+def is_offline_user(user_id) -> bool:
+    """Sólo consulta la DB si hay SUMMARY_OFFLINE_TIERS; ante cualquier duda, False (LLM)."""
+    if SUMMARY_MODE == "extractive":
+        return True
+    if not SUMMARY_OFFLINE_TIERS or not user_id:
+        return False
+    from app.extensions import db
+    from app.models_user import User
+
+    try:
+        user = db.session.get(User, int(user_id))
+    except Exception:
+        return False
+    return is_offline(getattr(user, "plan_tier", None))
+
+
+def _split_sentences(text: str) -> List[str]:
+    out: List[str] = []
+    for sent in _RE_SENT_END.split(text or ""):
+        sent = _RE_BULLET.sub("", sent).strip()
+        if not sent:
+            continue
+        words = sent.split()
+        if len(words) > 2 * SUMMARY_WINDOW_WORDS:
+            # ASR sin puntuación: ventanas de palabras
+            step = SUMMARY_WINDOW_WORDS
+            out.extend(" ".join(words[i:i + step]) for i in range(0, len(words), step))
+        elif len(words) == 1 and len(sent) > 4 * SUMMARY_WINDOW_WORDS and _RE_CJK.search(sent):
+            # Chino/japonés sin puntuación: ventanas de caracteres
+            step = 4 * SUMMARY_WINDOW_WORDS
+            out.extend(sent[i:i + step] for i in range(0, len(sent), step))
+        else:
+            out.append(sent)
+    return out
+
+
+def _tokens(sentence: str) -> List[str]:
+    out: List[str] = []
+    for w in _RE_WORD.findall(sentence.lower()):
+        if _RE_CJK.search(w):
+            out.extend(w[i:i + 2] for i in range(max(1, len(w) - 1)))
+        elif len(w) > 1:
+            out.append(w)
+    return out
+
+
+def _tfidf(token_lists: Sequence[List[str]]):
+    """Matriz dispersa (rows, cols, weights) con filas de norma 1."""
+    vocab: dict = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for i, toks in enumerate(token_lists):
+        for t in toks:
+            rows.append(i)
+            cols.append(vocab.setdefault(t, len(vocab)))
+    n, v = len(token_lists), len(vocab)
+    if not rows:
+        return None
+
+    keys, tf = np.unique(np.asarray(rows, np.int64) * v + np.asarray(cols, np.int64), return_counts=True)
+    r, c = keys // v, keys % v
+    df = np.bincount(c, minlength=v)
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    w = (1.0 + np.log(tf)) * idf[c]
+    norms = np.sqrt(np.bincount(r, weights=w * w, minlength=n))
+    w = w / norms[r]
+    return r, c, w, n, v
+
+
+def _textrank(r: np.ndarray, c: np.ndarray, w: np.ndarray, n: int, v: int) -> np.ndarray:
+    """PageRank sobre W = S·Sᵀ sin la diagonal; W·x = S·(Sᵀ·x) en O(no-ceros)."""
+    self_sim = np.bincount(r, weights=w * w, minlength=n)
+
+    def matvec(x: np.ndarray) -> np.ndarray:
+        t = np.bincount(c, weights=w * x[r], minlength=v)
+        return np.bincount(r, weights=w * t[c], minlength=n) - self_sim * x
+
+    degree = matvec(np.ones(n))
+    safe = np.where(degree > 1e-12, degree, 1.0)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(_MAX_ITER):
+        nxt = (1.0 - _DAMPING) / n + _DAMPING * matvec(np.where(degree > 1e-12, scores / safe, 0.0))
+        if np.abs(nxt - scores).sum() < _TOL:
+            return nxt
+        scores = nxt
+    return scores
+
+
+def _score(sents: List[str]):
+    """Puntaje TextRank por frase (y la matriz TF-IDF), o None si no hay tokens."""
+    token_lists = [_tokens(s) for s in sents]
+    matrix = _tfidf(token_lists)
+    if matrix is None:
+        return None
+    # Frases muy cortas ("sí", "vale, gracias") casi nunca resumen nada
+    lengths = np.fromiter((len(t) for t in token_lists), dtype=np.float64, count=len(sents))
+    return _textrank(*matrix) * np.minimum(1.0, lengths / 6.0), matrix
+
+
+def rank_sentences(text: str) -> List[Tuple[float, str]]:
+    """(puntaje, frase) de cada frase, en orden original."""
+    sents = _split_sentences(text)
+    scored = _score(sents) if sents else None
+    if scored is None:
+        return [(0.0, s) for s in sents]
+    return list(zip(scored[0].tolist(), sents))
+
+
+def summarize(text: str, max_sents: int = 5) -> str:
+    """Las 'max_sents' frases más centrales, sin redundancia, como viñetas en orden original."""
+    sents = _split_sentences(text)
+    if not sents:
+        return ""
+    scored = _score(sents)
+    if scored is None:
+        return "\n".join("• " + s for s in sents[:max_sents])
+
+    scores, (r, c, w, n, v) = scored
+    starts = np.searchsorted(r, np.arange(n + 1))
+    chosen: List[int] = []
+    chosen_vecs: List[np.ndarray] = []
+    for i in np.argsort(-scores, kind="stable"):
+        if len(chosen) >= max_sents:
+            break
+        lo, hi = starts[i], starts[i + 1]
+        if lo == hi:
+            continue
+        ci, wi = c[lo:hi], w[lo:hi]
+        if any(float(vec[ci] @ wi) > _MAX_SIMILARITY for vec in chosen_vecs):
+            continue
+        vec = np.zeros(v)
+        vec[ci] = wi
+        chosen.append(int(i))
+        chosen_vecs.append(vec)
+    return "\n".join("• " + sents[i] for i in sorted(chosen))
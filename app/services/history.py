@@ -0,0 +1,115 @@
+# app/services/history.py
+# -*- coding: utf-8 -*-
+"""
+Listado del historial de jobs de un usuario.
+
+Sólo se cargan las columnas de metadatos (transcript/summary, que pueden ser
+Text muy grandes, quedan fuera con load_only) y la paginación es por cursor
+(keyset) sobre el índice (user_id, created_at DESC, id DESC): cada página es un
+rango del índice, sin OFFSET ni páginas de cientos de filas.
+
+Funciones públicas:
+    list_jobs(user_id, limit, cursor) -> (items, next_cursor)
+    encode_cursor(created_at, job_id) / decode_cursor(cursor)
+
+El cursor es opaco para el cliente: base64url("<created_at iso>|<id>").
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime as dt
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only
+
+from app.extensions import db
+from app.models import AudioJob
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+_META_COLUMNS = (
+    AudioJob.id,
+    AudioJob.filename,
+    AudioJob.language,
+    AudioJob.language_detected,
+    AudioJob.status,
+    AudioJob.progress,
+    AudioJob.duration_seconds,
+    AudioJob.created_at,
+    AudioJob.updated_at,
+)
+
+
+def encode_cursor(created_at: dt.datetime, job_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{job_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[dt.datetime, str]]:
+    """(created_at, id) o None si el cursor falta o no es válido."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, job_id = raw.split("|", 1)
+        return dt.datetime.fromisoformat(created_at), job_id
+    except Exception:
+        return None
+
+
+def page_size(raw: Any) -> int:
+    try:
+        n = int(raw or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        n = DEFAULT_PAGE_SIZE
+    return max(1, min(MAX_PAGE_SIZE, n))
+
+
+def list_jobs(
+    user_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Una página del historial (más reciente primero) y el cursor de la siguiente (o None)."""
+    q = (
+        db.session.query(AudioJob)
+        .options(load_only(*_META_COLUMNS))
+        .filter(AudioJob.user_id == str(user_id))
+    )
+
+    after = decode_cursor(cursor)
+    if after:
+        created_at, job_id = after
+        q = q.filter(
+            or_(
+                AudioJob.created_at < created_at,
+                and_(AudioJob.created_at == created_at, AudioJob.id < job_id),
+            )
+        )
+
+    rows = q.order_by(AudioJob.created_at.desc(), AudioJob.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    items = [
+        {
+            "id": r.id,
+            "job_id": r.id,
+            "filename": r.filename or "",
+            "language": r.language or "",
+            "language_detected": r.language_detected or "",
+            "status": r.status or "done",
+            "progress": int(r.progress or 0),
+            "duration_seconds": int(r.duration_seconds or 0),
+            "created_at": str(r.created_at),
+            "updated_at": str(r.updated_at),
+        }
+        for r in rows
+    ]
+    return items, next_cursor
@@ -0,0 +1,158 @@
+# app/services/ingest.py
+# -*- coding: utf-8 -*-
+"""
+Ingesta de uploads en streaming.
+
+Werkzeug parsea el multipart por bloques (buffer_size) y escribe cada bloque
+del archivo en el "stream" que devuelve Request._get_file_stream. Aquí ese
+stream es un IngestFile que, en la MISMA pasada:
+  - escribe directo a disco (un tmpdir propio por upload, nada en memoria),
+  - calcula el sha256 del contenido,
+  - cuenta bytes y aborta con 413 apenas se supera MAX_UPLOAD_MB.
+
+Así POST /jobs recibe un archivo ya guardado y hasheado: no hace falta
+file.save() ni releerlo para el hash, y ffprobe trabaja sobre ese path.
+
+Cada tmpdir se borra al terminar el request (teardown_request) salvo que la
+vista lo haya reservado con IngestFile.keep() para un job en segundo plano:
+así no quedan restos si la vista devuelve 400, si el multipart trae partes
+de archivo vacías o extra, o si el upload llega a otra ruta.
+
+Uso (app/__init__.py):
+    app.request_class = IngestRequest
+    app.teardown_request(discard_request_uploads)
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import hashlib
+import tempfile
+from typing import Optional
+
+from flask import Request, request
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+MB = 1024 * 1024
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "100") or 100)
+
+# Margen para cabeceras/boundaries del multipart al comparar Content-Length.
+_MULTIPART_SLACK_BYTES = 64 * 1024
+
+
+class IngestFile:
+    """
+    Archivo temporal "write-through" con sha256 y límite de tamaño.
+    Expone .path, .dir, .size y .sha256 además de la API de archivo que
+    necesitan Werkzeug y FileStorage (write/read/seek/tell/close...).
+    """
+
+    def __init__(self, filename: Optional[str], max_bytes: int = 0):
+        self.dir = tempfile.mkdtemp(prefix="polyscribe_")
+        # Conservamos la extensión: Whisper la usa para detectar el formato.
+        self.path = os.path.join(self.dir, secure_filename(filename or "") or "upload.bin")
+        self.max_bytes = int(max_bytes or 0)
+        self.size = 0
+        self.kept = False
+        self._hash = hashlib.sha256()
+        self._f = open(self.path, "w+b")
+
+    # --- escritura (la hace el parser multipart) ---
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.discard()
+            raise RequestEntityTooLarge(f"El archivo supera {self.max_bytes // MB} MB.")
+        self._hash.update(data)
+        return self._f.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    # --- lectura / posición (FileStorage, save(), etc.) ---
+    def read(self, size: int = -1) -> bytes:
+        return self._f.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._f.readline(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._f.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    @property
+    def closed(self) -> bool:
+        return self._f.closed
+
+    def close(self) -> None:
+        """Cierra el descriptor; el archivo queda en disco (lo usa el pipeline)."""
+        if not self._f.closed:
+            self._f.close()
+
+    def discard(self) -> None:
+        """Cierra y borra el tmpdir (upload rechazado)."""
+        self.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def keep(self) -> None:
+        """El tmpdir sobrevive al request: lo borra quien procesa el job."""
+        self.kept = True
+
+    def __iter__(self):
+        return iter(self._f)
+
+
+class IngestRequest(Request):
+    """Request de Flask cuyos archivos subidos van por IngestFile."""
+
+    def _get_file_stream(
+        self,
+        total_content_length: Optional[int],
+        content_type: Optional[str],
+        filename: Optional[str] = None,
+        content_length: Optional[int] = None,
+    ):
+        max_bytes = MAX_UPLOAD_MB * MB if MAX_UPLOAD_MB > 0 else 0
+        stream = IngestFile(filename, max_bytes=max_bytes)
+        self.__dict__.setdefault("_ingest_files", []).append(stream)
+        return stream
+
+    def discard_uploads(self) -> None:
+        """Borra los tmpdir de este request que nadie reservó con keep()."""
+        for stream in self.__dict__.pop("_ingest_files", []):
+            if not stream.kept:
+                stream.discard()
+
+
+def discard_request_uploads(exc: Optional[BaseException] = None) -> None:
+    """teardown_request: limpia los uploads del request (ver IngestRequest)."""
+    discard = getattr(request, "discard_uploads", None)
+    if discard is not None:
+        discard()
+
+
+def content_length_exceeds_limit(content_length: Optional[int]) -> bool:
+    """
+    Rechazo antes de leer el body: si el cliente declara un Content-Length
+    mayor que el límite (+ margen del multipart) no tiene sentido parsearlo.
+    """
+    if MAX_UPLOAD_MB <= 0 or not content_length:
+        return False
+    return int(content_length) > MAX_UPLOAD_MB * MB + _MULTIPART_SLACK_BYTES
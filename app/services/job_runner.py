@@ -0,0 +1,57 @@
+# app/services/job_runner.py
+# -*- coding: utf-8 -*-
+"""
+Pool de workers en proceso para jobs asíncronos (JOBS_MODE=thread).
+
+POST /jobs deja el AudioJob en 'queued' y delega aquí el pipeline pesado
+(ffmpeg + Whisper + resumen) para responder 202 de inmediato. Cada tarea
+corre dentro de un app_context propio, así que puede usar db.session y
+current_app igual que dentro de un request.
+
+Variables de entorno:
+    JOBS_WORKERS: hilos del pool por proceso (default 4).
+"""
+
+from __future__ import annotations
+
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "4") or 4)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, JOBS_WORKERS),
+                    thread_name_prefix="polyscribe-job",
+                )
+    return _executor
+
+
+def submit(app, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    Encola fn(*args, **kwargs) en el pool, ejecutándola con app.app_context().
+    'app' debe ser el objeto Flask real (current_app._get_current_object()).
+    """
+
+    def _run() -> Any:
+        with app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                log.exception("job_runner: tarea %s falló: %s", getattr(fn, "__name__", fn), e)
+                return None
+
+    return _get_executor().submit(_run)
@@ -0,0 +1,249 @@
+# app/services/langid.py
+# -*- coding: utf-8 -*-
+"""
+Identificación de idioma local (sin red) para transcripciones.
+
+Antes cada job en 'auto' hacía un chat completo sólo para obtener dos letras,
+aunque Whisper (verbose_json) ya devuelve el idioma. Aquí:
+
+  1) Alfabeto: si domina una escritura propia de un solo idioma del catálogo
+     (hangul, kana, han, hebreo, griego, devanagari, bengalí, tamil, telugu)
+     la respuesta es directa. Árabe/persa y ruso/ucraniano se separan por sus
+     letras exclusivas (ی ک پ چ / ي ك ة, і ї є ґ / ы э ъ ё).
+  2) Escritura latina: Naive Bayes sobre n-gramas de caracteres (1-3) con
+     perfiles construidos al primer uso desde app/services/langid_corpus.py.
+  3) resolve(): si el modelo local es confiable gana (el resumen se escribe en
+     el idioma del TEXTO); si no, el idioma que reportó Whisper; si tampoco hay,
+     el 'fallback' de quien llama (p.ej. la detección con LLM).
+
+Se mira una muestra (inicio, medio y final) de LANGID_SAMPLE_CHARS caracteres:
+el costo no crece con la duración del audio.
+
+Funciones públicas:
+    normalize(code_or_name) -> Optional[str]   ('Spanish', 'pt-BR', 'iw' -> código del catálogo)
+    identify(text) -> (código | None, confianza 0..1)
+    resolve(text, hint=None, fallback=None, default="es") -> str
+
+Variables de entorno:
+    LANGID_MIN_CONFIDENCE  confianza mínima para fiarse del modelo local (default 0.8)
+    LANGID_SAMPLE_CHARS    caracteres analizados por texto (default 3000)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+LANGID_MIN_CONFIDENCE = float(os.getenv("LANGID_MIN_CONFIDENCE", "0.8") or 0.8)
+LANGID_SAMPLE_CHARS = max(200, int(os.getenv("LANGID_SAMPLE_CHARS", "3000") or 3000))
+
+# Subir al cambiar langid_corpus o el modelo (sólo informativo en logs)
+PROFILE_VERSION = "1"
+
+# Mismo catálogo que celery_app.LANG_NAME
+LANGUAGES = (
+    "es", "en", "pt", "fr", "it", "de", "ca", "gl", "eu", "nl", "sv", "no", "da", "fi",
+    "ru", "pl", "uk", "tr", "ar", "he", "fa", "hi", "bn", "ta", "te", "zh", "ja", "ko",
+    "ro", "cs", "el", "hu", "vi", "id", "ms",
+)
+
+# Nombres que devuelve Whisper en verbose_json (y alias habituales)
+_NAMES: Dict[str, str] = {
+    "spanish": "es", "castilian": "es", "english": "en", "portuguese": "pt", "french": "fr",
+    "italian": "it", "german": "de", "catalan": "ca", "valencian": "ca", "galician": "gl",
+    "basque": "eu", "dutch": "nl", "flemish": "nl", "swedish": "sv", "norwegian": "no",
+    "nynorsk": "no", "bokmal": "no", "nb": "no", "nn": "no", "danish": "da", "finnish": "fi",
+    "russian": "ru", "polish": "pl", "ukrainian": "uk", "turkish": "tr", "arabic": "ar",
+    "hebrew": "he", "iw": "he", "persian": "fa", "farsi": "fa", "hindi": "hi", "bengali": "bn",
+    "tamil": "ta", "telugu": "te", "chinese": "zh", "mandarin": "zh", "cantonese": "zh",
+    "yue": "zh", "japanese": "ja", "korean": "ko", "romanian": "ro", "moldavian": "ro",
+    "moldovan": "ro", "czech": "cs", "greek": "el", "hungarian": "hu", "vietnamese": "vi",
+    "indonesian": "id", "malay": "ms", "in": "id",
+}
+
+# Escrituras de un solo idioma del catálogo
+_SCRIPTS: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("ko", re.compile(r"[\uac00-\ud7af\u1100-\u11ff\u3130-\u318f]")),
+    ("kana", re.compile(r"[\u3040-\u30ff]")),
+    ("han", re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")),
+    ("he", re.compile(r"[\u0590-\u05ff]")),
+    ("el", re.compile(r"[\u0370-\u03ff\u1f00-\u1fff]")),
+    ("hi", re.compile(r"[\u0900-\u097f]")),
+    ("bn", re.compile(r"[\u0980-\u09ff]")),
+    ("ta", re.compile(r"[\u0b80-\u0bff]")),
+    ("te", re.compile(r"[\u0c00-\u0c7f]")),
+    ("cyrillic", re.compile(r"[\u0400-\u04ff]")),
+    ("arabic", re.compile(r"[\u0600-\u06ff\u0750-\u077f\ufb50-\ufdff\ufe70-\ufefe]")),
+    ("latin", re.compile(r"[a-zA-Z\u00c0-\u024f\u1e00-\u1eff]")),
+]
+_RE_UK = re.compile(r"[іїєґІЇЄҐ]")
+_RE_RU = re.compile(r"[ыэъёЫЭЪЁ]")
+_RE_FA = re.compile(r"[\u067e\u0686\u0698\u06af\u06a9\u06cc]")  # پ چ ژ گ ک ی
+_RE_AR = re.compile(r"[\u0629\u0643\u064a\u0649]")  # ة ك ي ى
+
+_RE_NON_LETTER = re.compile(r"[^\w]+|[\d_]+")
+
+# Naive Bayes: orden de los n-gramas, suavizado y evidencia efectiva máxima
+# (los n-gramas solapados no son independientes: sin tope la confianza se satura)
+_ORDERS = (1, 2, 3)
+_ALPHA = 0.5
+_EFFECTIVE_NGRAMS = 30.0
+
+_model_lock = threading.Lock()
+_model: Optional[Tuple[Tuple[str, ...], Dict[str, Tuple[float, ...]]]] = None
+
+
+def normalize(code_or_name: Optional[str]) -> Optional[str]:
+    """Código del catálogo para un código/nombre de idioma, o None si no es uno soportado."""
+    if not code_or_name:
+        return None
+    s = str(code_or_name).strip().lower().replace("_", "-")
+    if s in _NAMES:
+        return _NAMES[s]
+    base = s.split("-", 1)[0]
+    if base in _NAMES:
+        return _NAMES[base]
+    return base if base in LANGUAGES else None
+
+
+def _sample(text: str) -> str:
+    """Inicio, medio y final del texto (una intro en otro idioma no decide sola)."""
+    if len(text) <= LANGID_SAMPLE_CHARS:
+        return text
+    third = LANGID_SAMPLE_CHARS // 3
+    mid = len(text) // 2
+    return " ".join((text[:third], text[mid - third // 2: mid + third // 2], text[-third:]))
+
+
+def _ngrams(text: str) -> Counter:
+    grams: Counter = Counter()
+    for word in _RE_NON_LETTER.sub(" ", text.lower()).split():
+        padded = f" {word} "
+        for n in _ORDERS:
+            for i in range(len(padded) - n + 1):
+                g = padded[i:i + n]
+                if g != " ":
+                    grams[g] += 1
+    return grams
+
+
+def _build_model():
+    """Log-probabilidades por n-grama y por idioma (vectores alineados con 'langs')."""
+    from app.services.langid_corpus import CORPUS
+
+    langs = tuple(CORPUS)
+    counts = [_ngrams(CORPUS[lang]) for lang in langs]
+    vocab = set()
+    for c in counts:
+        vocab.update(c)
+    v = len(vocab)
+    denoms = [sum(c.values()) + _ALPHA * v for c in counts]
+    table = {
+        g: tuple(math.log((c.get(g, 0) + _ALPHA) / d) for c, d in zip(counts, denoms))
+        for g in vocab
+    }
+    log.info("langid: perfiles v%s, %d idiomas latinos, %d n-gramas", PROFILE_VERSION, len(langs), v)
+    return langs, table
+
+
+def _get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _build_model()
+    return _model
+
+
+def _latin_scores(text: str) -> List[Tuple[str, float]]:
+    """Probabilidad (posterior con evidencia acotada) de cada idioma latino, de mayor a menor."""
+    langs, table = _get_model()
+    grams = _ngrams(text)
+    total = sum(grams.values())
+    if not total:
+        return []
+    ll = [0.0] * len(langs)
+    for g, k in grams.items():
+        row = table.get(g)
+        if row is None:
+            continue  # n-grama que ningún perfil vio: no discrimina
+        for i, lp in enumerate(row):
+            ll[i] += k * lp
+    scale = min(1.0, _EFFECTIVE_NGRAMS / total)
+    top = max(ll)
+    weights = [math.exp((x - top) * scale) for x in ll]
+    z = sum(weights)
+    return sorted(((lang, w / z) for lang, w in zip(langs, weights)), key=lambda t: t[1], reverse=True)
+
+
+def identify(text: str) -> Tuple[Optional[str], float]:
+    """(código, confianza 0..1) del idioma de 'text'; (None, 0.0) si no hay letras."""
+    sample = _sample(text or "")
+    counts = {name: len(rx.findall(sample)) for name, rx in _SCRIPTS}
+    letters = sum(counts.values())
+    if not letters:
+        return None, 0.0
+    script = max(counts, key=counts.get)
+    share = counts[script] / letters
+
+    # Japonés mezcla kana y han; chino no usa kana
+    if script in ("kana", "han"):
+        cjk = counts["kana"] + counts["han"]
+        return ("ja" if counts["kana"] >= 0.05 * cjk else "zh"), cjk / letters
+    if script == "cyrillic":
+        uk, ru = len(_RE_UK.findall(sample)), len(_RE_RU.findall(sample))
+        if uk == ru:
+            return "ru", 0.6 * share  # sin letras exclusivas (texto corto, otro idioma cirílico)
+        return ("uk" if uk > ru else "ru"), share * max(uk, ru) / (uk + ru)
+    if script == "arabic":
+        fa, ar = len(_RE_FA.findall(sample)), len(_RE_AR.findall(sample))
+        if fa == ar:
+            return "ar", 0.6 * share
+        return ("fa" if fa > ar else "ar"), share * max(fa, ar) / (fa + ar)
+    if script != "latin":
+        return script, share
+
+    scores = _latin_scores(sample)
+    if not scores:
+        return None, 0.0
+    lang, p = scores[0]
+    return lang, p * share
+
+
+def resolve(
+    text: str,
+    hint: Optional[str] = None,
+    fallback: Optional[Callable[[str], str]] = None,
+    default: str = "es",
+) -> str:
+    """
+    Idioma final de una transcripción.
+
+    hint: idioma reportado por el ASR (código o nombre, p.ej. 'spanish').
+    fallback(text): detección cara (LLM); sólo se llama si el modelo local no
+    es confiable y el ASR no dio un idioma del catálogo.
+    """
+    hinted = normalize(hint)
+    try:
+        lang, conf = identify(text)
+    except Exception as e:  # pragma: no cover
+        log.warning("langid: fallo identificando idioma: %s", e)
+        lang, conf = None, 0.0
+
+    if lang and (lang == hinted or conf >= LANGID_MIN_CONFIDENCE):
+        if hinted and lang != hinted:
+            log.info("langid: el texto parece %s (%.2f), el ASR dijo %s", lang, conf, hinted)
+        return lang
+    if hinted:
+        return hinted
+    if fallback is not None and (text or "").strip():
+        log.info("langid: confianza baja (%s, %.2f), se usa el fallback", lang, conf)
+        return normalize(fallback(text)) or lang or default
+    return lang or default
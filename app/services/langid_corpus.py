@@ -0,0 +1,246 @@
+# app/services/langid_corpus.py
+# -*- coding: utf-8 -*-
+"""
+Texto de muestra por idioma para los perfiles de n-gramas de app/services/langid.py.
+
+Sólo idiomas de escritura latina: los demás (árabe/persa, cirílico, CJK,
+hebreo, griego, índicos...) se distinguen por el alfabeto. Frases de habla
+cotidiana y de reuniones, parecidas a lo que sale de una transcripción.
+Al cambiar este texto, subir langid.PROFILE_VERSION.
+"""
+
+CORPUS = {
+    "es": (
+        "Hola a todos, gracias por venir hoy. Vamos a empezar la reunión con un repaso de lo que hicimos "
+        "la semana pasada y después hablamos de los próximos pasos. El equipo de ventas ha cerrado tres "
+        "contratos nuevos y estamos muy contentos con los resultados. Creo que todavía tenemos que mejorar "
+        "la comunicación entre los departamentos, porque a veces no sabemos quién se encarga de cada tarea. "
+        "¿Alguien tiene alguna pregunta antes de seguir? Bueno, si no hay preguntas, pasamos al siguiente "
+        "punto del día. También quería decir que el presupuesto para este año es más pequeño que el anterior, "
+        "así que tenemos que ser cuidadosos con los gastos. Mañana os enviaré un correo con todos los detalles. "
+        "La verdad es que el proyecto va bien y estoy seguro de que vamos a llegar a tiempo."
+    ),
+    "en": (
+        "Hello everyone, thanks for coming today. We are going to start the meeting with a quick review of what "
+        "we did last week and then we will talk about the next steps. The sales team has closed three new "
+        "contracts and we are very happy with the results. I think we still need to improve the communication "
+        "between the departments, because sometimes we don't know who is in charge of each task. Does anyone "
+        "have any questions before we move on? Well, if there are no questions, let's go to the next item on "
+        "the agenda. I also wanted to say that the budget for this year is smaller than the previous one, so we "
+        "have to be careful with the expenses. Tomorrow I will send you an email with all the details. The truth "
+        "is that the project is going well and I am sure that we will finish on time."
+    ),
+    "pt": (
+        "Olá a todos, obrigado por terem vindo hoje. Vamos começar a reunião com uma revisão do que fizemos na "
+        "semana passada e depois falamos dos próximos passos. A equipe de vendas fechou três contratos novos e "
+        "estamos muito contentes com os resultados. Acho que ainda precisamos melhorar a comunicação entre os "
+        "departamentos, porque às vezes não sabemos quem é responsável por cada tarefa. Alguém tem alguma "
+        "pergunta antes de continuarmos? Bom, se não há perguntas, passamos para o próximo ponto. Também queria "
+        "dizer que o orçamento deste ano é menor do que o do ano anterior, então temos que ter cuidado com as "
+        "despesas. Amanhã vou enviar um e-mail com todos os detalhes. A verdade é que o projeto está indo bem e "
+        "tenho certeza de que vamos conseguir terminar a tempo. Não se esqueçam de que a avaliação é em junho."
+    ),
+    "fr": (
+        "Bonjour à tous, merci d'être venus aujourd'hui. Nous allons commencer la réunion par un petit rappel de "
+        "ce que nous avons fait la semaine dernière et ensuite nous parlerons des prochaines étapes. L'équipe "
+        "commerciale a signé trois nouveaux contrats et nous sommes très contents des résultats. Je pense qu'il "
+        "faut encore améliorer la communication entre les services, parce que parfois on ne sait pas qui "
+        "s'occupe de chaque tâche. Est-ce que quelqu'un a une question avant de continuer ? Bon, s'il n'y a pas "
+        "de questions, on passe au point suivant. Je voulais aussi dire que le budget de cette année est plus "
+        "petit que celui de l'année dernière, donc il faut faire attention aux dépenses. Demain je vous enverrai "
+        "un courriel avec tous les détails. En vérité le projet avance bien et je suis sûr que nous serons prêts."
+    ),
+    "it": (
+        "Ciao a tutti, grazie per essere venuti oggi. Cominciamo la riunione con un breve riepilogo di quello che "
+        "abbiamo fatto la settimana scorsa e poi parliamo dei prossimi passi. Il gruppo vendite ha chiuso tre "
+        "nuovi contratti e siamo molto contenti dei risultati. Penso che dobbiamo ancora migliorare la "
+        "comunicazione tra i reparti, perché a volte non sappiamo chi si occupa di ogni compito. Qualcuno ha "
+        "delle domande prima di andare avanti? Bene, se non ci sono domande, passiamo al prossimo punto. Volevo "
+        "anche dire che il bilancio di quest'anno è più piccolo di quello dell'anno scorso, quindi dobbiamo "
+        "stare attenti alle spese. Domani vi mando una mail con tutti i dettagli. La verità è che il progetto "
+        "sta andando bene e sono sicuro che finiremo in tempo. Grazie ancora e buona giornata a tutti quanti."
+    ),
+    "de": (
+        "Hallo zusammen, danke, dass ihr heute gekommen seid. Wir beginnen die Besprechung mit einem kurzen "
+        "Rückblick auf die letzte Woche und danach sprechen wir über die nächsten Schritte. Das Vertriebsteam "
+        "hat drei neue Verträge abgeschlossen und wir sind mit den Ergebnissen sehr zufrieden. Ich glaube, wir "
+        "müssen die Kommunikation zwischen den Abteilungen noch verbessern, weil wir manchmal nicht wissen, wer "
+        "für welche Aufgabe zuständig ist. Hat jemand eine Frage, bevor wir weitermachen? Gut, wenn es keine "
+        "Fragen gibt, gehen wir zum nächsten Punkt der Tagesordnung. Ich wollte auch sagen, dass das Budget in "
+        "diesem Jahr kleiner ist als im letzten Jahr, also müssen wir mit den Ausgaben vorsichtig sein. Morgen "
+        "schicke ich euch eine E-Mail mit allen Einzelheiten. Das Projekt läuft gut und wir werden pünktlich fertig."
+    ),
+    "ca": (
+        "Hola a tothom, gràcies per venir avui. Començarem la reunió amb un repàs del que vam fer la setmana "
+        "passada i després parlarem dels propers passos. L'equip de vendes ha tancat tres contractes nous i "
+        "estem molt contents amb els resultats. Crec que encara hem de millorar la comunicació entre els "
+        "departaments, perquè de vegades no sabem qui s'encarrega de cada tasca. Algú té alguna pregunta abans "
+        "de continuar? Bé, si no hi ha preguntes, passem al següent punt de l'ordre del dia. També volia dir "
+        "que el pressupost d'aquest any és més petit que el de l'any anterior, així que hem d'anar amb compte "
+        "amb les despeses. Demà us enviaré un correu amb tots els detalls. La veritat és que el projecte va bé "
+        "i estic segur que arribarem a temps. Moltes gràcies i bona tarda a tots plegats."
+    ),
+    "gl": (
+        "Ola a todos, grazas por vir hoxe. Imos comezar a xuntanza cun repaso do que fixemos a semana pasada e "
+        "despois falamos dos próximos pasos. O equipo de vendas pechou tres contratos novos e estamos moi "
+        "contentos cos resultados. Coido que aínda temos que mellorar a comunicación entre os departamentos, "
+        "porque ás veces non sabemos quen se encarga de cada tarefa. Alguén ten algunha pregunta antes de "
+        "seguir? Ben, se non hai preguntas, pasamos ao seguinte punto. Tamén quería dicir que o orzamento deste "
+        "ano é máis pequeno ca o do ano anterior, así que temos que ter coidado cos gastos. Mañá heivos mandar "
+        "un correo con todos os detalles. A verdade é que o proxecto vai ben e estou seguro de que imos chegar "
+        "a tempo. Moitas grazas e boa tarde a todos, nós vémonos axiña."
+    ),
+    "eu": (
+        "Kaixo guztioi, eskerrik asko gaur etortzeagatik. Bilera hasiko dugu joan den astean egin genuenaren "
+        "errepaso labur batekin eta gero hurrengo urratsei buruz hitz egingo dugu. Salmenta taldeak hiru "
+        "kontratu berri itxi ditu eta oso pozik gaude emaitzekin. Uste dut oraindik sailen arteko komunikazioa "
+        "hobetu behar dugula, batzuetan ez baitakigu nor arduratzen den zeregin bakoitzaz. Norbaitek baduzu "
+        "galderarik jarraitu aurretik? Ondo, galderarik ez badago, hurrengo puntura pasatuko gara. Esan nahi "
+        "nuen ere aurtengo aurrekontua iazkoa baino txikiagoa dela, beraz kontuz ibili behar dugu gastuekin. "
+        "Bihar mezu elektroniko bat bidaliko dizuet xehetasun guztiekin. Egia esan proiektua ondo doa eta ziur "
+        "nago garaiz helduko garela. Mila esker denoi eta arratsalde on izan."
+    ),
+    "nl": (
+        "Hallo allemaal, bedankt dat jullie vandaag gekomen zijn. We beginnen de vergadering met een korte "
+        "terugblik op wat we vorige week gedaan hebben en daarna praten we over de volgende stappen. Het "
+        "verkoopteam heeft drie nieuwe contracten gesloten en we zijn erg blij met de resultaten. Ik denk dat we "
+        "de communicatie tussen de afdelingen nog moeten verbeteren, omdat we soms niet weten wie "
+        "verantwoordelijk is voor elke taak. Heeft iemand nog een vraag voordat we verdergaan? Goed, als er geen "
+        "vragen zijn, gaan we naar het volgende punt. Ik wilde ook zeggen dat het budget dit jaar kleiner is dan "
+        "vorig jaar, dus we moeten voorzichtig zijn met de uitgaven. Morgen stuur ik jullie een e-mail met alle "
+        "details. Eerlijk gezegd gaat het project goed en ik weet zeker dat we op tijd klaar zijn."
+    ),
+    "sv": (
+        "Hej allihop, tack för att ni kom hit idag. Vi börjar mötet med en kort genomgång av vad vi gjorde "
+        "förra veckan och sedan pratar vi om nästa steg. Säljteamet har skrivit tre nya avtal och vi är mycket "
+        "nöjda med resultaten. Jag tror att vi fortfarande behöver förbättra kommunikationen mellan "
+        "avdelningarna, eftersom vi ibland inte vet vem som ansvarar för varje uppgift. Har någon en fråga innan "
+        "vi går vidare? Bra, om det inte finns några frågor går vi till nästa punkt på dagordningen. Jag ville "
+        "också säga att budgeten i år är mindre än förra året, så vi måste vara försiktiga med utgifterna. I "
+        "morgon skickar jag ett mejl med alla detaljer till er. Sanningen är att projektet går bra och jag är "
+        "säker på att vi blir klara i tid. Tack så mycket och ha en trevlig eftermiddag."
+    ),
+    "no": (
+        "Hei alle sammen, takk for at dere kom i dag. Vi begynner møtet med en kort gjennomgang av hva vi gjorde "
+        "forrige uke, og etterpå snakker vi om de neste stegene. Salgsteamet har inngått tre nye kontrakter, og "
+        "vi er veldig fornøyde med resultatene. Jeg tror vi fortsatt må forbedre kommunikasjonen mellom "
+        "avdelingene, fordi vi noen ganger ikke vet hvem som har ansvaret for hver oppgave. Er det noen som har "
+        "et spørsmål før vi går videre? Greit, hvis det ikke er noen spørsmål, går vi til neste punkt. Jeg ville "
+        "også si at budsjettet i år er mindre enn i fjor, så vi må være forsiktige med utgiftene. I morgen sender "
+        "jeg dere en e-post med alle detaljene. Sannheten er at prosjektet går bra, og jeg er sikker på at vi "
+        "blir ferdige i tide. Tusen takk og ha en fin ettermiddag videre. "
+        "Jeg synes det var veldig bra at vi fikk snakket om dette, for ellers hadde vi ikke visst noe om "
+        "problemet. Kan du ikke bare sende meg tallene når du har tid? Vi ses på mandag, og husk å ta med "
+        "datamaskinen. Det er svært viktig at kundene får svar raskt, selv om det blir litt dyrere for oss."
+    ),
+    "da": (
+        "Hej allesammen, tak fordi I kom i dag. Vi starter mødet med en kort gennemgang af hvad vi lavede i "
+        "sidste uge, og bagefter taler vi om de næste skridt. Salgsteamet har indgået tre nye kontrakter, og vi "
+        "er meget tilfredse med resultaterne. Jeg tror, vi stadig skal forbedre kommunikationen mellem "
+        "afdelingerne, fordi vi nogle gange ikke ved, hvem der har ansvaret for hver opgave. Er der nogen, der "
+        "har et spørgsmål, før vi går videre? Godt, hvis der ikke er nogen spørgsmål, går vi til næste punkt. "
+        "Jeg ville også sige, at budgettet i år er mindre end sidste år, så vi skal være forsigtige med "
+        "udgifterne. I morgen sender jeg jer en mail med alle detaljerne. Sandheden er, at projektet går godt, "
+        "og jeg er sikker på, at vi bliver færdige til tiden. Mange tak og hav en god eftermiddag. "
+        "Jeg synes, det var rigtig godt, at vi fik snakket om det her, for ellers havde vi ikke vidst noget "
+        "om problemet. Kan du ikke lige sende mig tallene, når du har tid? Vi ses på mandag, og husk at tage "
+        "computeren med. Det er meget vigtigt, at kunderne får svar hurtigt, også selvom det bliver lidt dyrere."
+    ),
+    "fi": (
+        "Hei kaikki, kiitos että tulitte tänään. Aloitamme kokouksen lyhyellä katsauksella siihen, mitä teimme "
+        "viime viikolla, ja sen jälkeen puhumme seuraavista vaiheista. Myyntitiimi on solminut kolme uutta "
+        "sopimusta ja olemme erittäin tyytyväisiä tuloksiin. Mielestäni meidän täytyy vielä parantaa osastojen "
+        "välistä viestintää, koska joskus emme tiedä, kuka vastaa mistäkin tehtävästä. Onko kenelläkään "
+        "kysyttävää ennen kuin jatkamme? Hyvä, jos kysymyksiä ei ole, siirrymme seuraavaan kohtaan. Halusin "
+        "myös sanoa, että tämän vuoden budjetti on pienempi kuin viime vuonna, joten meidän on oltava "
+        "varovaisia kulujen kanssa. Huomenna lähetän teille sähköpostin, jossa on kaikki yksityiskohdat. "
+        "Totuus on, että projekti etenee hyvin ja olen varma, että valmistumme ajallaan. Kiitos paljon."
+    ),
+    "pl": (
+        "Cześć wszystkim, dziękuję, że przyszliście dzisiaj. Zaczniemy spotkanie od krótkiego podsumowania "
+        "tego, co zrobiliśmy w zeszłym tygodniu, a potem porozmawiamy o kolejnych krokach. Zespół sprzedaży "
+        "podpisał trzy nowe umowy i jesteśmy bardzo zadowoleni z wyników. Myślę, że wciąż musimy poprawić "
+        "komunikację między działami, ponieważ czasami nie wiemy, kto odpowiada za które zadanie. Czy ktoś ma "
+        "pytanie, zanim przejdziemy dalej? Dobrze, jeśli nie ma pytań, przechodzimy do następnego punktu. "
+        "Chciałem też powiedzieć, że tegoroczny budżet jest mniejszy niż w zeszłym roku, więc musimy uważać "
+        "na wydatki. Jutro wyślę wam wiadomość ze wszystkimi szczegółami. Prawda jest taka, że projekt idzie "
+        "dobrze i jestem pewien, że skończymy na czas. Bardzo dziękuję i miłego popołudnia."
+    ),
+    "tr": (
+        "Herkese merhaba, bugün geldiğiniz için teşekkürler. Toplantıya geçen hafta yaptıklarımızın kısa bir "
+        "özetiyle başlayacağız ve sonra sonraki adımları konuşacağız. Satış ekibi üç yeni sözleşme imzaladı ve "
+        "sonuçlardan çok memnunuz. Bence departmanlar arasındaki iletişimi hâlâ geliştirmemiz gerekiyor, çünkü "
+        "bazen her görevden kimin sorumlu olduğunu bilmiyoruz. Devam etmeden önce sorusu olan var mı? Tamam, "
+        "soru yoksa bir sonraki maddeye geçiyoruz. Ayrıca bu yılın bütçesinin geçen yıldan daha küçük olduğunu "
+        "söylemek istedim, bu yüzden harcamalara dikkat etmemiz lazım. Yarın size bütün ayrıntıları içeren bir "
+        "e-posta göndereceğim. Doğrusu proje iyi gidiyor ve zamanında bitireceğimizden eminim. Çok teşekkür "
+        "ederim, herkese iyi günler dilerim."
+    ),
+    "ro": (
+        "Bună ziua tuturor, vă mulțumesc că ați venit astăzi. Începem ședința cu o scurtă trecere în revistă a "
+        "ceea ce am făcut săptămâna trecută și apoi vorbim despre pașii următori. Echipa de vânzări a încheiat "
+        "trei contracte noi și suntem foarte mulțumiți de rezultate. Cred că trebuie să îmbunătățim în "
+        "continuare comunicarea dintre departamente, pentru că uneori nu știm cine se ocupă de fiecare sarcină. "
+        "Are cineva vreo întrebare înainte să continuăm? Bine, dacă nu sunt întrebări, trecem la punctul "
+        "următor. Voiam să spun și că bugetul de anul acesta este mai mic decât cel de anul trecut, așa că "
+        "trebuie să fim atenți cu cheltuielile. Mâine vă trimit un email cu toate detaliile. Adevărul este că "
+        "proiectul merge bine și sunt sigur că vom termina la timp. Mulțumesc mult și o după-amiază frumoasă."
+    ),
+    "cs": (
+        "Dobrý den všem, děkuji, že jste dnes přišli. Začneme schůzku krátkým shrnutím toho, co jsme udělali "
+        "minulý týden, a potom si promluvíme o dalších krocích. Obchodní tým uzavřel tři nové smlouvy a jsme "
+        "s výsledky velmi spokojeni. Myslím, že ještě musíme zlepšit komunikaci mezi odděleními, protože "
+        "někdy nevíme, kdo má na starosti který úkol. Má někdo nějakou otázku, než budeme pokračovat? Dobře, "
+        "pokud nejsou žádné otázky, přejdeme k dalšímu bodu programu. Chtěl jsem také říct, že letošní rozpočet "
+        "je menší než loňský, takže musíme být opatrní s výdaji. Zítra vám pošlu e-mail se všemi podrobnostmi. "
+        "Pravdou je, že projekt jde dobře a jsem si jistý, že to stihneme včas. Děkuji moc a hezké odpoledne."
+    ),
+    "hu": (
+        "Sziasztok, köszönöm, hogy ma eljöttetek. Az értekezletet egy rövid áttekintéssel kezdjük arról, amit "
+        "a múlt héten csináltunk, utána pedig a következő lépésekről beszélünk. Az értékesítési csapat három új "
+        "szerződést kötött, és nagyon elégedettek vagyunk az eredményekkel. Szerintem még javítanunk kell az "
+        "osztályok közötti kommunikációt, mert néha nem tudjuk, ki felel az egyes feladatokért. Van valakinek "
+        "kérdése, mielőtt továbbmegyünk? Rendben, ha nincs kérdés, áttérünk a következő napirendi pontra. Azt "
+        "is szerettem volna mondani, hogy az idei költségvetés kisebb, mint a tavalyi, ezért óvatosnak kell "
+        "lennünk a kiadásokkal. Holnap küldök nektek egy e-mailt az összes részlettel. Az igazság az, hogy a "
+        "projekt jól halad, és biztos vagyok benne, hogy időben elkészülünk. Köszönöm szépen mindenkinek."
+    ),
+    "vi": (
+        "Xin chào mọi người, cảm ơn các bạn đã đến hôm nay. Chúng ta sẽ bắt đầu cuộc họp bằng việc điểm lại "
+        "những gì đã làm tuần trước và sau đó nói về các bước tiếp theo. Nhóm bán hàng đã ký được ba hợp đồng "
+        "mới và chúng tôi rất hài lòng với kết quả. Tôi nghĩ chúng ta vẫn cần cải thiện việc trao đổi giữa các "
+        "phòng ban, vì đôi khi chúng ta không biết ai phụ trách công việc nào. Có ai có câu hỏi gì trước khi "
+        "chúng ta tiếp tục không? Được rồi, nếu không có câu hỏi thì chúng ta chuyển sang mục tiếp theo. Tôi "
+        "cũng muốn nói rằng ngân sách năm nay nhỏ hơn năm ngoái, vì vậy chúng ta phải cẩn thận với các khoản "
+        "chi. Ngày mai tôi sẽ gửi cho các bạn một email với đầy đủ chi tiết. Thật ra dự án đang tiến triển tốt "
+        "và tôi chắc chắn rằng chúng ta sẽ hoàn thành đúng hạn. Cảm ơn mọi người rất nhiều."
+    ),
+    "id": (
+        "Halo semuanya, terima kasih sudah datang hari ini. Kita akan memulai rapat dengan ringkasan singkat "
+        "tentang apa yang kita kerjakan minggu lalu dan setelah itu kita bicara tentang langkah berikutnya. Tim "
+        "penjualan sudah menandatangani tiga kontrak baru dan kami sangat senang dengan hasilnya. Saya pikir kita "
+        "masih perlu memperbaiki komunikasi antara departemen, karena kadang-kadang kita tidak tahu siapa yang "
+        "bertanggung jawab atas setiap tugas. Apakah ada yang punya pertanyaan sebelum kita lanjut? Baik, kalau "
+        "tidak ada pertanyaan, kita pindah ke poin berikutnya. Saya juga mau bilang bahwa anggaran tahun ini "
+        "lebih kecil daripada tahun lalu, jadi kita harus hati-hati dengan pengeluaran. Besok saya akan kirim "
+        "email dengan semua rinciannya. Sebenarnya proyeknya berjalan lancar dan saya yakin kita akan selesai "
+        "tepat waktu. Terima kasih banyak, sampai jumpa minggu depan. "
+        "Nggak apa-apa kok, nanti saya bantu cari solusinya. Kamu bisa kirim datanya sekarang? Soalnya "
+        "kemarin saya belum sempat membaca semua dokumennya karena ada urusan keluarga. Kalau sudah siap, "
+        "kabari saya lewat pesan saja ya, biar kita bisa langsung mulai. Memang agak susah, tapi pasti bisa."
+    ),
+    "ms": (
+        "Hai semua, terima kasih kerana datang hari ini. Kita akan mulakan mesyuarat dengan ringkasan pendek "
+        "tentang apa yang kita buat minggu lepas dan selepas itu kita bincang tentang langkah seterusnya. "
+        "Pasukan jualan telah menandatangani tiga kontrak baharu dan kami sangat gembira dengan keputusannya. "
+        "Saya rasa kita masih perlu memperbaiki komunikasi antara jabatan, kerana kadang-kadang kita tidak tahu "
+        "siapa yang bertanggungjawab bagi setiap tugasan. Ada sesiapa yang ada soalan sebelum kita teruskan? "
+        "Baiklah, jika tiada soalan, kita beralih ke perkara seterusnya. Saya juga ingin menyatakan bahawa "
+        "belanjawan tahun ini lebih kecil berbanding tahun lepas, jadi kita mesti berhati-hati dengan "
+        "perbelanjaan. Esok saya akan hantar e-mel dengan semua butirannya. Sebenarnya projek ini berjalan "
+        "dengan baik dan saya pasti kita akan siap tepat pada masanya. Terima kasih banyak-banyak. "
+        "Tak apa, nanti saya tolong carikan penyelesaiannya. Awak boleh hantar datanya sekarang? Sebab "
+        "semalam saya belum sempat baca semua dokumen kerana ada urusan keluarga. Kalau dah siap, "
+        "beritahu saya melalui mesej sahaja, supaya kita boleh terus mula. Memang agak susah, tetapi pasti boleh."
+    ),
+}
@@ -0,0 +1,333 @@
+# app/services/llm_cache.py
+# -*- coding: utf-8 -*-
+"""
+Caché de resultados del LLM (resúmenes y traducciones).
+
+Re-resumir o traducir el mismo texto al mismo idioma con el mismo modelo y
+prompt devuelve lo guardado sin llamar a OpenAI. La clave es:
+
+    sha256(tipo | sha256(texto normalizado) | idioma | modelo | versión del prompt | temperatura)
+
+Texto normalizado = NFC + espacios colapsados (un mismo transcript con otros
+saltos de línea o espacios da la misma clave). Las traducciones ("translate")
+conservan los saltos de línea: el modelo respeta los párrafos/líneas del
+original, así que dos textos que sólo difieren en ellos no comparten resultado.
+
+Dos niveles:
+  1) LRU en proceso (siempre): límite de entradas y de MB, TTL.
+  2) Opcional, compartido entre procesos (LLM_CACHE_BACKEND):
+       "redis"  SETEX en LLM_CACHE_REDIS_URL (o REDIS_URL)
+       "sql"    tabla llm_cache (app/models_cache.py), LRU por last_used_at
+     Un acierto en el nivel 2 se copia al LRU local.
+
+Funciones públicas:
+    normalize_text(text, keep_newlines=False) -> str
+    make_key(kind, text, lang, model, prompt_version, temperature) -> str
+    get(key) -> Optional[str]
+    put(key, value, kind="")
+    cached(kind, text, lang, model, prompt_version, temperature, compute) -> str
+    stats() -> dict   (aciertos/fallos por nivel; GET /healthz/cache)
+
+Nunca lanza por culpa de la caché: si Redis/SQL falla, se calcula y listo.
+No se guardan resultados vacíos.
+
+Variables de entorno:
+    LLM_CACHE              "1" (default) activa la caché
+    LLM_CACHE_MAX_ITEMS    entradas del LRU en proceso (default 512)
+    LLM_CACHE_MAX_MB       MB del LRU en proceso (default 32) y de la tabla SQL (x16)
+    LLM_CACHE_TTL_DAYS     días desde el último uso (default 30)
+    LLM_CACHE_BACKEND      "" (solo memoria, default) | "redis" | "sql"
+    LLM_CACHE_REDIS_URL    URL de Redis (default REDIS_URL)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+import datetime as dt
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+LLM_CACHE_MAX_ITEMS = int(os.getenv("LLM_CACHE_MAX_ITEMS", "512") or 512)
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "32") or 32)
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30") or 30)
+LLM_CACHE_BACKEND = (os.getenv("LLM_CACHE_BACKEND", "") or "").strip().lower()
+LLM_CACHE_REDIS_URL = os.getenv("LLM_CACHE_REDIS_URL") or os.getenv("REDIS_URL") or ""
+
+_TTL_SECONDS = LLM_CACHE_TTL_DAYS * 86400
+_RE_WS = re.compile(r"\s+")
+_RE_HWS = re.compile(r"[^\S\n]+")  # espacios salvo \n
+_KEEP_NEWLINES_KINDS = ("translate",)
+
+_lock = threading.Lock()
+_lru: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (último uso, valor)
+_lru_bytes = 0
+_stats: Dict[str, int] = {"hits_memory": 0, "hits_shared": 0, "misses": 0, "stores": 0, "errors": 0}
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def normalize_text(text: str, keep_newlines: bool = False) -> str:
+    text = unicodedata.normalize("NFC", text or "")
+    if not keep_newlines:
+        return _RE_WS.sub(" ", text).strip()
+    lines = (_RE_HWS.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(lines).strip()
+
+
+def make_key(
+    kind: str,
+    text: str,
+    lang: Optional[str],
+    model: str,
+    prompt_version: str,
+    temperature: float,
+) -> str:
+    normalized = normalize_text(text, keep_newlines=kind in _KEEP_NEWLINES_KINDS)
+    text_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    raw = "|".join([kind, text_hash, (lang or "auto").lower(), model, prompt_version, f"{float(temperature):.3f}"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Nivel 1: LRU en proceso
+# ---------------------------------------------------------------------------
+def _size(value: str) -> int:
+    return len(value.encode("utf-8")) + 64
+
+
+def _mem_get(key: str) -> Optional[str]:
+    now = time.time()
+    with _lock:
+        item = _lru.get(key)
+        if item is None:
+            return None
+        used, value = item
+        if _TTL_SECONDS > 0 and used < now - _TTL_SECONDS:
+            _mem_drop(key)
+            return None
+        _lru[key] = (now, value)
+        _lru.move_to_end(key)
+        return value
+
+
+def _mem_drop(key: str) -> None:
+    global _lru_bytes
+    item = _lru.pop(key, None)
+    if item is not None:
+        _lru_bytes -= _size(item[1])
+
+
+def _mem_put(key: str, value: str) -> None:
+    global _lru_bytes
+    max_bytes = int(LLM_CACHE_MAX_MB * 1024 * 1024)
+    with _lock:
+        _mem_drop(key)
+        _lru[key] = (time.time(), value)
+        _lru_bytes += _size(value)
+        while _lru and (len(_lru) > LLM_CACHE_MAX_ITEMS or _lru_bytes > max_bytes):
+            _mem_drop(next(iter(_lru)))
+
+
+# ---------------------------------------------------------------------------
+# Nivel 2: Redis / SQL
+# ---------------------------------------------------------------------------
+class _RedisTier:
+    prefix = "polyscribe:llm:"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._r = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+
+    def get(self, key: str) -> Optional[str]:
+        raw = self._r.get(self.prefix + key)
+        if raw is None:
+            return None
+        if _TTL_SECONDS > 0:
+            self._r.expire(self.prefix + key, int(_TTL_SECONDS))  # TTL desde el último uso
+        return raw.decode("utf-8")
+
+    def put(self, key: str, value: str, kind: str) -> None:
+        if _TTL_SECONDS > 0:
+            self._r.setex(self.prefix + key, int(_TTL_SECONDS), value.encode("utf-8"))
+        else:
+            self._r.set(self.prefix + key, value.encode("utf-8"))
+
+
+class _SqlTier:
+    """Tabla llm_cache; misma política que transcript_cache (TTL por uso + LRU por tamaño)."""
+
+    def get(self, key: str) -> Optional[str]:
+        from app.extensions import db
+        from app.models_cache import LLMCache
+
+        try:
+            entry = db.session.get(LLMCache, key)
+            if entry is None:
+                return None
+            now = dt.datetime.utcnow()
+            if _TTL_SECONDS > 0 and entry.last_used_at < now - dt.timedelta(seconds=_TTL_SECONDS):
+                db.session.delete(entry)
+                db.session.commit()
+                return None
+            entry.hits = int(entry.hits or 0) + 1
+            entry.last_used_at = now
+            db.session.commit()
+            return entry.value
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def put(self, key: str, value: str, kind: str) -> None:
+        from app.extensions import db
+        from app.models_cache import LLMCache
+
+        try:
+            now = dt.datetime.utcnow()
+            entry = db.session.get(LLMCache, key) or LLMCache(key=key, hits=0, created_at=now)
+            entry.kind = kind[:32]
+            entry.value = value
+            entry.size_bytes = len(value.encode("utf-8"))
+            entry.last_used_at = now
+            db.session.add(entry)
+            db.session.commit()
+            self._evict(now)
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _evict(self, now: dt.datetime) -> None:
+        from sqlalchemy import func
+
+        from app.extensions import db
+        from app.models_cache import LLMCache
+
+        if _TTL_SECONDS > 0:
+            cutoff = now - dt.timedelta(seconds=_TTL_SECONDS)
+            db.session.query(LLMCache).filter(LLMCache.last_used_at < cutoff).delete(synchronize_session=False)
+            db.session.commit()
+
+        max_bytes = int(LLM_CACHE_MAX_MB * 16 * 1024 * 1024)
+        total = int(db.session.query(func.coalesce(func.sum(LLMCache.size_bytes), 0)).scalar() or 0)
+        if total <= max_bytes:
+            return
+        doomed = []
+        q = db.session.query(LLMCache.key, LLMCache.size_bytes).order_by(LLMCache.last_used_at.asc()).yield_per(200)
+        for key, size in q:
+            if total <= max_bytes:
+                break
+            doomed.append(key)
+            total -= int(size or 0)
+        if doomed:
+            db.session.query(LLMCache).filter(LLMCache.key.in_(doomed)).delete(synchronize_session=False)
+            db.session.commit()
+            log.info("llm_cache: %d entradas SQL expulsadas (LRU)", len(doomed))
+
+
+_tier = None
+_tier_ready = False
+
+
+def _shared():
+    global _tier, _tier_ready
+    if _tier_ready:
+        return _tier
+    with _lock:
+        if not _tier_ready:
+            try:
+                if LLM_CACHE_BACKEND == "redis" and LLM_CACHE_REDIS_URL:
+                    _tier = _RedisTier(LLM_CACHE_REDIS_URL)
+                elif LLM_CACHE_BACKEND == "sql":
+                    _tier = _SqlTier()
+                elif LLM_CACHE_BACKEND:
+                    log.warning("llm_cache: backend desconocido o sin configurar: %r", LLM_CACHE_BACKEND)
+            except Exception as e:
+                log.warning("llm_cache: no se pudo iniciar el backend %s: %s", LLM_CACHE_BACKEND, e)
+                _tier = None
+            _tier_ready = True
+    return _tier
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+def get(key: str) -> Optional[str]:
+    """Valor guardado (memoria y luego nivel compartido) o None. Nunca lanza."""
+    if not LLM_CACHE_ENABLED or not key:
+        return None
+    value = _mem_get(key)
+    if value is not None:
+        _count("hits_memory")
+        return value
+    tier = _shared()
+    if tier is not None:
+        try:
+            value = tier.get(key)
+        except Exception as e:
+            log.warning("llm_cache: get falló: %s", e)
+            _count("errors")
+            value = None
+        if value is not None:
+            _mem_put(key, value)
+            _count("hits_shared")
+            return value
+    _count("misses")
+    return None
+
+
+def put(key: str, value: str, kind: str = "") -> None:
+    """Guarda en ambos niveles (vacíos no). Nunca lanza."""
+    if not LLM_CACHE_ENABLED or not key or not (value or "").strip():
+        return
+    _mem_put(key, value)
+    _count("stores")
+    tier = _shared()
+    if tier is not None:
+        try:
+            tier.put(key, value, kind)
+        except Exception as e:
+            log.warning("llm_cache: put falló: %s", e)
+            _count("errors")
+
+
+def cached(
+    kind: str,
+    text: str,
+    lang: Optional[str],
+    model: str,
+    prompt_version: str,
+    temperature: float,
+    compute: Callable[[], str],
+) -> str:
+    """compute() sólo si no hay nada guardado para esta combinación; sus excepciones se propagan."""
+    if not LLM_CACHE_ENABLED:
+        return compute()
+    key = make_key(kind, text, lang, model, prompt_version, temperature)
+    value = get(key)
+    if value is not None:
+        return value
+    value = compute()
+    put(key, value, kind)
+    return value
+
+
+def stats() -> Dict[str, object]:
+    with _lock:
+        out: Dict[str, object] = dict(_stats)
+        out["memory_items"] = len(_lru)
+        out["memory_bytes"] = _lru_bytes
+    out["backend"] = LLM_CACHE_BACKEND or "memory"
+    out["enabled"] = LLM_CACHE_ENABLED
+    return out
@@ -0,0 +1,207 @@
+# app/services/long_summary.py
+# -*- coding: utf-8 -*-
+"""
+Resumen jerárquico (map-reduce) para transcripciones largas.
+
+Un solo chat con la transcripción entera es lento (la salida espera a leer
+todo) y se sale del contexto en grabaciones de horas; recortar el texto
+resume sólo los primeros minutos. Aquí:
+
+  1) Si el texto cabe en SUMMARY_CHUNK_TOKENS => una sola llamada (camino rápido).
+  2) Si no, se parte en trozos <= SUMMARY_CHUNK_TOKENS por párrafos, líneas
+     o frases (nunca a mitad de frase salvo frases gigantes).
+  3) map: cada trozo se resume en paralelo (SUMMARY_FAN_OUT en vuelo).
+  4) reduce: los resúmenes parciales, en orden, se combinan en uno. Si aun
+     así no caben, se combinan por grupos en paralelo (árbol de log(n) niveles).
+     Si tras _MAX_LEVELS niveles siguen sin caber (el modelo no acorta), se
+     recorta cada grupo a su parte del presupuesto antes del reduce final.
+
+La latencia depende de ceil(trozos / SUMMARY_FAN_OUT) rondas, no del largo.
+
+Función pública:
+    summarize_long(text, call) -> str
+
+'call(texto, etapa)' hace UNA llamada al LLM con el prompt de quien llama;
+etapa es SINGLE (texto completo), MAP (una parte) o REDUCE (resúmenes
+parciales a combinar). Corre en hilos del pool: no debe depender de
+current_app / db.session.
+
+Variables de entorno:
+    SUMMARY_CHUNK_TOKENS    tokens máx. por llamada (default 6000)
+    SUMMARY_FAN_OUT         llamadas map en paralelo por resumen (default 8)
+    SUMMARY_CHARS_PER_TOKEN estimación sin tiktoken (default 3.5)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import logging
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+log = logging.getLogger(__name__)
+
+SUMMARY_CHUNK_TOKENS = max(200, int(os.getenv("SUMMARY_CHUNK_TOKENS", "6000") or 6000))
+SUMMARY_FAN_OUT = max(1, int(os.getenv("SUMMARY_FAN_OUT", "8") or 8))
+SUMMARY_CHARS_PER_TOKEN = float(os.getenv("SUMMARY_CHARS_PER_TOKEN", "3.5") or 3.5)
+
+SINGLE = "single"
+MAP = "map"
+REDUCE = "reduce"
+
+# Nunca más de esta profundidad de reduce (evita bucles si el modelo no acorta)
+_MAX_LEVELS = 4
+
+_RE_PARAGRAPHS = re.compile(r"\n\s*\n")
+_RE_SENTENCES = re.compile(r"(?<=[.!?…。！？])\s+")
+
+_encoding = None
+if importlib.util.find_spec("tiktoken") is not None:  # opcional: conteo exacto
+    try:
+        import tiktoken
+
+        _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # pragma: no cover
+        log.warning("tiktoken no disponible, se estima por caracteres: %s", e)
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return int(len(text) / SUMMARY_CHARS_PER_TOKEN) + 1
+
+
+def _pieces(text: str, budget: int) -> List[str]:
+    """Unidades <= budget: párrafos; si no caben, líneas; luego frases; luego palabras."""
+    out: List[str] = []
+    for para in _RE_PARAGRAPHS.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        if estimate_tokens(para) <= budget:
+            out.append(para)
+            continue
+        for line in para.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if estimate_tokens(line) <= budget:
+                out.append(line)
+                continue
+            for sent in _RE_SENTENCES.split(line):
+                if estimate_tokens(sent) <= budget:
+                    out.append(sent)
+                    continue
+                # Frase gigante (ASR sin puntuación): cortar por palabras
+                cur: List[str] = []
+                cur_tokens = 0
+                for w in sent.split():
+                    n = estimate_tokens(w + " ")
+                    if n > budget:
+                        # Ni una palabra cabe (idiomas sin espacios): cortar por caracteres
+                        if cur:
+                            out.append(" ".join(cur))
+                            cur, cur_tokens = [], 0
+                        step = max(1, len(w) * budget // n)
+                        out.extend(w[i:i + step] for i in range(0, len(w), step))
+                        continue
+                    if cur and cur_tokens + n > budget:
+                        out.append(" ".join(cur))
+                        cur, cur_tokens = [], 0
+                    cur.append(w)
+                    cur_tokens += n
+                if cur:
+                    out.append(" ".join(cur))
+    return out
+
+
+def split_text(text: str, budget: Optional[int] = None) -> List[str]:
+    """Agrupa las unidades de _pieces en trozos de hasta 'budget' tokens, en orden."""
+    budget = budget or SUMMARY_CHUNK_TOKENS
+    chunks: List[str] = []
+    cur: List[str] = []
+    cur_tokens = 0
+    for piece in _pieces(text, budget):
+        n = estimate_tokens(piece) + 1
+        if cur and cur_tokens + n > budget:
+            chunks.append("\n".join(cur))
+            cur, cur_tokens = [], 0
+        cur.append(piece)
+        cur_tokens += n
+    if cur:
+        chunks.append("\n".join(cur))
+    return chunks
+
+
+def _map(chunks: List[str], call: Callable[[str, str], str], fan_out: int, stage: str) -> List[str]:
+    """Resume cada trozo (en paralelo) y devuelve los parciales en el orden original."""
+    if len(chunks) == 1:
+        return [(call(chunks[0], stage) or "").strip()]
+
+    results: List[str] = [""] * len(chunks)
+    errors: List[Exception] = []
+    with ThreadPoolExecutor(max_workers=min(len(chunks), fan_out), thread_name_prefix="summary") as pool:
+        futures = [pool.submit(call, c, stage) for c in chunks]
+        for i, fut in enumerate(futures):
+            try:
+                results[i] = (fut.result() or "").strip()
+            except Exception as e:
+                log.warning("long_summary: parte %d/%d falló: %s", i + 1, len(chunks), e)
+                errors.append(e)
+    if errors and len(errors) == len(chunks):
+        raise errors[0]
+    return [r for r in results if r]
+
+
+def _fit(text: str, budget: int) -> str:
+    """Recorta 'text' a ~budget tokens repartiendo el cupo entre sus partes (no sólo el principio)."""
+    chunks = split_text(text, budget)
+    share = max(1, budget // len(chunks) - 1)
+    out = "\n\n".join(split_text(c, share)[0] for c in chunks)
+    # Con más partes que tokens de presupuesto ni eso alcanza: queda el principio
+    return out if estimate_tokens(out) <= budget else split_text(out, budget)[0]
+
+
+def summarize_long(
+    text: str,
+    call: Callable[[str, str], str],
+    *,
+    budget: Optional[int] = None,
+    fan_out: Optional[int] = None,
+) -> str:
+    """
+    Resume 'text' con una llamada si cabe en 'budget' tokens; si no, map-reduce
+    con hasta 'fan_out' llamadas en paralelo. Las excepciones de 'call' se
+    propagan si fallan todas las partes (o la llamada única / el reduce final).
+    """
+    text = (text or "").strip()
+    if not text:
+        return ""
+    budget = budget or SUMMARY_CHUNK_TOKENS
+    fan_out = fan_out or SUMMARY_FAN_OUT
+
+    if estimate_tokens(text) <= budget:
+        return (call(text, SINGLE) or "").strip()
+
+    current = text
+    for level in range(_MAX_LEVELS):
+        chunks = split_text(current, budget)
+        log.info("long_summary: nivel %d, %d partes (fan-out %d)", level, len(chunks), fan_out)
+        # Nivel 0 resume texto; los siguientes combinan resúmenes parciales
+        partials = _map(chunks, call, fan_out, MAP if level == 0 else REDUCE)
+        current = "\n\n".join(partials)
+        if not current:
+            return ""
+        if estimate_tokens(current) <= budget:
+            break
+    else:
+        log.warning(
+            "long_summary: tras %d niveles quedan %d tokens (> %d); se recorta antes del reduce final",
+            _MAX_LEVELS, estimate_tokens(current), budget,
+        )
+        current = _fit(current, budget)
+    return (call(current, REDUCE) or "").strip()
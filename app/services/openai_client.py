@@ -0,0 +1,159 @@
+# app/services/openai_client.py
+# -*- coding: utf-8 -*-
+"""
+Cliente OpenAI compartido por todo el proceso.
+
+Un único OpenAI(...) sobre un httpx.Client con pool de conexiones (keep-alive,
+HTTP/2 si está 'h2', límites y timeouts) para ASR y chat. Evita crear un
+cliente + handshake TLS por llamada y hace que el límite de conexiones sea
+global por proceso.
+
+Funciones públicas:
+    get_client() -> Optional[OpenAI]   (None si falta el SDK o OPENAI_API_KEY)
+    get_async_client() -> Optional[AsyncOpenAI]
+        mismo pool/timeouts sobre httpx.AsyncClient; sólo para el event loop
+        de app/services/provider.py (un cliente async queda atado a su loop)
+
+Comportamiento:
+  - Creación perezosa y thread-safe.
+  - Se recrea tras un fork (gunicorn/celery prefork): un pool de sockets no
+    se debe compartir entre procesos.
+
+Variables de entorno:
+    OPENAI_HTTP_MAX_CONNECTIONS    (default 64)
+    OPENAI_HTTP_MAX_KEEPALIVE      (default 32)
+    OPENAI_HTTP_KEEPALIVE_EXPIRY   segundos (default 90)
+    OPENAI_HTTP_CONNECT_TIMEOUT    segundos (default 10)
+    OPENAI_HTTP_TIMEOUT            segundos de lectura/escritura (default 600; subir audio puede tardar)
+    OPENAI_HTTP2                   "1" (default) usa HTTP/2 si el paquete 'h2' está instalado
+    OPENAI_MAX_RETRIES             reintentos del SDK (default 2; con RATE_LIMIT=1 provider.py
+                                   llama con max_retries=0 y reintenta él, pasando por el limitador;
+                                   el ASR por partes va con max_retries=0 y reintenta ASR_MAX_RETRIES)
+"""
+
+from __future__ import annotations
+
+import os
+import logging
+import threading
+import importlib.util
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+try:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+except Exception as e:  # pragma: no cover
+    httpx = None  # type: ignore
+    OpenAI = AsyncOpenAI = None  # type: ignore
+    log.warning("OpenAI SDK / httpx no disponible: %s", e)
+
+_lock = threading.Lock()
+_client = None
+_client_pid: Optional[int] = None
+_async_client = None
+_async_client_pid: Optional[int] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("OPENAI_HTTP2", "1") != "1":
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_http_client(async_: bool = False):
+    limits = httpx.Limits(
+        max_connections=int(_env_float("OPENAI_HTTP_MAX_CONNECTIONS", 64)),
+        max_keepalive_connections=int(_env_float("OPENAI_HTTP_MAX_KEEPALIVE", 32)),
+        keepalive_expiry=_env_float("OPENAI_HTTP_KEEPALIVE_EXPIRY", 90),
+    )
+    io_timeout = _env_float("OPENAI_HTTP_TIMEOUT", 600)
+    timeout = httpx.Timeout(
+        connect=_env_float("OPENAI_HTTP_CONNECT_TIMEOUT", 10),
+        read=io_timeout,
+        write=io_timeout,
+        pool=io_timeout,
+    )
+    cls = httpx.AsyncClient if async_ else httpx.Client
+    return cls(limits=limits, timeout=timeout, http2=_http2_enabled())
+
+
+def _api_key() -> Optional[str]:
+    # Por si .env se carga después del import (celery / scripts)
+    if not os.getenv("OPENAI_API_KEY"):
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv(override=False)
+        except Exception:
+            pass
+    return os.getenv("OPENAI_API_KEY")
+
+
+def get_client():
+    """
+    Devuelve el cliente OpenAI compartido del proceso, o None si el SDK no
+    está instalado o no hay OPENAI_API_KEY.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    if OpenAI is None:
+        return None
+
+    with _lock:
+        if _client is not None and _client_pid == pid:
+            return _client
+
+        api_key = _api_key()
+        if not api_key:
+            return None
+
+        _client = OpenAI(
+            api_key=api_key,
+            http_client=_build_http_client(),
+            max_retries=int(_env_float("OPENAI_MAX_RETRIES", 2)),
+        )
+        _client_pid = pid
+        log.info("openai_client: pool listo (pid=%s, http2=%s)", pid, _http2_enabled())
+        return _client
+
+
+def get_async_client():
+    """
+    Devuelve el AsyncOpenAI del proceso, o None (mismas condiciones que
+    get_client). Llamar sólo desde el event loop de provider.py.
+    """
+    global _async_client, _async_client_pid
+
+    pid = os.getpid()
+    if _async_client is not None and _async_client_pid == pid:
+        return _async_client
+    if AsyncOpenAI is None:
+        return None
+
+    with _lock:
+        if _async_client is not None and _async_client_pid == pid:
+            return _async_client
+        api_key = _api_key()
+        if not api_key:
+            return None
+
+        _async_client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=_build_http_client(async_=True),
+            max_retries=int(_env_float("OPENAI_MAX_RETRIES", 2)),
+        )
+        _async_client_pid = pid
+        log.info("openai_client: pool async listo (pid=%s, http2=%s)", pid, _http2_enabled())
+        return _async_client
@@ -0,0 +1,279 @@
+# app/services/provider.py
+# -*- coding: utf-8 -*-
+"""
+Punto único de las llamadas a OpenAI (ASR y chat), bloqueantes o con asyncio.
+
+Con el cliente sync cada llamada ocupa su hilo / slot de celery / worker de
+gunicorn durante todo el round-trip (segundos a minutos por parte de audio).
+Con PROVIDER_ASYNC=1 las llamadas se ejecutan en un event loop propio del
+proceso (hilo "provider-loop") con AsyncOpenAI sobre un solo pool HTTP:
+
+  - quien llama sólo espera un Future (transcribe/chat) o lanza muchas a la
+    vez (submit + atranscribe_with_retry), p.ej. todas las partes de un job;
+  - los semáforos PROVIDER_ASR_CONCURRENCY / PROVIDER_CHAT_CONCURRENCY acotan
+    las llamadas en vuelo de TODO el proceso, no por hilo ni por tarea;
+  - los reintentos con backoff esperan con asyncio.sleep sin ocupar cupo.
+
+Así un worker celery "-Q io -P threads -c 200" o unos pocos procesos con
+JOBS_MODE=thread mantienen cientos de llamadas en vuelo. Subir también
+OPENAI_HTTP_MAX_CONNECTIONS (HTTP/2 multiplexa si está 'h2').
+
+Con PROVIDER_ASYNC=0 (default) transcribe/chat usan el cliente sync de
+siempre: mismo comportamiento que antes.
+
+En ambos modos cada llamada pasa por app/services/ratelimit.py (RPM/TPM por
+modelo, compartido entre procesos): se reserva antes de llamar, se ajusta
+con las cabeceras x-ratelimit-* y usage, y ante un 429 se pausa el modelo
+para todos y se reintenta (RATE_LIMIT_RETRIES) en vez de que el SDK
+reintente por su cuenta. Los reintentos van en una sola capa: con
+retries=0 (ASR por partes, que ya reintenta con ASR_MAX_RETRIES) aquí se
+hace un solo intento; el 429 igual pausa el modelo antes de propagarse.
+
+Funciones públicas:
+    transcribe(path, filename=None, retries=None, **params) -> respuesta de audio.transcriptions.create
+    chat(**params) -> respuesta de chat.completions.create
+    submit(coro) -> concurrent.futures.Future        (corre coro en el loop del proceso)
+    atranscribe(path, filename=None, retries=None, **params)  (coroutine)
+    achat(**params)                                  (coroutine)
+    atranscribe_with_retry(path, retries, base_delay, filename=None, **params)  (coroutine)
+
+Variables de entorno:
+    PROVIDER_ASYNC              "1" = llamadas en el event loop con AsyncOpenAI (default 0)
+    PROVIDER_ASR_CONCURRENCY    transcripciones en vuelo por proceso (default 64)
+    PROVIDER_CHAT_CONCURRENCY   llamadas de chat en vuelo por proceso (default 64)
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+from app.services import ratelimit
+from app.services.openai_client import get_async_client, get_client
+
+log = logging.getLogger(__name__)
+
+PROVIDER_ASYNC = os.getenv("PROVIDER_ASYNC", "0") == "1"
+PROVIDER_ASR_CONCURRENCY = max(1, int(os.getenv("PROVIDER_ASR_CONCURRENCY", "64") or 64))
+PROVIDER_CHAT_CONCURRENCY = max(1, int(os.getenv("PROVIDER_CHAT_CONCURRENCY", "64") or 64))
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_asr_sem: Optional[asyncio.Semaphore] = None
+_chat_sem: Optional[asyncio.Semaphore] = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Event loop del proceso en un hilo daemon; se recrea tras un fork."""
+    global _loop, _loop_pid, _asr_sem, _chat_sem
+
+    pid = os.getpid()
+    if _loop is not None and _loop_pid == pid:
+        return _loop
+    with _lock:
+        if _loop is not None and _loop_pid == pid:
+            return _loop
+        loop = asyncio.new_event_loop()
+
+        async def _make_semaphores():
+            return asyncio.Semaphore(PROVIDER_ASR_CONCURRENCY), asyncio.Semaphore(PROVIDER_CHAT_CONCURRENCY)
+
+        threading.Thread(target=loop.run_forever, name="provider-loop", daemon=True).start()
+        _asr_sem, _chat_sem = asyncio.run_coroutine_threadsafe(_make_semaphores(), loop).result()
+        _loop, _loop_pid = loop, pid
+        log.info(
+            "provider: event loop listo (pid=%s, asr=%d, chat=%d en vuelo)",
+            pid, PROVIDER_ASR_CONCURRENCY, PROVIDER_CHAT_CONCURRENCY,
+        )
+        return _loop
+
+
+def submit(coro: Coroutine[Any, Any, Any]) -> Future:
+    """Programa coro en el loop del proceso; el Future se puede esperar desde cualquier hilo."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def _usage_tokens(res: Any) -> Optional[int]:
+    usage = getattr(res, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return int(total) if total is not None else None
+
+
+def _backoff(attempt: int, exc: BaseException) -> Optional[float]:
+    """Segundos antes del reintento 'attempt' (1..), o None si exc no se reintenta."""
+    status = getattr(exc, "status_code", None)
+    if status == 429:
+        return ratelimit.retry_after(exc)
+    if (status and (status >= 500 or status in (408, 409))) or type(exc).__name__ in (
+        "APIConnectionError",
+        "APITimeoutError",
+    ):
+        delay = 0.5 * (2 ** (attempt - 1))
+        return delay + random.uniform(0, delay / 2)
+    return None
+
+
+def _call_limited(client, model: str, tokens: int, fn, retries: Optional[int] = None) -> Any:
+    """
+    fn(client) -> respuesta cruda (with_raw_response). Reserva en el
+    limitador, reintenta 429/5xx con su propio backoff (el SDK va con
+    max_retries=0 para no saltarse el limitador) y aprende de las cabeceras.
+    retries=None usa los reintentos por defecto; quien ya reintenta por su
+    cuenta (ASR por partes) pasa retries=0 para no multiplicar intentos.
+    """
+    if not ratelimit.RATE_LIMIT_ENABLED:
+        if retries is not None:
+            client = client.with_options(max_retries=retries)
+        return fn(client).parse()
+    retries = ratelimit.RATE_LIMIT_RETRIES if retries is None else retries
+    client = client.with_options(max_retries=0)
+    attempt = 0
+    while True:
+        ratelimit.acquire(model, tokens)
+        try:
+            raw = fn(client)
+        except Exception as e:
+            attempt += 1
+            delay = _backoff(attempt, e)
+            if delay is not None and getattr(e, "status_code", None) == 429:
+                ratelimit.pause(model, delay)  # el próximo acquire (de cualquiera) espera, reintente o no éste
+            if delay is None or attempt > retries:
+                raise
+            if getattr(e, "status_code", None) != 429:
+                time.sleep(delay)
+            continue
+        res = raw.parse()
+        ratelimit.observe(model, raw.headers)
+        ratelimit.settle(model, tokens, _usage_tokens(res))
+        return res
+
+
+async def _acall_limited(client, model: str, tokens: int, fn, retries: Optional[int] = None) -> Any:
+    """Igual que _call_limited con fn(client) awaitable y esperas con asyncio.sleep."""
+    if not ratelimit.RATE_LIMIT_ENABLED:
+        if retries is not None:
+            client = client.with_options(max_retries=retries)
+        return (await fn(client)).parse()
+    retries = ratelimit.RATE_LIMIT_RETRIES if retries is None else retries
+    client = client.with_options(max_retries=0)
+    attempt = 0
+    while True:
+        await ratelimit.aacquire(model, tokens)
+        try:
+            raw = await fn(client)
+        except Exception as e:
+            attempt += 1
+            delay = _backoff(attempt, e)
+            if delay is not None and getattr(e, "status_code", None) == 429:
+                await asyncio.to_thread(ratelimit.pause, model, delay)
+            if delay is None or attempt > retries:
+                raise
+            if getattr(e, "status_code", None) != 429:
+                await asyncio.sleep(delay)
+            continue
+        res = raw.parse()
+        ratelimit.observe(model, raw.headers)
+        ratelimit.settle(model, tokens, _usage_tokens(res))
+        return res
+
+
+def _async_client():
+    client = get_async_client()
+    if client is None:
+        raise RuntimeError("OpenAI no disponible (SDK u OPENAI_API_KEY).")
+    return client
+
+
+async def atranscribe(
+    path: str,
+    filename: Optional[str] = None,
+    retries: Optional[int] = None,
+    **params: Any,
+) -> Any:
+    client = _async_client()
+
+    async def _send(c):
+        # Cupo y archivo abierto sólo durante el envío (las esperas del
+        # limitador no ocupan cupo); httpx lee el archivo por bloques
+        async with _asr_sem:
+            with open(path, "rb") as f:
+                return await c.audio.transcriptions.with_raw_response.create(
+                    file=(filename, f) if filename else f, **params
+                )
+
+    return await _acall_limited(client, params.get("model", ""), 0, _send, retries)
+
+
+async def achat(**params: Any) -> Any:
+    client = _async_client()
+
+    async def _send(c):
+        async with _chat_sem:
+            return await c.chat.completions.with_raw_response.create(**params)
+
+    return await _acall_limited(client, params.get("model", ""), ratelimit.estimate_chat_tokens(params), _send)
+
+
+async def atranscribe_with_retry(
+    path: str,
+    retries: int,
+    base_delay: float,
+    filename: Optional[str] = None,
+    **params: Any,
+) -> Any:
+    """
+    atranscribe con backoff exponencial + jitter; la espera no ocupa cupo del
+    semáforo. Los reintentos son sólo estos: cada intento va con retries=0.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await atranscribe(path, filename, retries=0, **params)
+        except Exception as e:
+            attempt += 1
+            if attempt > retries:
+                raise
+            delay = base_delay * (2 ** (attempt - 1))
+            delay += random.uniform(0, delay / 2)
+            log.info("provider: ASR retry %d/%d en %.1fs (%s): %s", attempt, retries, delay, os.path.basename(path), e)
+            await asyncio.sleep(delay)
+
+
+def transcribe(path: str, filename: Optional[str] = None, retries: Optional[int] = None, **params: Any) -> Any:
+    """
+    audio.transcriptions.create sobre el archivo 'path' (bloquea sólo al hilo
+    que llama). retries=0 si quien llama ya tiene su bucle de reintentos.
+    """
+    if PROVIDER_ASYNC:
+        return submit(atranscribe(path, filename, retries=retries, **params)).result()
+    client = get_client()
+    if client is None:
+        raise RuntimeError("OpenAI no disponible (SDK u OPENAI_API_KEY).")
+
+    def _send(c):
+        with open(path, "rb") as f:
+            return c.audio.transcriptions.with_raw_response.create(file=(filename, f) if filename else f, **params)
+
+    return _call_limited(client, params.get("model", ""), 0, _send, retries)
+
+
+def chat(**params: Any) -> Any:
+    """chat.completions.create (bloquea sólo al hilo que llama)."""
+    if PROVIDER_ASYNC:
+        return submit(achat(**params)).result()
+    client = get_client()
+    if client is None:
+        raise RuntimeError("OpenAI no disponible (SDK u OPENAI_API_KEY).")
+    return _call_limited(
+        client,
+        params.get("model", ""),
+        ratelimit.estimate_chat_tokens(params),
+        lambda c: c.chat.completions.with_raw_response.create(**params),
+    )
@@ -0,0 +1,351 @@
+# app/services/ratelimit.py
+# -*- coding: utf-8 -*-
+"""
+Límite de llamadas a OpenAI compartido por todos los procesos (token buckets).
+
+Gunicorn, los workers celery y cada servicio llamaban al proveedor sin
+coordinarse: con más paralelismo llegan los 429 y, con los reintentos de
+cada uno por su lado, tormentas de reintentos. Aquí, por modelo:
+
+  - dos buckets, requests/minuto (RPM) y tokens/minuto (TPM), que se
+    rellenan de forma continua (capacidad / 60 por segundo);
+  - antes de llamar se reserva 1 request + los tokens ESTIMADOS (prompt +
+    max_tokens, como cuenta OpenAI); si no alcanza, el bucket queda en
+    deuda y quien llama espera lo que tarda en rellenarse (cola justa, sin
+    sondeos). Después se corrige con usage.total_tokens;
+  - las cabeceras x-ratelimit-limit-* / x-ratelimit-remaining-* de cada
+    respuesta ajustan el bucket (y dan la capacidad si no está configurada);
+  - un 429 con Retry-After pausa el modelo para TODOS hasta ese momento.
+
+Backend: Redis (RATE_LIMIT_REDIS_URL o REDIS_URL; un script Lua atómico con
+el reloj de Redis) para varios nodos; sin Redis, o si falla, buckets en
+proceso. Nunca lanza por culpa del limitador. Lo usa app/services/provider.py
+en todas las llamadas de ASR y chat.
+
+Funciones públicas:
+    reserve(model, tokens=0) -> float     segundos a esperar (ya reservado)
+    acquire(model, tokens=0) -> float     reserve + time.sleep
+    aacquire(model, tokens=0) -> float    reserve + asyncio.sleep
+    settle(model, estimated, used)        corrige el TPM con el uso real
+    observe(model, headers)               ajusta con las cabeceras x-ratelimit-*
+    retry_after(exc) -> Optional[float]   segundos a esperar si exc es un 429
+    pause(model, seconds)                 nadie llama a 'model' durante 'seconds'
+    estimate_chat_tokens(params) -> int
+
+Variables de entorno:
+    RATE_LIMIT                 "1" (default) activa el limitador
+    OPENAI_RATE_LIMITS         "modelo=rpm:tpm,..." p.ej. "gpt-4o-mini=5000:2000000,whisper-1=500:0"
+                               (0 = sin límite; sin entrada => se aprende de las cabeceras)
+    RATE_LIMIT_HEADROOM        fracción de la capacidad a usar (default 0.9)
+    RATE_LIMIT_RETRIES         reintentos ante 429/5xx de provider (default 4; el ASR por partes
+                               reintenta fuera, con ASR_MAX_RETRIES)
+    RATE_LIMIT_COMPLETION_TOKENS  tokens de salida estimados sin max_tokens (default 1000)
+    RATE_LIMIT_REDIS_URL       URL de Redis (default REDIS_URL; vacío = en proceso)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "1") == "1"
+RATE_LIMIT_HEADROOM = min(1.0, max(0.1, float(os.getenv("RATE_LIMIT_HEADROOM", "0.9") or 0.9)))
+RATE_LIMIT_RETRIES = max(0, int(os.getenv("RATE_LIMIT_RETRIES", "4") or 4))
+RATE_LIMIT_COMPLETION_TOKENS = max(0, int(os.getenv("RATE_LIMIT_COMPLETION_TOKENS", "1000") or 1000))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL") or os.getenv("REDIS_URL") or ""
+
+RPM = "rpm"
+TPM = "tpm"
+
+
+def _parse_limits(raw: str) -> Dict[str, Tuple[float, float]]:
+    out: Dict[str, Tuple[float, float]] = {}
+    for item in (raw or "").split(","):
+        name, _, values = item.strip().partition("=")
+        if not name or not values:
+            continue
+        rpm, _, tpm = values.partition(":")
+        try:
+            out[name.strip()] = (float(rpm or 0), float(tpm or 0))
+        except ValueError:
+            log.warning("ratelimit: OPENAI_RATE_LIMITS inválido: %r", item)
+    return out
+
+
+_configured = _parse_limits(os.getenv("OPENAI_RATE_LIMITS", ""))
+_learned: Dict[Tuple[str, str], float] = {}  # (modelo, rpm|tpm) -> límite que informa OpenAI
+
+
+def _capacity(model: str, kind: str) -> float:
+    """Capacidad por minuto ya con el margen; 0 = sin límite (o aún desconocido)."""
+    if model in _configured:
+        cap = _configured[model][0 if kind == RPM else 1]
+    else:
+        cap = _learned.get((model, kind), 0.0)
+    return cap * RATE_LIMIT_HEADROOM
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class _LocalBuckets:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], list] = {}  # -> [nivel, ts]
+        self._paused: Dict[str, float] = {}
+
+    def _refill(self, key: Tuple[str, str], cap: float, now: float) -> list:
+        b = self._buckets.setdefault(key, [cap, now])
+        b[0] = min(cap, b[0] + (now - b[1]) * cap / 60.0)
+        b[1] = now
+        return b
+
+    def reserve(self, model: str, caps: Tuple[float, float], costs: Tuple[float, float]) -> float:
+        now = time.time()
+        wait = 0.0
+        with self._lock:
+            for kind, cap, cost in ((RPM, caps[0], costs[0]), (TPM, caps[1], costs[1])):
+                if cap <= 0 or not cost:
+                    continue
+                b = self._refill((model, kind), cap, now)
+                b[0] -= min(cost, cap)
+                if b[0] < 0:
+                    wait = max(wait, -b[0] * 60.0 / cap)
+            wait = max(wait, self._paused.get(model, 0.0) - now)
+        return wait
+
+    def clamp(self, model: str, kind: str, cap: float, remaining: float) -> None:
+        with self._lock:
+            b = self._refill((model, kind), cap, time.time())
+            b[0] = min(b[0], remaining)
+
+    def pause(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._paused[model] = max(self._paused.get(model, 0.0), time.time() + seconds)
+
+
+_LUA_RESERVE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+for i = 1, 2 do
+  local cap = tonumber(ARGV[i])
+  local cost = tonumber(ARGV[i + 2])
+  if cap > 0 and cost ~= 0 then
+    local v = redis.call('HMGET', KEYS[i], 'level', 'ts')
+    local level = tonumber(v[1]) or cap
+    local ts = tonumber(v[2]) or now
+    level = math.min(cap, level + (now - ts) * cap / 60) - math.min(cost, cap)
+    redis.call('HSET', KEYS[i], 'level', level, 'ts', now)
+    redis.call('EXPIRE', KEYS[i], 120)
+    if level < 0 then wait = math.max(wait, -level * 60 / cap) end
+  end
+end
+local paused = tonumber(redis.call('GET', KEYS[3]) or '0')
+if paused > now then wait = math.max(wait, paused - now) end
+return tostring(wait)
+"""
+
+_LUA_CLAMP = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local cap = tonumber(ARGV[1])
+local v = redis.call('HMGET', KEYS[1], 'level', 'ts')
+local level = tonumber(v[1]) or cap
+local ts = tonumber(v[2]) or now
+level = math.min(cap, level + (now - ts) * cap / 60, tonumber(ARGV[2]))
+redis.call('HSET', KEYS[1], 'level', level, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return 1
+"""
+
+_LUA_PAUSE = """
+local t = redis.call('TIME')
+local untl = tonumber(t[1]) + tonumber(t[2]) / 1000000 + tonumber(ARGV[1])
+if untl > tonumber(redis.call('GET', KEYS[1]) or '0') then
+  redis.call('SET', KEYS[1], tostring(untl), 'PX', math.ceil(tonumber(ARGV[1]) * 1000) + 1000)
+end
+return 1
+"""
+
+
+class _RedisBuckets:
+    prefix = "polyscribe:ratelimit:"
+
+    def __init__(self, url: str):
+        import redis
+
+        r = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self._reserve = r.register_script(_LUA_RESERVE)
+        self._clamp = r.register_script(_LUA_CLAMP)
+        self._pause = r.register_script(_LUA_PAUSE)
+
+    def _key(self, model: str, kind: str) -> str:
+        return f"{self.prefix}{model}:{kind}"
+
+    def reserve(self, model: str, caps: Tuple[float, float], costs: Tuple[float, float]) -> float:
+        keys = [self._key(model, RPM), self._key(model, TPM), self._key(model, "pause")]
+        return float(self._reserve(keys=keys, args=[caps[0], caps[1], costs[0], costs[1]]))
+
+    def clamp(self, model: str, kind: str, cap: float, remaining: float) -> None:
+        self._clamp(keys=[self._key(model, kind)], args=[cap, remaining])
+
+    def pause(self, model: str, seconds: float) -> None:
+        self._pause(keys=[self._key(model, "pause")], args=[seconds])
+
+
+_local = _LocalBuckets()
+_redis = None
+_redis_ready = False
+_lock = threading.Lock()
+
+
+def _shared():
+    global _redis, _redis_ready
+    if _redis_ready:
+        return _redis
+    with _lock:
+        if not _redis_ready:
+            if RATE_LIMIT_REDIS_URL:
+                try:
+                    _redis = _RedisBuckets(RATE_LIMIT_REDIS_URL)
+                except Exception as e:
+                    log.warning("ratelimit: Redis no disponible, buckets en proceso: %s", e)
+            _redis_ready = True
+    return _redis
+
+
+def _backend_call(method: str, *args: Any) -> Any:
+    """Redis si está; si falla, el bucket en proceso (mejor algo de límite que ninguno)."""
+    shared = _shared()
+    if shared is not None:
+        try:
+            return getattr(shared, method)(*args)
+        except Exception as e:
+            log.warning("ratelimit: Redis falló en %s, se usa el bucket en proceso: %s", method, e)
+    return getattr(_local, method)(*args)
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+def reserve(model: str, tokens: int = 0) -> float:
+    """Reserva 1 request + 'tokens' y devuelve cuántos segundos esperar antes de llamar."""
+    if not RATE_LIMIT_ENABLED or not model:
+        return 0.0
+    caps = (_capacity(model, RPM), _capacity(model, TPM))
+    return max(0.0, _backend_call("reserve", model, caps, (1, max(0, int(tokens)))))
+
+
+def acquire(model: str, tokens: int = 0) -> float:
+    wait = reserve(model, tokens)
+    if wait > 0:
+        log.info("ratelimit: %s espera %.2fs (tokens=%d)", model, wait, tokens)
+        time.sleep(wait)
+    return wait
+
+
+async def aacquire(model: str, tokens: int = 0) -> float:
+    # Redis es una llamada bloqueante: fuera del event loop
+    wait = await asyncio.to_thread(reserve, model, tokens)
+    if wait > 0:
+        log.info("ratelimit: %s espera %.2fs (tokens=%d)", model, wait, tokens)
+        await asyncio.sleep(wait)
+    return wait
+
+
+def settle(model: str, estimated: int, used: Optional[int]) -> None:
+    """Devuelve (o cobra) al TPM la diferencia entre lo estimado y usage.total_tokens."""
+    if not RATE_LIMIT_ENABLED or not model or used is None:
+        return
+    cap = _capacity(model, TPM)
+    delta = int(used) - int(estimated)
+    if cap > 0 and delta:
+        _backend_call("reserve", model, (0.0, cap), (0, delta))
+
+
+_RE_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    """'20ms', '1s', '6m0s', '1h2m3.5s' o un número de segundos."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _RE_DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _UNIT_SECONDS[u] for n, u in parts)
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        raw = headers.get(name)
+        return float(raw) if raw not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def observe(model: str, headers: Optional[Mapping[str, str]]) -> None:
+    """Aprende la capacidad y baja el bucket a lo que OpenAI dice que queda."""
+    if not RATE_LIMIT_ENABLED or not model or not headers:
+        return
+    for kind, suffix in ((RPM, "requests"), (TPM, "tokens")):
+        limit = _header(headers, f"x-ratelimit-limit-{suffix}")
+        if limit and model not in _configured and _learned.get((model, kind)) != limit:
+            _learned[(model, kind)] = limit
+            log.info("ratelimit: %s %s = %d/min (cabeceras)", model, kind, limit)
+        remaining = _header(headers, f"x-ratelimit-remaining-{suffix}")
+        cap = _capacity(model, kind)
+        if remaining is not None and cap > 0:
+            # Lo que queda, menos el margen que no usamos de la capacidad real
+            reserve_margin = (limit or cap / RATE_LIMIT_HEADROOM) - cap
+            _backend_call("clamp", model, kind, cap, max(0.0, remaining - reserve_margin))
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Segundos a esperar si exc es un 429 (Retry-After / retry-after-ms / x-ratelimit-reset-*)."""
+    if getattr(exc, "status_code", None) != 429:
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    ms = _header(headers, "retry-after-ms")
+    if ms is not None:
+        return ms / 1000.0
+    for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        s = _seconds(headers.get(name))
+        if s is not None:
+            return s
+    return 1.0
+
+
+def pause(model: str, seconds: float) -> None:
+    if not RATE_LIMIT_ENABLED or not model or seconds <= 0:
+        return
+    log.warning("ratelimit: 429 en %s, pausa de %.1fs para todos los procesos", model, seconds)
+    _backend_call("pause", model, float(seconds))
+
+
+def estimate_chat_tokens(params: Mapping[str, Any]) -> int:
+    """Prompt (por caracteres o tiktoken) + max_tokens: lo mismo que descuenta OpenAI del TPM."""
+    from app.services.long_summary import estimate_tokens
+
+    total = 0
+    for msg in params.get("messages") or []:
+        content = msg.get("content") if isinstance(msg, dict) else getattr(msg, "content", "")
+        if isinstance(content, list):
+            content = " ".join(str(c.get("text", "")) for c in content if isinstance(c, dict))
+        total += estimate_tokens(str(content or "")) + 4  # formato del mensaje
+    out = params.get("max_tokens") or params.get("max_completion_tokens") or RATE_LIMIT_COMPLETION_TOKENS
+    return total + int(out)
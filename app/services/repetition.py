@@ -0,0 +1,193 @@
+# app/services/repetition.py
+# -*- coding: utf-8 -*-
+"""
+Quita bucles de repetición y frases casi duplicadas de la salida del ASR.
+
+Whisper a veces "alucina" y repite la misma frase decenas de veces dentro de
+una línea o a través del borde entre partes ("gracias por ver el video.
+gracias por ver el video. ..."). _dedupe_lines sólo quitaba líneas idénticas;
+los bucles llegaban enteros al resumen y lo encarecían.
+
+Dos pasadas, ambas lineales en el número de palabras:
+
+  1) Bucles: con cada palabra como entero, para cada período p <= REPEAT_MAX_PERIOD
+     se buscan (NumPy) las rachas donde palabra[i] == palabra[i + p]. Una racha
+     de largo L es un bloque de p palabras repetido (L + p) // p veces; si son
+     >= REPEAT_MIN_COPIES copias y >= REPEAT_MIN_WORDS palabras, se deja una
+     copia. O(n · REPEAT_MAX_PERIOD).
+  2) Frases repetidas: cada frase de >= 6 palabras se describe por sus
+     bigramas de palabras (hash); un índice bigrama -> última frase da los
+     candidatos entre las últimas REPEAT_WINDOW frases, y se descarta la frase
+     sólo si repite a una de ellas: Jaccard >= REPEAT_MIN_JACCARD o todos sus
+     bigramas ya estaban en esa frase. Cambiar una palabra ("Vamos a subir
+     el precio..." / "Vamos a bajar el precio...") o añadir algo ("... en
+     serio.") aporta información y la frase se queda. O(bigramas).
+
+Se compara en minúsculas y sin puntuación; el texto que queda conserva la
+puntuación original. Se aplica al texto que va al resumen (la transcripción
+guardada no cambia: sus segmentos con tiempos siguen alineados).
+Benchmark: scripts/bench_repetition.py.
+
+Funciones públicas:
+    remove_repetitions(text) -> (texto, informe)
+        informe = {"words_in", "words_out", "loops", "loop_words",
+                   "duplicate_sentences", "duplicate_words", "removed_ratio"}
+
+Variables de entorno:
+    REPEAT_MAX_PERIOD    palabras máx. de la frase que se repite (default 30)
+    REPEAT_MIN_COPIES    copias seguidas para considerarlo bucle (default 3)
+    REPEAT_MIN_WORDS     palabras mínimas del bucle completo (default 12)
+    REPEAT_WINDOW        frases hacia atrás donde buscar repeticiones (default 3)
+    REPEAT_MIN_JACCARD   similitud para descartar una frase (default 0.9)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import bisect
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+REPEAT_MAX_PERIOD = max(1, int(os.getenv("REPEAT_MAX_PERIOD", "30") or 30))
+REPEAT_MIN_COPIES = max(2, int(os.getenv("REPEAT_MIN_COPIES", "3") or 3))
+REPEAT_MIN_WORDS = max(2, int(os.getenv("REPEAT_MIN_WORDS", "12") or 12))
+REPEAT_WINDOW = max(1, int(os.getenv("REPEAT_WINDOW", "3") or 3))
+REPEAT_MIN_JACCARD = float(os.getenv("REPEAT_MIN_JACCARD", "0.9") or 0.9)
+
+# Frases más cortas se repiten de verdad ("sí, claro", "¿me oyes?")
+_MIN_SENTENCE_WORDS = 6
+
+_RE_WORD = re.compile(r"\w+", re.UNICODE)
+# Separadores de frase, capturados para reconstruir el texto
+_RE_SENTENCE_SEP = re.compile(r"((?<=[.!?…。！？؟।])\s+|\n+)")
+
+
+def _word_ids(words: List[str]) -> np.ndarray:
+    vocab: Dict[str, int] = {}
+    return np.fromiter((vocab.setdefault(w, len(vocab)) for w in words), dtype=np.int64, count=len(words))
+
+
+def _find_loops(ids: np.ndarray) -> List[Tuple[int, int, int]]:
+    """Bucles (inicio, período, copias) sin solaparse; gana el que más palabras quita."""
+    n = len(ids)
+    candidates: List[Tuple[int, int, int, int]] = []
+    for p in range(1, min(REPEAT_MAX_PERIOD, n // REPEAT_MIN_COPIES) + 1):
+        eq = (ids[:-p] == ids[p:]).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], eq, [0])))
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+        copies = (lengths + p) // p
+        ok = (copies >= REPEAT_MIN_COPIES) & (copies * p >= REPEAT_MIN_WORDS)
+        for s, c in zip(starts[ok].tolist(), copies[ok].tolist()):
+            candidates.append(((c - 1) * p, s, p, c))
+
+    # Un bucle de período p también aparece con 2p, 3p...: el más largo y de menor período primero
+    candidates.sort(key=lambda t: (-t[0], t[2]))
+    taken_starts: List[int] = []
+    taken: List[Tuple[int, int, int]] = []
+    for _, s, p, c in candidates:
+        e = s + c * p
+        k = bisect.bisect_left(taken_starts, s)
+        if k > 0 and taken[k - 1][0] + taken[k - 1][1] * taken[k - 1][2] > s:
+            continue
+        if k < len(taken) and taken[k][0] < e:
+            continue
+        taken_starts.insert(k, s)
+        taken.insert(k, (s, p, c))
+    return taken
+
+
+def _remove_loops(text: str) -> Tuple[str, int, int]:
+    """(texto, bucles, palabras quitadas)."""
+    matches = list(_RE_WORD.finditer(text))
+    if len(matches) < REPEAT_MIN_WORDS:
+        return text, 0, 0
+    loops = _find_loops(_word_ids([m.group(0).lower() for m in matches]))
+    if not loops:
+        return text, 0, 0
+
+    out: List[str] = []
+    pos = 0
+    removed = 0
+    for s, p, c in loops:
+        a, b = s + p, s + c * p  # se queda la primera copia: palabras [s, s + p)
+        cut_from = matches[a].start()
+        # Tras el último bucle del texto se conserva su puntuación final
+        cut_to = matches[b].start() if b < len(matches) else matches[b - 1].end()
+        out.append(text[pos:cut_from])
+        pos = cut_to
+        removed += b - a
+    out.append(text[pos:])
+    return "".join(out), len(loops), removed
+
+
+def _remove_near_duplicates(text: str) -> Tuple[str, int, int]:
+    """(texto, frases quitadas, palabras quitadas)."""
+    parts = _RE_SENTENCE_SEP.split(text)
+    # parts = [frase, sep, frase, sep, ..., frase]
+    shingles: List[frozenset] = []
+    last_seen: Dict[int, int] = {}
+    keep = [True] * len(parts)
+    dropped = dropped_words = 0
+    idx = -1
+    for i in range(0, len(parts), 2):
+        words = [w.lower() for w in _RE_WORD.findall(parts[i])]
+        if len(words) < _MIN_SENTENCE_WORDS:
+            continue
+        idx += 1
+        grams = frozenset(hash((words[k], words[k + 1])) for k in range(len(words) - 1))
+        shingles.append(grams)
+
+        votes: Dict[int, int] = {}
+        for g in grams:
+            j = last_seen.get(g)
+            if j is not None and idx - j <= REPEAT_WINDOW:
+                votes[j] = votes.get(j, 0) + 1
+        duplicate = False
+        for j, shared in votes.items():
+            union = len(grams) + len(shingles[j]) - shared
+            # Sin bigramas nuevos (shared == len(grams)) la frase no añade nada a la anterior
+            if shared == len(grams) or shared / union >= REPEAT_MIN_JACCARD:
+                duplicate = True
+                break
+        if duplicate:
+            keep[i] = False
+            if i + 1 < len(parts):
+                keep[i + 1] = False  # y su separador
+            dropped += 1
+            dropped_words += len(words)
+            continue
+        for g in grams:
+            last_seen[g] = idx
+    if not dropped:
+        return text, 0, 0
+    return "".join(p for p, k in zip(parts, keep) if k).rstrip(), dropped, dropped_words
+
+
+def remove_repetitions(text: str) -> Tuple[str, Dict[str, float]]:
+    """Texto sin bucles ni frases casi duplicadas, y un informe de lo quitado."""
+    text = text or ""
+    words_in = len(_RE_WORD.findall(text))
+    out, loops, loop_words = _remove_loops(text)
+    out, dup_sents, dup_words = _remove_near_duplicates(out)
+    words_out = words_in - loop_words - dup_words
+    report: Dict[str, float] = {
+        "words_in": words_in,
+        "words_out": words_out,
+        "loops": loops,
+        "loop_words": loop_words,
+        "duplicate_sentences": dup_sents,
+        "duplicate_words": dup_words,
+        "removed_ratio": round((words_in - words_out) / words_in, 4) if words_in else 0.0,
+    }
+    if words_out < words_in:
+        log.info(
+            "repetition: %d/%d palabras quitadas (%d bucles, %d frases duplicadas)",
+            words_in - words_out, words_in, loops, dup_sents,
+        )
+    return out, report
@@ -0,0 +1,165 @@
+# app/services/s3_download.py
+# -*- coding: utf-8 -*-
+"""
+Descarga de objetos S3 a un archivo temporal con GETs por rangos en paralelo.
+
+Antes el worker hacía get_object().read() (todo el audio en bytes) y luego
+io.BytesIO(data): un audio de 100 MB costaba más de 200 MB de RSS, y
+cualquier error de streaming volvía a bajar desde el byte 0. Aquí:
+
+  - HEAD para el tamaño y el ETag; el archivo destino se crea del tamaño
+    final y cada parte (S3_DOWNLOAD_PART_MB) se escribe en su offset con su
+    propio handle, en S3_DOWNLOAD_CONCURRENCY hilos.
+  - El cuerpo se copia en bloques de 1 MB: la memoria no depende del tamaño
+    del objeto (~ hilos x bloque).
+  - IncompleteRead / corte de conexión / 5xx: la parte se reanuda desde el
+    último byte escrito (Range: bytes=<offset>-<fin>), hasta
+    S3_DOWNLOAD_RETRIES veces por parte, con backoff.
+  - Todas las partes piden IfMatch=<ETag>: si el objeto cambia a mitad de
+    la descarga falla con 412 en vez de mezclar dos versiones.
+
+El cliente se recibe como parámetro (boto3 o cualquier objeto con
+head_object/get_object), así que se puede probar contra un S3 local
+(MinIO, moto server) con S3_ENDPOINT_URL o con un cliente falso.
+
+Funciones públicas:
+    download(client, bucket, key, suffix="", dest_dir=None) -> str   ruta del archivo
+    downloaded(client, bucket, key, suffix="")                       context manager: ruta, y la borra al salir
+
+Variables de entorno:
+    S3_DOWNLOAD_PART_MB       tamaño de cada GET por rango (default 8)
+    S3_DOWNLOAD_CONCURRENCY   GETs en paralelo por objeto (default 4)
+    S3_DOWNLOAD_RETRIES       reintentos por parte (default 5)
+    S3_DOWNLOAD_DIR           directorio de los temporales (default el del sistema)
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import logging
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+S3_DOWNLOAD_PART_MB = max(1, int(os.getenv("S3_DOWNLOAD_PART_MB", "8") or 8))
+S3_DOWNLOAD_CONCURRENCY = max(1, int(os.getenv("S3_DOWNLOAD_CONCURRENCY", "4") or 4))
+S3_DOWNLOAD_RETRIES = max(0, int(os.getenv("S3_DOWNLOAD_RETRIES", "5") or 5))
+S3_DOWNLOAD_DIR = os.getenv("S3_DOWNLOAD_DIR") or None
+
+_BLOCK = 1024 * 1024
+
+
+def _retryable(exc: Exception) -> bool:
+    """Errores de red/streaming y 5xx/throttling se reintentan; 4xx (404, 412...) no."""
+    try:
+        from botocore.exceptions import BotoCoreError, ClientError
+    except Exception:  # pragma: no cover - cliente falso sin botocore
+        BotoCoreError = ClientError = ()  # type: ignore[assignment]
+
+    if ClientError and isinstance(exc, ClientError):
+        err = exc.response.get("Error", {}) or {}
+        status = int((exc.response.get("ResponseMetadata", {}) or {}).get("HTTPStatusCode") or 0)
+        return status >= 500 or err.get("Code") in ("SlowDown", "Throttling", "RequestTimeout")
+    if BotoCoreError and isinstance(exc, BotoCoreError):
+        return True
+    # http.client.IncompleteRead, ConnectionError, timeouts, urllib3 ProtocolError...
+    return isinstance(exc, OSError) or type(exc).__name__ in ("IncompleteRead", "ProtocolError")
+
+
+def _ranges(size: int, part: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + part, size) - 1) for start in range(0, size, part)]
+
+
+def _fetch_range(client, bucket: str, key: str, etag: Optional[str], path: str, start: int, end: int) -> None:
+    """Escribe bytes [start, end] en 'path'; ante un corte reanuda desde el último byte escrito."""
+    offset = start
+    failures = 0
+    with open(path, "r+b") as f:
+        while offset <= end:
+            try:
+                kwargs = {"Bucket": bucket, "Key": key, "Range": f"bytes={offset}-{end}"}
+                if etag:
+                    kwargs["IfMatch"] = etag
+                body = client.get_object(**kwargs)["Body"]
+                try:
+                    f.seek(offset)
+                    while offset <= end:
+                        chunk = body.read(min(_BLOCK, end - offset + 1))
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        offset += len(chunk)
+                finally:
+                    with contextlib.suppress(Exception):
+                        body.close()
+                if offset <= end:
+                    raise IOError(f"respuesta corta: faltan {end - offset + 1} bytes")
+            except Exception as e:
+                failures += 1
+                if failures > S3_DOWNLOAD_RETRIES or not _retryable(e):
+                    raise
+                delay = min(8.0, 0.5 * 2 ** (failures - 1))
+                log.warning(
+                    "s3_download: %s bytes %d-%d cortado en %d (intento %d/%d), reanudando en %.1fs: %s",
+                    key, start, end, offset, failures, S3_DOWNLOAD_RETRIES, delay, e,
+                )
+                time.sleep(delay)
+
+
+def download(client, bucket: str, key: str, suffix: str = "", dest_dir: Optional[str] = None) -> str:
+    """
+    Descarga s3://bucket/key a un archivo temporal nuevo y devuelve su ruta
+    (quien llama lo borra). Lanza la última excepción si una parte agota
+    los reintentos; en ese caso el temporal ya se borró.
+    """
+    head = client.head_object(Bucket=bucket, Key=key)
+    size = int(head.get("ContentLength") or 0)
+    etag = head.get("ETag")
+
+    fd, path = tempfile.mkstemp(prefix="s3_", suffix=suffix, dir=dest_dir or S3_DOWNLOAD_DIR)
+    try:
+        os.ftruncate(fd, size)  # tamaño final (disperso): cada parte escribe en su offset
+        os.close(fd)
+        fd = -1
+        if size:
+            t0 = time.time()
+            ranges = _ranges(size, S3_DOWNLOAD_PART_MB * 1024 * 1024)
+            workers = min(S3_DOWNLOAD_CONCURRENCY, len(ranges))
+            if workers == 1:
+                for a, b in ranges:
+                    _fetch_range(client, bucket, key, etag, path, a, b)
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3dl") as pool:
+                    futures = [pool.submit(_fetch_range, client, bucket, key, etag, path, a, b) for a, b in ranges]
+                    try:
+                        for fut in futures:
+                            fut.result()
+                    except BaseException:
+                        for fut in futures:
+                            fut.cancel()  # una parte falló: no empezar las que faltan
+                        raise
+            log.info(
+                "s3_download: %s %.1f MB en %.1fs (%d partes, %d hilos)",
+                key, size / 1048576, time.time() - t0, len(ranges), workers,
+            )
+        return path
+    except BaseException:
+        if fd >= 0:
+            os.close(fd)
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        raise
+
+
+@contextlib.contextmanager
+def downloaded(client, bucket: str, key: str, suffix: str = "") -> Iterator[str]:
+    path = download(client, bucket, key, suffix=suffix)
+    try:
+        yield path
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(path)
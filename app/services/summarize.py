@@ -17,12 +17,8 @@ import re
 import logging
 from typing import Optional
 
-try:
-    # SDK OpenAI v1.x
-    from openai import OpenAI
-except Exception as e:  # pragma: no cover
-    OpenAI = None  # type: ignore
-    logging.getLogger(__name__).warning("OpenAI SDK no disponible: %s", e)
+from app.services import provider
+from app.services.openai_client import get_client
 
 log = logging.getLogger(__name__)
 
@@ -101,16 +97,14 @@ def summarize_text(
     if not text or not text.strip():
         return ""
 
-    if OpenAI is None:  # pragma: no cover
-        raise RuntimeError("OpenAI SDK no disponible. Verifica la instalación del paquete 'openai'.")
-
-    client = OpenAI()  # toma OPENAI_API_KEY del entorno
+    if get_client() is None:  # pragma: no cover
+        raise RuntimeError("OpenAI SDK no disponible. Verifica el paquete 'openai' y OPENAI_API_KEY.")
     use_model = (model or DEFAULT_SUMMARY_MODEL).strip()
 
     sys_msg = _system_prompt(target_lang)
 
     # Llamada a Chat Completions
-    resp = client.chat.completions.create(
+    resp = provider.chat(
         model=use_model,
         messages=[
             {"role": "system", "content": sys_msg},
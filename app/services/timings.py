@@ -0,0 +1,145 @@
+# app/services/timings.py
+# -*- coding: utf-8 -*-
+"""
+Tiempos por segmento de Whisper en formato compacto (columnar) y
+generación de subtítulos SRT/VTT a partir de ellos.
+
+Formato binario (little-endian), en vez de una lista JSON de objetos:
+    b"PSG1" | uint32 n
+    | float32[n] inicios | float32[n] fines      (segundos)
+    | uint32[n] fin de cada texto en el blob     (offsets en bytes)
+    | blob utf-8 con los textos concatenados
+
+~12 bytes fijos por segmento + el texto; float32 da precisión de ms hasta
+~4 h de audio, de sobra para subtítulos.
+
+Funciones públicas:
+    segments_from_response(res) -> [(ini, fin, texto), ...]
+    pack_segments(segments) -> bytes
+    unpack_segments(blob) -> [(ini, fin, texto), ...]
+    build_srt(segments) / build_vtt(segments) -> str
+"""
+
+from __future__ import annotations
+
+import sys
+import struct
+from array import array
+from typing import Any, List, Optional, Sequence, Tuple
+
+Segment = Tuple[float, float, str]
+
+_MAGIC = b"PSG1"
+_HEADER = struct.Struct("<4sI")
+
+
+def _get(obj: Any, name: str, default: Any = None) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def segments_from_response(res: Any) -> List[Segment]:
+    """Segmentos (ini, fin, texto) de una respuesta verbose_json del SDK (objeto o dict)."""
+    out: List[Segment] = []
+    for seg in _get(res, "segments", None) or []:
+        text = (_get(seg, "text", "") or "").strip()
+        if not text:
+            continue
+        try:
+            start = float(_get(seg, "start", 0.0) or 0.0)
+            end = float(_get(seg, "end", start) or start)
+        except (TypeError, ValueError):
+            continue
+        out.append((start, max(start, end), text))
+    return out
+
+
+def _le(arr: array) -> array:
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def pack_segments(segments: Sequence[Segment]) -> bytes:
+    starts = array("f", (s for s, _, _ in segments))
+    ends = array("f", (e for _, e, _ in segments))
+    offsets = array("I")
+    blob = bytearray()
+    for _, _, text in segments:
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    return b"".join(
+        [
+            _HEADER.pack(_MAGIC, len(segments)),
+            _le(starts).tobytes(),
+            _le(ends).tobytes(),
+            _le(offsets).tobytes(),
+            bytes(blob),
+        ]
+    )
+
+
+def unpack_segments(data: Optional[bytes]) -> List[Segment]:
+    """Inverso de pack_segments; [] si no hay datos o el formato no es válido."""
+    if not data or len(data) < _HEADER.size:
+        return []
+    magic, n = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        return []
+
+    pos = _HEADER.size
+    cols = []
+    for code in ("f", "f", "I"):
+        arr = array(code)
+        size = arr.itemsize * n
+        arr.frombytes(data[pos:pos + size])
+        cols.append(_le(arr))
+        pos += size
+    starts, ends, offsets = cols
+
+    blob = data[pos:]
+    out: List[Segment] = []
+    prev = 0
+    for i in range(n):
+        end_off = offsets[i]
+        out.append((float(starts[i]), float(ends[i]), blob[prev:end_off].decode("utf-8", "replace")))
+        prev = end_off
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Subtítulos
+# -----------------------------------------------------------------------------
+def _ts(seconds: float, sep: str) -> str:
+    ms = int(round(max(0.0, seconds) * 1000))
+    hh, ms = divmod(ms, 3600000)
+    mm, ms = divmod(ms, 60000)
+    ss, ms = divmod(ms, 1000)
+    return f"{hh:02d}:{mm:02d}:{ss:02d}{sep}{ms:03d}"
+
+
+def _cues(segments: Sequence[Segment]) -> List[Segment]:
+    """Ordena y evita cues de duración 0 o solapados (algunos players los rechazan)."""
+    cues: List[Segment] = []
+    for start, end, text in sorted(segments, key=lambda s: s[0]):
+        if cues and start < cues[-1][1]:
+            start = cues[-1][1]
+        if end <= start:
+            end = start + 0.5
+        cues.append((start, end, text))
+    return cues
+
+
+def build_srt(segments: Sequence[Segment]) -> str:
+    out: List[str] = []
+    for idx, (start, end, text) in enumerate(_cues(segments), 1):
+        out += [str(idx), f"{_ts(start, ',')} --> {_ts(end, ',')}", text, ""]
+    return "\n".join(out)
+
+
+def build_vtt(segments: Sequence[Segment]) -> str:
+    out: List[str] = ["WEBVTT", ""]
+    for start, end, text in _cues(segments):
+        out += [f"{_ts(start, '.')} --> {_ts(end, '.')}", text, ""]
+    return "\n".join(out)
@@ -0,0 +1,157 @@
+# app/services/transcript_cache.py
+# -*- coding: utf-8 -*-
+"""
+Caché de transcripciones direccionada por contenido.
+
+Si alguien sube exactamente el mismo audio (mismo sha256) con el mismo idioma
+y los mismos modelos, devolvemos transcript/idioma/duración/resumen guardados
+sin llamar a ffprobe, ffmpeg ni OpenAI.
+
+Funciones públicas:
+    file_sha256(path) -> str
+    cache_key(content_sha256, language) -> str
+    lookup(key) -> Optional[TranscriptCache]
+    store(key, content_sha256, language, transcript, language_detected, summary, duration_seconds, segments=None)
+
+Variables de entorno:
+    TRANSCRIPT_CACHE:          "1" (default) activa la caché, "0" la desactiva.
+    TRANSCRIPT_CACHE_TTL_DAYS: antigüedad máxima desde el último uso (default 30).
+    TRANSCRIPT_CACHE_MAX_MB:   tamaño total máximo de texto guardado (default 512);
+                               al superarlo se borran las entradas menos usadas (LRU).
+"""
+
+from __future__ import annotations
+
+import os
+import hashlib
+import logging
+import datetime as dt
+from typing import Optional
+
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models_cache import TranscriptCache
+
+log = logging.getLogger(__name__)
+
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE", "1") == "1"
+TRANSCRIPT_CACHE_TTL_DAYS = float(os.getenv("TRANSCRIPT_CACHE_TTL_DAYS", "30") or 30)
+TRANSCRIPT_CACHE_MAX_MB = float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "512") or 512)
+
+# Subir cuando cambie el pipeline (cortes, limpieza, prompt del resumen...) para
+# invalidar lo guardado sin tocar la tabla.
+PIPELINE_VERSION = "2"  # 2: guarda también los tiempos por segmento
+
+_BLOCK = 1024 * 1024
+
+
+def file_sha256(path: str, block_size: int = _BLOCK) -> str:
+    """sha256 en streaming (bloques de 1 MB), sin cargar el archivo en memoria."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(content_sha256: str, language: str) -> str:
+    asr_model = os.getenv("OPENAI_TRANSCRIBE_MODEL", "whisper-1")
+    chat_model = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+    raw = "|".join([content_sha256, (language or "auto").lower(), asr_model, chat_model, PIPELINE_VERSION])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _expired(entry: TranscriptCache, now: dt.datetime) -> bool:
+    if TRANSCRIPT_CACHE_TTL_DAYS <= 0:
+        return False
+    return entry.last_used_at < now - dt.timedelta(days=TRANSCRIPT_CACHE_TTL_DAYS)
+
+
+def lookup(key: str) -> Optional[TranscriptCache]:
+    """Devuelve la entrada vigente (y marca el uso) o None. Nunca lanza."""
+    if not TRANSCRIPT_CACHE_ENABLED or not key:
+        return None
+    try:
+        entry = db.session.get(TranscriptCache, key)
+        if entry is None:
+            return None
+        now = dt.datetime.utcnow()
+        if _expired(entry, now):
+            db.session.delete(entry)
+            db.session.commit()
+            return None
+        entry.hits = int(entry.hits or 0) + 1
+        entry.last_used_at = now
+        db.session.commit()
+        return entry
+    except Exception as e:
+        log.warning("transcript_cache: lookup falló: %s", e)
+        db.session.rollback()
+        return None
+
+
+def store(
+    key: str,
+    content_sha256: str,
+    language: str,
+    transcript: str,
+    language_detected: Optional[str],
+    summary: Optional[str],
+    duration_seconds: Optional[int],
+    segments: Optional[bytes] = None,
+) -> None:
+    """Guarda (o reemplaza) una entrada y aplica la evicción. Nunca lanza."""
+    if not TRANSCRIPT_CACHE_ENABLED or not key or not transcript:
+        return
+    try:
+        now = dt.datetime.utcnow()
+        entry = db.session.get(TranscriptCache, key) or TranscriptCache(key=key, hits=0, created_at=now)
+        entry.content_sha256 = content_sha256
+        entry.language = language
+        entry.transcript = transcript
+        entry.language_detected = language_detected
+        entry.summary = summary
+        entry.duration_seconds = duration_seconds
+        entry.segments = segments
+        entry.size_bytes = (
+            len(transcript.encode("utf-8")) + len((summary or "").encode("utf-8")) + len(segments or b"")
+        )
+        entry.last_used_at = now
+        db.session.add(entry)
+        db.session.commit()
+        _evict(now)
+    except Exception as e:
+        log.warning("transcript_cache: store falló: %s", e)
+        db.session.rollback()
+
+
+def _evict(now: dt.datetime) -> None:
+    """TTL por último uso y, si se supera el tamaño máximo, LRU."""
+    if TRANSCRIPT_CACHE_TTL_DAYS > 0:
+        cutoff = now - dt.timedelta(days=TRANSCRIPT_CACHE_TTL_DAYS)
+        db.session.query(TranscriptCache).filter(TranscriptCache.last_used_at < cutoff).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    max_bytes = int(TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024)
+    total = int(db.session.query(func.coalesce(func.sum(TranscriptCache.size_bytes), 0)).scalar() or 0)
+    if total <= max_bytes:
+        return
+
+    q = (
+        db.session.query(TranscriptCache.key, TranscriptCache.size_bytes)
+        .order_by(TranscriptCache.last_used_at.asc())
+        .yield_per(200)
+    )
+    doomed = []
+    for key, size in q:
+        if total <= max_bytes:
+            break
+        doomed.append(key)
+        total -= int(size or 0)
+    if doomed:
+        db.session.query(TranscriptCache).filter(TranscriptCache.key.in_(doomed)).delete(synchronize_session=False)
+        db.session.commit()
+        log.info("transcript_cache: %d entradas expulsadas (LRU)", len(doomed))
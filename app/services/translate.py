@@ -1,17 +1,27 @@
 # app/services/translate.py
-import os
-from openai import OpenAI
-client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+from app.services import llm_cache, provider
+from app.services.openai_client import get_client
+
+TRANSLATE_MODEL = "gpt-4o-mini"
+# Subir si cambia el prompt (invalida llm_cache)
+PROMPT_VERSION = "1"
 
 def translate_text(text: str, to_lang: str) -> str:
     if not text or not to_lang:
         return text
-    system = "You are a precise translator. Preserve meaning, tone and proper nouns."
-    user = f"Translate to {to_lang}. Output only the translation, no explanations.\n\nText:\n{text}"
-    r = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role":"system","content":system},{"role":"user","content":user}],
-        temperature=0.1,
-        max_tokens=2000
-    )
-    return (r.choices[0].message.content or "").strip()
+
+    def _call() -> str:
+        if get_client() is None:
+            raise RuntimeError("OpenAI no disponible (SDK u OPENAI_API_KEY).")
+        system = "You are a precise translator. Preserve meaning, tone and proper nouns."
+        user = f"Translate to {to_lang}. Output only the translation, no explanations.\n\nText:\n{text}"
+        r = provider.chat(
+            model=TRANSLATE_MODEL,
+            messages=[{"role":"system","content":system},{"role":"user","content":user}],
+            temperature=0.1,
+            max_tokens=2000
+        )
+        return (r.choices[0].message.content or "").strip()
+
+    # Mismo texto + idioma destino => traducción guardada
+    return llm_cache.cached("translate", text, to_lang, TRANSLATE_MODEL, PROMPT_VERSION, 0.1, _call)
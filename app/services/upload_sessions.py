@@ -0,0 +1,146 @@
+# app/services/upload_sessions.py
+# -*- coding: utf-8 -*-
+"""
+Subida directa del navegador al bucket (S3 multipart con URLs prefirmadas).
+
+Con JOBS_MODE=celery el worker ya lee el audio de S3; pasar los bytes por
+Flask sólo ocupaba a los workers de gunicorn y su ancho de banda. Flujo:
+
+  1) start(): create_multipart_upload + una URL prefirmada de upload_part por
+     parte. El navegador hace PUT de cada trozo del archivo directo al bucket.
+  2) complete(): list_parts (la verdad del lado de S3) debe tener todas las
+     partes 1..N con el tamaño esperado (y el ETag que vio el navegador, si lo
+     manda); entonces complete_multipart_upload. Si falta algo => UploadIncomplete.
+  3) abort(): abort_multipart_upload (el usuario canceló o la subida falló).
+
+El bucket necesita CORS para PUT desde el origen de la web, exponiendo
+"ETag", y conviene una regla de ciclo de vida AbortIncompleteMultipartUpload
+(p.ej. 1 día) para las sesiones abandonadas.
+
+El cliente se recibe como parámetro: funciona igual con AWS, MinIO o moto
+server (S3_ENDPOINT_URL); ver scripts/check_direct_upload.py.
+
+Funciones públicas:
+    part_plan(size) -> (tamaño de parte, cantidad de partes)
+    start(client, bucket, key, size, content_type="") -> {"upload_id", "part_size", "parts": [{"part_number", "url"}]}
+    complete(client, bucket, key, upload_id, size, parts=None) -> int (bytes)
+    abort(client, bucket, key, upload_id)
+    presigned_get(client, bucket, key) -> str (p.ej. para que ffprobe lea la duración sin bajar el archivo)
+
+Variables de entorno:
+    UPLOAD_PART_MB       tamaño de cada parte (default 8; S3 exige >= 5 salvo la última)
+    UPLOAD_URL_EXPIRES   segundos de validez de las URLs y de la sesión (default 3600)
+"""
+
+from __future__ import annotations
+
+import os
+import math
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+UPLOAD_PART_MB = max(5, int(os.getenv("UPLOAD_PART_MB", "8") or 8))
+UPLOAD_URL_EXPIRES = max(60, int(os.getenv("UPLOAD_URL_EXPIRES", "3600") or 3600))
+
+_MB = 1024 * 1024
+_MAX_PARTS = 10000  # límite de S3
+
+
+class UploadIncomplete(RuntimeError):
+    pass
+
+
+def part_plan(size: int) -> Tuple[int, int]:
+    """(tamaño de parte, partes) para 'size' bytes; nunca más de 10000 partes."""
+    part_size = max(UPLOAD_PART_MB * _MB, math.ceil(size / _MAX_PARTS))
+    return part_size, max(1, math.ceil(size / part_size))
+
+
+def start(client, bucket: str, key: str, size: int, content_type: str = "") -> Dict[str, Any]:
+    kwargs = {"Bucket": bucket, "Key": key}
+    if content_type:
+        kwargs["ContentType"] = content_type
+    upload_id = client.create_multipart_upload(**kwargs)["UploadId"]
+    part_size, count = part_plan(size)
+    parts = [
+        {
+            "part_number": n,
+            "url": client.generate_presigned_url(
+                "upload_part",
+                Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": n},
+                ExpiresIn=UPLOAD_URL_EXPIRES,
+            ),
+        }
+        for n in range(1, count + 1)
+    ]
+    log.info("upload_sessions: %s iniciado (%d partes de %d MB)", key, count, part_size // _MB)
+    return {"upload_id": upload_id, "part_size": part_size, "parts": parts}
+
+
+def _list_parts(client, bucket: str, key: str, upload_id: str) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    marker = 0
+    while True:
+        resp = client.list_parts(Bucket=bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker)
+        out.extend(resp.get("Parts") or [])
+        if not resp.get("IsTruncated"):
+            return out
+        marker = int(resp.get("NextPartNumberMarker") or 0)
+
+
+def _etag(value: Optional[str]) -> str:
+    return (value or "").strip().strip('"')
+
+
+def complete(
+    client,
+    bucket: str,
+    key: str,
+    upload_id: str,
+    size: int,
+    parts: Optional[Sequence[Dict[str, Any]]] = None,
+) -> int:
+    """
+    Verifica las partes subidas contra el plan (y contra los ETag que reporta
+    el navegador en 'parts', si vienen) y cierra la subida. Devuelve los bytes.
+    """
+    part_size, count = part_plan(size)
+    listed = sorted(_list_parts(client, bucket, key, upload_id), key=lambda p: int(p["PartNumber"]))
+    numbers = [int(p["PartNumber"]) for p in listed]
+    if numbers != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(numbers))
+        raise UploadIncomplete(f"Faltan partes: {missing[:10]}")
+
+    last_size = size - part_size * (count - 1)
+    for p in listed:
+        expected = last_size if int(p["PartNumber"]) == count else part_size
+        if int(p.get("Size") or 0) != expected:
+            raise UploadIncomplete(f"La parte {p['PartNumber']} mide {p.get('Size')} bytes, se esperaban {expected}.")
+
+    reported = {int(p.get("part_number") or 0): _etag(p.get("etag")) for p in (parts or []) if p.get("etag")}
+    for p in listed:
+        seen = reported.get(int(p["PartNumber"]))
+        if seen and seen != _etag(p.get("ETag")):
+            raise UploadIncomplete(f"La parte {p['PartNumber']} no coincide con la subida (ETag).")
+
+    client.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": [{"PartNumber": int(p["PartNumber"]), "ETag": p["ETag"]} for p in listed]},
+    )
+    log.info("upload_sessions: %s completo (%d partes, %.1f MB)", key, count, size / _MB)
+    return size
+
+
+def abort(client, bucket: str, key: str, upload_id: str) -> None:
+    try:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+    except Exception as e:
+        log.warning("upload_sessions: abort %s falló: %s", key, e)
+
+
+def presigned_get(client, bucket: str, key: str, expires: int = 600) -> str:
+    return client.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires)
@@ -21,12 +21,8 @@ from typing import Optional, Tuple
 
 log = logging.getLogger(__name__)
 
-try:
-    # SDK OpenAI v1.x
-    from openai import OpenAI
-except Exception as e:  # pragma: no cover
-    OpenAI = None  # type: ignore
-    log.warning("OpenAI SDK no disponible: %s", e)
+from app.services import provider
+from app.services.openai_client import get_client
 
 
 # ---------------------- utilidades ---------------------- #
@@ -64,25 +60,21 @@ def transcribe_audio(local_path: str, forced_lang: Optional[str] = None) -> Tupl
     if not local_path or not os.path.exists(local_path):
         raise FileNotFoundError(f"Archivo no encontrado: {local_path}")
 
-    if OpenAI is None:  # pragma: no cover
+    if get_client() is None:  # pragma: no cover
         raise RuntimeError(
             "OpenAI SDK no disponible. Instala/actualiza 'openai' y verifica OPENAI_API_KEY."
         )
-
-    client = OpenAI()  # Toma OPENAI_API_KEY del entorno
     lang = _normalize_forced_lang(forced_lang)
 
-    # Abrimos el archivo en binario y llamamos al endpoint
-    with open(local_path, "rb") as f:
-        kwargs = {
-            "model": "whisper-1",
-            "file": f,
-            "response_format": "verbose_json",  # para obtener .language además de .text
-        }
-        if lang:
-            kwargs["language"] = lang
-
-        resp = client.audio.transcriptions.create(**kwargs)
+    kwargs = {
+        "model": "whisper-1",
+        "response_format": "verbose_json",  # para obtener .language además de .text
+    }
+    if lang:
+        kwargs["language"] = lang
+
+    # provider abre el archivo en binario y llama al endpoint (sync o en el event loop)
+    resp = provider.transcribe(local_path, **kwargs)
 
     transcript = getattr(resp, "text", "") or ""
     detected = getattr(resp, "language", None)
@@ -11,6 +11,14 @@ Diseño de las funciones:
 Funciones principales:
 - clean_transcript(text, lang=''): devuelve una transcripción lista para UI/exports.
 - clean_summary(text, lang=''): devuelve un resumen con viñetas uniformes.
+- TranscriptCleaner: clean_transcript incremental, por partes a medida que llegan.
+
+Ni clean_transcript ni TranscriptCleaner se llaman hoy desde el pipeline de
+jobs (jobs.py / celery_app.py guardan el texto del ASR tal cual, alineado con
+sus segmentos); TranscriptCleaner queda listo para quien limpie las partes al
+llegar, sin segunda pasada sobre el texto completo.
+
+Benchmark y comparación con la versión anterior: scripts/bench_text_clean.py
 """
 
 from __future__ import annotations
@@ -37,60 +45,101 @@ DASHES = {
 
 RTL_LANGS = {"ar", "fa", "he", "ur", "ps"}
 
+# Una sola tabla de reemplazos de caracteres: comillas/guiones (y, para
+# _normalize, tab/NBSP -> espacio y CR suelto -> LF). str.translate sobre
+# todo el texto mira carácter a carácter en un dict si el texto no es ASCII
+# (más lento que los str.replace de antes), así que una regex localiza los
+# tramos afectados y sólo esos pasan por translate.
+_QUOTES_DASHES = str.maketrans({**SMART_QUOTES, **DASHES})
+_SPACE_CHARS = {"\t": " ", "\u00A0": " ", "\r": "\n"}
+_SPACES_TABLE = str.maketrans(_SPACE_CHARS)
+_NORMALIZE_TABLE = str.maketrans({**SMART_QUOTES, **DASHES, **_SPACE_CHARS})
+
+
+def _char_run_re(table: dict) -> "re.Pattern[str]":
+    chars = "".join(chr(k) for k, v in table.items() if chr(k) != v)
+    return re.compile("[" + re.escape(chars) + "]+")
+
+
+_RE_QUOTES_DASHES = _char_run_re(_QUOTES_DASHES)
+_RE_SPACE_CHARS = _char_run_re(_SPACES_TABLE)
+_RE_NORMALIZE_CHARS = _char_run_re(_NORMALIZE_TABLE)
+_RE_SPACE_RUN = re.compile(r" {2,}")
+
+_SENTENCE_END = ".?!…:"
+# Caracteres que no pueden quedar a ningún lado de un corte de TranscriptCleaner
+_NO_CUT = ",;:.!?)…"
+
+
+def _translate(s: str, pattern: "re.Pattern[str]", table: dict) -> str:
+    return pattern.sub(lambda m: m.group().translate(table), s)
+
 
 def _normalize_quotes_and_dashes(s: str) -> str:
-    for k, v in SMART_QUOTES.items():
-        if k in s:
-            s = s.replace(k, v)
-    for k, v in DASHES.items():
-        if k in s:
-            s = s.replace(k, v)
-    return s
+    return _translate(s, _RE_QUOTES_DASHES, _QUOTES_DASHES)
+
+
+def _collapse_spaces(s: str) -> str:
+    """Espacios ya unificados (sin tab/NBSP/CR): colapsa, recorta fin de línea y saltos."""
+    if "  " in s:
+        s = _RE_SPACE_RUN.sub(" ", s)
+    if " \n" in s:
+        s = s.replace(" \n", "\n")
+    if "\n\n\n" in s:
+        s = RE_MULTI_NL.sub("\n\n", s)
+    return s.strip()
 
 
 def _normalize_spaces(s: str) -> str:
     # normalizar espacios y recortar por línea
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = RE_SPACES.sub(" ", s)
-    s = RE_LINE_TRIM.sub("", s)
-    s = RE_MULTI_NL.sub("\n\n", s)
-    return s.strip()
+    if "\r" in s:
+        s = s.replace("\r\n", "\n")
+    return _collapse_spaces(_translate(s, _RE_SPACE_CHARS, _SPACES_TABLE))
+
+
+def _normalize(s: str) -> str:
+    """_normalize_quotes_and_dashes + _normalize_spaces con una sola tabla."""
+    if "\r" in s:
+        s = s.replace("\r\n", "\n")
+    return _collapse_spaces(_translate(s, _RE_NORMALIZE_CHARS, _NORMALIZE_TABLE))
 
 
 def _join_soft_linebreaks(s: str) -> str:
     """
     Une líneas que parecen estar partidas a mitad de frase:
-    - Si línea A NO termina en [.?!…] y la siguiente empieza en minúscula o dígito → unir.
-    - Mantiene saltos dobles (párrafos).
+    - Si línea A NO termina en [.?!…:] y la siguiente empieza en minúscula → unir.
+    - Una línea vacía corta la unión (y no se conserva).
+    Las piezas de cada línea se acumulan en una lista (sin concatenar el buffer
+    una y otra vez); sólo se mira la última pieza para decidir.
     """
-    lines = s.split("\n")
     out: List[str] = []
-    buffer = ""
-
-    def is_sentence_end(line: str) -> bool:
-        line = line.rstrip()
-        return bool(line) and line[-1] in ".?!…:"
+    parts: List[str] = []  # línea en construcción ("buffer")
 
-    for i, line in enumerate(lines):
-        if not buffer:
-            buffer = line
+    for line in s.split("\n"):
+        if not parts:
+            if line:
+                parts.append(line)
             continue
 
-        if buffer.strip() == "":
-            out.append(buffer)
-            buffer = line
+        last = parts[-1]
+        if len(parts) == 1 and not last.strip():
+            out.append(last)
+            parts = [line] if line else []
             continue
 
         # ¿Siguiente línea es continuación?
         stripped = line.lstrip()
-        if (not is_sentence_end(buffer)) and stripped[:1].islower():
-            buffer = (buffer.rstrip() + " " + stripped)
+        tail = last.rstrip()
+        if tail[-1] not in _SENTENCE_END and stripped[:1].islower():
+            parts[-1] = tail
+            parts.append(" ")
+            parts.append(stripped)
         else:
-            out.append(buffer)
-            buffer = line
+            out.append("".join(parts))
+            parts = [line] if line else []
 
-    if buffer:
-        out.append(buffer)
+    if parts:
+        out.append("".join(parts))
 
     return "\n".join(out)
 
@@ -150,6 +199,13 @@ def _bulletize_if_paragraph(s: str, lang: str) -> str:
     return text
 
 
+def _clean_transcript_part(s: str) -> str:
+    # El segundo _normalize_spaces no cambia nada aquí: _join_soft_linebreaks
+    # no deja líneas vacías ni espacios al borde y el paso de puntuación sólo
+    # borra espacios o mete uno antes de un carácter visible.
+    return _tidy_punctuation_spaces(_join_soft_linebreaks(_normalize(s)))
+
+
 def clean_transcript(text: str, lang: str = "") -> str:
     """
     Limpieza ligera para transcripción:
@@ -161,14 +217,61 @@ def clean_transcript(text: str, lang: str = "") -> str:
     """
     if not text:
         return ""
+    return _clean_transcript_part(text)
 
-    s = text
-    s = _normalize_quotes_and_dashes(s)
-    s = _normalize_spaces(s)
-    s = _join_soft_linebreaks(s)
-    s = _tidy_punctuation_spaces(s)
-    s = _normalize_spaces(s)
-    return s
+
+class TranscriptCleaner:
+    """
+    clean_transcript incremental para transcripciones que llegan por partes
+    (p.ej. una parte de audio tras otra):
+
+        c = TranscriptCleaner()
+        out = c.feed(parte1) + c.feed(parte2) + ... + c.finish()
+        # out == clean_transcript(parte1 + parte2 + ...)
+
+    feed() devuelve la parte del resultado que ya no puede cambiar. Sólo se
+    corta en un salto de línea simple entre dos caracteres visibles que no son
+    puntuación: ahí las reglas de limpieza no cruzan el corte y el separador
+    final se sabe ya (" " si la línea siguiente empieza en minúscula, si no
+    "\n"). Lo que queda detrás del último corte se guarda para la siguiente
+    llamada, así que cada carácter se limpia una sola vez.
+    """
+
+    def __init__(self, lang: str = ""):
+        self.lang = lang
+        self._pending = ""
+        self._sep = ""  # separador ante el próximo trozo emitido ("" al inicio)
+
+    def _find_cut(self, start: int) -> int:
+        s = self._pending
+        i = s.rfind("\n", 0, len(s) - 1)
+        while i >= max(start, 1):
+            a, b = s[i - 1], s[i + 1]
+            if not (a.isspace() or b.isspace() or a in _NO_CUT or b in _NO_CUT):
+                return i
+            i = s.rfind("\n", 0, i)
+        return -1
+
+    def feed(self, text: str) -> str:
+        if not text:
+            return ""
+        start = max(len(self._pending) - 1, 0)
+        self._pending += text
+        i = self._find_cut(start)
+        if i < 0:
+            return ""
+        head, self._pending = self._pending[:i], self._pending[i + 1:]
+        out = self._sep + _clean_transcript_part(head)
+        self._sep = " " if self._pending[0].islower() else "\n"
+        return out
+
+    def finish(self) -> str:
+        tail, self._pending = self._pending, ""
+        out = _clean_transcript_part(tail) if tail else ""
+        if out:
+            out = self._sep + out
+        self._sep = ""
+        return out
 
 
 def clean_summary(text: str, lang: str = "") -> str:
@@ -183,9 +286,7 @@ def clean_summary(text: str, lang: str = "") -> str:
     if not text:
         return ""
 
-    s = text
-    s = _normalize_quotes_and_dashes(s)
-    s = _normalize_spaces(s)
+    s = _normalize(text)
     s = _bulletize_if_paragraph(s, lang=lang)
     s = _normalize_bullets(s)
     s = _tidy_punctuation_spaces(s)
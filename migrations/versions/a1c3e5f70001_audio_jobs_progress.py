@@ -0,0 +1,26 @@
+"""audio_jobs.progress para jobs asíncronos
+
+Revision ID: a1c3e5f70001
+Revises: 0e9c61264114
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70001'
+down_revision = '0e9c61264114'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.drop_column('progress')
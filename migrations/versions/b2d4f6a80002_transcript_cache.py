@@ -0,0 +1,44 @@
+"""transcript_cache (caché por hash de contenido)
+
+Revision ID: b2d4f6a80002
+Revises: d4f6b8c00004
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a80002'
+down_revision = 'd4f6b8c00004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transcript_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('content_sha256', sa.String(length=64), nullable=False),
+    sa.Column('language', sa.String(length=16), nullable=True),
+    sa.Column('transcript', sa.Text(), nullable=False),
+    sa.Column('language_detected', sa.String(length=16), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('hits', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('transcript_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_transcript_cache_content_sha256'), ['content_sha256'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transcript_cache_last_used_at'), ['last_used_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transcript_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transcript_cache_last_used_at'))
+        batch_op.drop_index(batch_op.f('ix_transcript_cache_content_sha256'))
+
+    op.drop_table('transcript_cache')
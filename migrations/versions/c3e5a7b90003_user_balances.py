@@ -0,0 +1,40 @@
+"""user_balances (saldo materializado) + audio_jobs.reserved_seconds
+
+Revision ID: c3e5a7b90003
+Revises: b2d4f6a80002
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e5a7b90003'
+down_revision = 'b2d4f6a80002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_balances',
+    sa.Column('user_id', sa.String(length=255), nullable=False),
+    sa.Column('allowance_seconds', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.Column('used_seconds', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.Column('reserved_seconds', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reserved_seconds', sa.Integer(), nullable=False, server_default='0'))
+
+    # Las filas de user_balances se crean solas en el primer acceso (desde el
+    # historial); `flask credits-reconcile` las reconstruye todas si hace falta.
+
+
+def downgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.drop_column('reserved_seconds')
+
+    op.drop_table('user_balances')
@@ -0,0 +1,26 @@
+"""audio_jobs.audio_s3_key para JOBS_MODE=celery
+
+Revision ID: d4f6b8c00004
+Revises: a1c3e5f70001
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f6b8c00004'
+down_revision = 'a1c3e5f70001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('audio_s3_key', sa.String(length=512), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.drop_column('audio_s3_key')
@@ -0,0 +1,30 @@
+"""índice (user_id, created_at DESC, id DESC) para el historial
+
+Revision ID: e5a7c9d10005
+Revises: c3e5a7b90003
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9d10005'
+down_revision = 'c3e5a7b90003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_audio_jobs_user_id_created_at',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_audio_jobs_user_id_created_at')
@@ -0,0 +1,32 @@
+"""audio_jobs.segments / transcript_cache.segments (tiempos por segmento)
+
+Revision ID: f6b8d0e20006
+Revises: e5a7c9d10005
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b8d0e20006'
+down_revision = 'e5a7c9d10005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('segments', sa.LargeBinary(), nullable=True))
+
+    with op.batch_alter_table('transcript_cache', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('segments', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('transcript_cache', schema=None) as batch_op:
+        batch_op.drop_column('segments')
+
+    with op.batch_alter_table('audio_jobs', schema=None) as batch_op:
+        batch_op.drop_column('segments')
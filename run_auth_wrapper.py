@@ -16,3 +16,9 @@ logging.basicConfig(
 )
 
 app = create_app()
+
+# Pool de PDF/DOCX (app/services/export_pool.py): sólo el servidor web lo
+# pre-arranca; celery, CLI y scripts con create_app() lo crean al primer export
+from app.services import export_pool
+if export_pool.EXPORT_POOL_PREWARM:
+    export_pool.warm()
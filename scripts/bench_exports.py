@@ -0,0 +1,148 @@
+# scripts/bench_exports.py
+"""
+Benchmark de exportación PDF/DOCX: motores actuales (app/services/exporters.py)
+contra los builders anteriores (un Paragraph / doc.add_paragraph por línea,
+copiados abajo como referencia).
+
+Uso:
+    python scripts/bench_exports.py                 # 3 h de transcripción aprox.
+    python scripts/bench_exports.py --lines 5000 --repeat 3
+
+Imprime tiempo, líneas/segundo y tamaño de salida por motor. Además valida
+que el DOCX nuevo abre con python-docx y conserva todas las líneas.
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services import exporters  # noqa: E402
+
+
+# -----------------------------------------------------------------------------
+# Builders anteriores (referencia)
+# -----------------------------------------------------------------------------
+def legacy_docx(transcript: str, summary: str) -> bytes:
+    from docx import Document
+    from docx.shared import Pt, Cm
+
+    doc = Document()
+    section = doc.sections[0]
+    section.left_margin = Cm(2.0)
+    section.right_margin = Cm(2.0)
+    section.top_margin = Cm(2.0)
+    section.bottom_margin = Cm(2.0)
+
+    title = doc.add_paragraph()
+    run = title.add_run("PolyScribe · Resultado")
+    run.bold = True
+    run.font.size = Pt(16)
+    doc.add_paragraph().add_run(datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")).italic = True
+    doc.add_paragraph("")
+
+    h = doc.add_paragraph()
+    rh = h.add_run("Transcripción")
+    rh.bold = True
+    rh.font.size = Pt(13)
+    for line in (transcript or "").splitlines():
+        doc.add_paragraph(line)
+    doc.add_paragraph("")
+
+    h2 = doc.add_paragraph()
+    rh2 = h2.add_run("Resumen")
+    rh2.bold = True
+    rh2.font.size = Pt(13)
+    for line in (summary or "").splitlines():
+        doc.add_paragraph(line)
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def legacy_pdf(transcript: str, summary: str) -> bytes:
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.lib import colors
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4, leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
+    styles = getSampleStyleSheet()
+    title = styles["Title"]
+    title.textColor = colors.HexColor("#0b62e0")
+    story = [
+        Paragraph("PolyScribe · Resultado", title),
+        Spacer(1, 0.3 * cm),
+        Paragraph(datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"), styles["Normal"]),
+        Spacer(1, 0.5 * cm),
+        Paragraph("Transcripción", styles["Heading3"]),
+    ]
+    for line in (transcript or "").splitlines():
+        story.append(Paragraph(line, styles["Normal"]))
+    story.append(Spacer(1, 0.4 * cm))
+    story.append(Paragraph("Resumen", styles["Heading3"]))
+    for line in (summary or "").splitlines():
+        story.append(Paragraph(line, styles["Normal"]))
+    doc.build(story)
+    return buf.getvalue()
+
+
+# -----------------------------------------------------------------------------
+def make_transcript(lines: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    words = (
+        "hola bienvenidos a la reunión de hoy vamos a revisar el presupuesto "
+        "del trimestre y los próximos pasos del proyecto con el equipo de ventas "
+        "y marketing para definir prioridades tareas responsables fechas"
+    ).split()
+    return "\n".join(" ".join(rnd.choice(words) for _ in range(rnd.randint(8, 22))) for _ in range(lines))
+
+
+def bench(name, fn, transcript, summary, lines, repeat):
+    best = None
+    out = b""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(transcript, summary)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    print(f"{name:<12} {best:8.3f} s  {lines / best:>12,.0f} líneas/s  {len(out) / 1024:>9,.0f} KB")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=12000, help="líneas de transcripción (~3 h de audio)")
+    ap.add_argument("--repeat", type=int, default=2)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    transcript = make_transcript(args.lines)
+    summary = make_transcript(40, seed=11)
+    total = args.lines + 40
+    print(f"{total} líneas, {len(transcript) / 1024:,.0f} KB de texto\n")
+
+    new_docx = bench("docx nuevo", exporters.build_docx, transcript, summary, total, args.repeat)
+    if not args.skip_legacy:
+        bench("docx previo", legacy_docx, transcript, summary, total, args.repeat)
+    bench("pdf nuevo", exporters.build_pdf, transcript, summary, total, args.repeat)
+    if not args.skip_legacy:
+        bench("pdf previo", legacy_pdf, transcript, summary, total, args.repeat)
+
+    # El DOCX escrito a mano debe abrir con python-docx y tener todas las líneas
+    from docx import Document
+
+    paras = [p.text for p in Document(io.BytesIO(new_docx)).paragraphs]
+    missing = set(transcript.splitlines()) - set(paras)
+    print(f"\nDOCX válido: {len(paras)} párrafos, líneas faltantes: {len(missing)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# scripts/bench_repetition.py
+"""
+Benchmark del filtro de repeticiones (app/services/repetition.py) sobre
+transcripciones sintéticas con bucles de Whisper.
+
+Cada transcripción se arma con frases aleatorias (palabras de un idioma de
+app/services/langid_corpus.py, sin repeticiones reales) y se le inyectan:
+  - bucles: una frase de 1-15 palabras repetida 5-60 veces, a veces con otra
+    puntuación/mayúsculas y partida por un salto de línea (borde de parte);
+  - alucinaciones: la misma frase larga repetida una frase más adelante, a
+    veces con otras mayúsculas/puntuación.
+
+Reporta tiempo, palabras quitadas, qué parte de lo inyectado se quitó y las
+palabras quitadas por error en el mismo texto sin inyecciones (debe ser ~0).
+Antes comprueba que se conservan frases parecidas con información distinta
+(MUST_KEEP); si alguna se quita, sale con código 1.
+
+Uso:
+    python scripts/bench_repetition.py
+    python scripts/bench_repetition.py --words 20000 100000 400000 --repeat 3
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.langid_corpus import CORPUS  # noqa: E402
+from app.services.repetition import remove_repetitions  # noqa: E402
+
+RE_WORD = re.compile(r"\w+")
+HALLUCINATIONS = [
+    "Subtítulos realizados por la comunidad de Amara.org",
+    "Thank you for watching and please subscribe to the channel",
+    "Merci d'avoir regardé cette vidéo et à bientôt sur la chaîne",
+]
+# Frases parecidas que dicen cosas distintas: no se puede quitar ninguna
+MUST_KEEP = [
+    "Vamos a subir el precio del plan básico este mes. Vamos a bajar el precio del plan básico este mes.",
+    "Mañana mandamos el contrato firmado al cliente de Madrid. "
+    "Mañana mandamos el contrato firmado al cliente de Madrid en serio.",
+    "Después vamos a revisar el presupuesto del año pasado. Vamos a revisar el presupuesto del año que viene.",
+]
+
+
+def make(words_target: int, seed: int):
+    """(texto limpio, texto con bucles, palabras inyectadas)."""
+    rnd = random.Random(seed)
+    vocab = [RE_WORD.findall(text.lower()) for text in CORPUS.values()]
+
+    def sentence() -> str:
+        words = rnd.choice(vocab)
+        return " ".join(rnd.choice(words) for _ in range(rnd.randint(6, 20))).capitalize() + rnd.choice(".?!")
+
+    clean, dirty = [], []
+    injected = count = 0
+    while count < words_target:
+        s = sentence()
+        clean.append(s)
+        dirty.append(s)
+        count += len(s.split())
+        r = rnd.random()
+        if r < 0.03:
+            words = sentence().split()
+            k = rnd.randint(1, 15)
+            i = rnd.randint(0, max(0, len(words) - k))
+            phrase = " ".join(words[i:i + k]).strip(".,?!")
+            copies = rnd.randint(5, 60)
+            reps = []
+            for _ in range(copies):
+                p = phrase
+                if rnd.random() < 0.3:
+                    p = p.capitalize() if rnd.random() < 0.5 else p.lower()
+                reps.append(p + rnd.choice([".", ",", "", "!"]))
+            cut = rnd.randint(1, copies - 1)
+            dirty.append(" ".join(reps[:cut]) + "\n" + " ".join(reps[cut:]))
+            injected += (copies - 1) * len(RE_WORD.findall(phrase))
+        elif r < 0.04:
+            h = rnd.choice(HALLUCINATIONS)
+            dirty.append(h + ".")
+            dirty.append(sentence())
+            dirty.append((h.lower() if rnd.random() < 0.3 else h) + rnd.choice([".", "!", "..."]))
+            injected += len(RE_WORD.findall(h))
+    return " ".join(clean), " ".join(dirty), injected
+
+
+def best_of(fn, text, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(text)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+
+def check_must_keep() -> bool:
+    ok = True
+    for text in MUST_KEEP:
+        _, rep = remove_repetitions(text)
+        passed = rep["duplicate_sentences"] == 0 and rep["words_out"] == rep["words_in"]
+        ok = ok and passed
+        print(f"{'OK' if passed else 'FALLA':>5}  {text}")
+    print()
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--words", type=int, nargs="+", default=[10000, 50000, 200000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    ok = check_must_keep()
+    print(f"{'palabras':>9} {'ms':>8} {'µs/palabra':>11} {'quitadas':>9} {'bucles':>7} {'dup':>5} "
+          f"{'inyectadas':>11} {'cubierto':>9} {'falsos+':>8}")
+    for n in args.words:
+        clean, dirty, injected = make(n, seed=n)
+        t, (_, rep) = best_of(remove_repetitions, dirty, args.repeat)
+        _, rep_clean = remove_repetitions(clean)
+        removed = rep["words_in"] - rep["words_out"]
+        print(
+            f"{rep['words_in']:>9,} {t * 1000:>8.1f} {t * 1e6 / rep['words_in']:>11.2f} {removed:>9,} "
+            f"{rep['loops']:>7} {rep['duplicate_sentences']:>5} {injected:>11,} "
+            f"{min(removed, injected) / max(1, injected):>8.1%} {rep_clean['words_in'] - rep_clean['words_out']:>8,}"
+        )
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
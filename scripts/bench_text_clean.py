@@ -0,0 +1,236 @@
+# scripts/bench_text_clean.py
+"""
+Benchmark de limpieza de texto: clean_transcript / clean_summary actuales
+(app/text_utils.py) contra la implementación anterior (un str.replace por
+comilla/guion, _normalize_spaces dos veces, dos regex de puntuación y el
+buffer de _join_soft_linebreaks concatenado línea a línea; copiada abajo).
+
+Uso:
+    python scripts/bench_text_clean.py                  # ~3 h de transcripción por idioma
+    python scripts/bench_text_clean.py --lines 5000 --repeat 5 --fuzz 50000
+
+Antes de medir comprueba que la salida es idéntica:
+  - en las transcripciones generadas (es/en/fr/de/ru/ar/zh con comillas
+    tipográficas, guiones, CRLF, tabs, NBSP, líneas partidas y viñetas),
+  - en --fuzz textos aleatorios cortos con los casos raros (espacios Unicode,
+    puntuación repetida, líneas vacías),
+  - y con TranscriptCleaner alimentado en trozos aleatorios.
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import text_utils  # noqa: E402
+from app.text_utils import TranscriptCleaner, clean_summary, clean_transcript  # noqa: E402
+
+
+# -----------------------------------------------------------------------------
+# Implementación anterior (referencia)
+# -----------------------------------------------------------------------------
+RE_SPACES = re.compile(r"[ \t\u00A0]+")
+RE_MULTI_NL = re.compile(r"\n{3,}")
+RE_LINE_TRIM = re.compile(r"[ \t\u00A0]+$", re.M)
+RE_BAD_SPACE_BEFORE_PUNCT = re.compile(r"\s+([,;:\.\!\?\)])")
+RE_SPACE_AFTER_PUNCT = re.compile(r"([,;:\.\!\?])([^\s])")
+
+
+def legacy_quotes_and_dashes(s: str) -> str:
+    for k, v in text_utils.SMART_QUOTES.items():
+        if k in s:
+            s = s.replace(k, v)
+    for k, v in text_utils.DASHES.items():
+        if k in s:
+            s = s.replace(k, v)
+    return s
+
+
+def legacy_normalize_spaces(s: str) -> str:
+    s = s.replace("\r\n", "\n").replace("\r", "\n")
+    s = RE_SPACES.sub(" ", s)
+    s = RE_LINE_TRIM.sub("", s)
+    s = RE_MULTI_NL.sub("\n\n", s)
+    return s.strip()
+
+
+def legacy_join_soft_linebreaks(s: str) -> str:
+    lines = s.split("\n")
+    out: List[str] = []
+    buffer = ""
+
+    def is_sentence_end(line: str) -> bool:
+        line = line.rstrip()
+        return bool(line) and line[-1] in ".?!…:"
+
+    for line in lines:
+        if not buffer:
+            buffer = line
+            continue
+        if buffer.strip() == "":
+            out.append(buffer)
+            buffer = line
+            continue
+        stripped = line.lstrip()
+        if (not is_sentence_end(buffer)) and stripped[:1].islower():
+            buffer = (buffer.rstrip() + " " + stripped)
+        else:
+            out.append(buffer)
+            buffer = line
+    if buffer:
+        out.append(buffer)
+    return "\n".join(out)
+
+
+def legacy_tidy_punctuation_spaces(s: str) -> str:
+    s = RE_BAD_SPACE_BEFORE_PUNCT.sub(r"\1", s)
+    s = RE_SPACE_AFTER_PUNCT.sub(r"\1 \2", s)
+    return s
+
+
+def legacy_clean_transcript(text: str, lang: str = "") -> str:
+    if not text:
+        return ""
+    s = legacy_quotes_and_dashes(text)
+    s = legacy_normalize_spaces(s)
+    s = legacy_join_soft_linebreaks(s)
+    s = legacy_tidy_punctuation_spaces(s)
+    s = legacy_normalize_spaces(s)
+    return s
+
+
+def legacy_clean_summary(text: str, lang: str = "") -> str:
+    # _bulletize_if_paragraph / _normalize_bullets no cambiaron
+    if not text:
+        return ""
+    s = legacy_quotes_and_dashes(text)
+    s = legacy_normalize_spaces(s)
+    s = text_utils._bulletize_if_paragraph(s, lang=lang)
+    s = text_utils._normalize_bullets(s)
+    s = legacy_tidy_punctuation_spaces(s)
+    s = legacy_normalize_spaces(s)
+    return s
+
+
+# -----------------------------------------------------------------------------
+WORDS = {
+    "es": "hola bienvenidos a la reunión de hoy vamos a revisar el presupuesto del trimestre y los próximos pasos con el equipo",
+    "en": "welcome everyone today we will review the quarterly budget and the next steps for the sales and marketing team",
+    "fr": "bonjour à tous aujourd'hui nous allons revoir le budget du trimestre et les prochaines étapes avec l'équipe",
+    "de": "willkommen heute besprechen wir das Budget des Quartals und die nächsten Schritte mit dem Vertriebsteam",
+    "ru": "добро пожаловать сегодня мы обсудим бюджет квартала и следующие шаги вместе с командой продаж",
+    "ar": "مرحبا بكم اليوم سنراجع ميزانية الربع والخطوات التالية مع فريق المبيعات والتسويق",
+    "zh": "大家好 今天 我们 讨论 本季度 预算 以及 销售 团队 的 下一步 计划",
+}
+DECOR = ["“", "”", "«", "»", "‘", "’", "–", "—", "−", ",", ".", "?", "!", "…", ":", ";", " ,", " .", "\t", "\u00a0", "  "]
+FUZZ_ALPHABET = list("aAbZéñ \n\n\t\r,;:.!?)…-–—“”«»‘’•*·\"'0x") + [
+    "\r\n", "  ", "\n \n", ". ", " ,", "\u00a0", "\u2003", "\u2028", "\x1c", "\x85", "- ",
+]
+
+
+def make_transcript(lang: str, lines: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    words = WORDS[lang].split()
+    nl = "\r\n" if lang in ("fr", "ar") else "\n"
+    out = []
+    for _ in range(lines):
+        parts = []
+        for _ in range(rnd.randint(6, 20)):
+            w = rnd.choice(words)
+            if rnd.random() < 0.08:
+                w = w.capitalize()
+            if rnd.random() < 0.12:
+                w += rnd.choice(DECOR)
+            parts.append(w)
+        line = " ".join(parts)
+        if rnd.random() < 0.4:
+            line += rnd.choice(".?!…")
+        if rnd.random() < 0.05:
+            line += "\n"  # línea vacía (párrafo)
+        out.append(line)
+    return nl.join(out)
+
+
+def make_summary(lang: str, seed: int = 11) -> str:
+    rnd = random.Random(seed)
+    words = WORDS[lang].split()
+    bullets = ["• ", "- ", "* ", "— ", ""]
+    return "\n".join(
+        rnd.choice(bullets) + " ".join(rnd.choice(words) for _ in range(rnd.randint(5, 14))) + rnd.choice(".;")
+        for _ in range(12)
+    )
+
+
+def chunked(text: str, rnd: random.Random, n: int) -> List[str]:
+    cuts = sorted(rnd.sample(range(len(text) + 1), min(n, len(text) + 1)))
+    out, prev = [], 0
+    for k in cuts + [len(text)]:
+        out.append(text[prev:k])
+        prev = k
+    return out
+
+
+def incremental(parts: List[str]) -> str:
+    c = TranscriptCleaner()
+    return "".join(c.feed(p) for p in parts) + c.finish()
+
+
+def check(name: str, got: str, want: str) -> None:
+    if got != want:
+        i = next((k for k, (a, b) in enumerate(zip(got, want)) if a != b), min(len(got), len(want)))
+        raise SystemExit(f"DIFERENCIA en {name} (pos {i}): {want[i - 20:i + 20]!r} != {got[i - 20:i + 20]!r}")
+
+
+def best_of(fn, text: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=12000, help="líneas por idioma (~3 h de audio)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--fuzz", type=int, default=20000, help="textos aleatorios para comparar salidas")
+    args = ap.parse_args()
+
+    rnd = random.Random(3)
+    for i in range(args.fuzz):
+        s = "".join(rnd.choice(FUZZ_ALPHABET) for _ in range(rnd.randint(0, 40)))
+        want = legacy_clean_transcript(s)
+        check(f"fuzz #{i} transcript", clean_transcript(s), want)
+        check(f"fuzz #{i} incremental", incremental(chunked(s, rnd, rnd.randint(0, 6))), want)
+        check(f"fuzz #{i} summary", clean_summary(s), legacy_clean_summary(s))
+    print(f"fuzz: {args.fuzz} textos idénticos\n")
+
+    print(f"{'idioma':<7} {'KB':>7} {'anterior':>10} {'actual':>10} {'x':>6} {'incremental':>12}   resumen (anterior/actual)")
+    for lang in WORDS:
+        transcript = make_transcript(lang, args.lines)
+        summary = make_summary(lang)
+        want = legacy_clean_transcript(transcript)
+        check(f"{lang} transcript", clean_transcript(transcript), want)
+        check(f"{lang} incremental", incremental(chunked(transcript, rnd, max(1, args.lines // 100))), want)
+        check(f"{lang} summary", clean_summary(summary), legacy_clean_summary(summary))
+
+        t_old = best_of(legacy_clean_transcript, transcript, args.repeat)
+        t_new = best_of(clean_transcript, transcript, args.repeat)
+        parts = chunked(transcript, rnd, max(1, args.lines // 100))
+        t_inc = best_of(lambda _t: incremental(parts), transcript, args.repeat)
+        s_old = best_of(legacy_clean_summary, summary, args.repeat * 20)
+        s_new = best_of(clean_summary, summary, args.repeat * 20)
+        print(
+            f"{lang:<7} {len(transcript.encode('utf-8')) / 1024:>7,.0f} {t_old * 1000:>8.1f}ms {t_new * 1000:>8.1f}ms "
+            f"{t_old / t_new:>5.1f}x {t_inc * 1000:>10.1f}ms   {s_old * 1e6:,.0f}/{s_new * 1e6:,.0f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
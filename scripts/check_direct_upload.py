@@ -0,0 +1,82 @@
+# scripts/check_direct_upload.py
+"""
+Prueba de app/services/upload_sessions.py contra un S3 local (MinIO, moto
+server) o uno real, haciendo lo mismo que el navegador: pide las URLs
+prefirmadas, sube cada parte con un PUT HTTP plano (sin credenciales),
+completa y compara el sha256 del objeto final. También comprueba que una
+subida con una parte faltante se rechaza (UploadIncomplete) y se aborta.
+
+Uso (MinIO local):
+    docker run -p 9000:9000 -e MINIO_ROOT_USER=minio -e MINIO_ROOT_PASSWORD=minio123 minio/minio server /data
+    AWS_ACCESS_KEY_ID=minio AWS_SECRET_ACCESS_KEY=minio123 S3_ENDPOINT_URL=http://localhost:9000 \\
+        python scripts/check_direct_upload.py --bucket pruebas --mb 30
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.celery_app import _s3_client  # noqa: E402
+from app.services import upload_sessions  # noqa: E402
+
+
+def _put(url, data):
+    req = urllib.request.Request(url, data=data, method="PUT")
+    with urllib.request.urlopen(req) as res:
+        return res.headers.get("ETag") or ""
+
+
+def _upload(client, bucket, key, payload, skip_part=None):
+    plan = upload_sessions.start(client, bucket, key, len(payload), "application/octet-stream")
+    size = plan["part_size"]
+    done = []
+    for p in plan["parts"]:
+        if p["part_number"] == skip_part:
+            continue
+        start = (p["part_number"] - 1) * size
+        done.append({"part_number": p["part_number"], "etag": _put(p["url"], payload[start:start + size])})
+    return plan, done
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bucket", default=os.getenv("S3_BUCKET", "pruebas"))
+    ap.add_argument("--mb", type=int, default=30)
+    args = ap.parse_args()
+
+    client = _s3_client()
+    try:
+        client.head_bucket(Bucket=args.bucket)
+    except Exception:
+        client.create_bucket(Bucket=args.bucket)
+
+    payload = os.urandom(args.mb * 1024 * 1024 + 12345)  # última parte corta
+    key = f"check_direct_upload/{int(time.time())}.bin"
+
+    t0 = time.perf_counter()
+    plan, done = _upload(client, args.bucket, key, payload)
+    upload_sessions.complete(client, args.bucket, key, plan["upload_id"], len(payload), done)
+    dt = time.perf_counter() - t0
+    got = client.get_object(Bucket=args.bucket, Key=key)["Body"].read()
+    ok = hashlib.sha256(got).hexdigest() == hashlib.sha256(payload).hexdigest()
+    client.delete_object(Bucket=args.bucket, Key=key)
+    print(f"{len(plan['parts'])} partes, {len(payload) / 1048576:.1f} MB en {dt:.2f}s, sha256 {'OK' if ok else 'DISTINTO'}")
+
+    plan, done = _upload(client, args.bucket, key + ".incompleto", payload, skip_part=2)
+    try:
+        upload_sessions.complete(client, args.bucket, key + ".incompleto", plan["upload_id"], len(payload), done)
+        rejected = False
+    except upload_sessions.UploadIncomplete as e:
+        rejected = True
+        print(f"subida incompleta rechazada: {e}")
+    upload_sessions.abort(client, args.bucket, key + ".incompleto", plan["upload_id"])
+
+    sys.exit(0 if ok and rejected else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# scripts/check_s3_download.py
+"""
+Prueba de app/services/s3_download.py contra un S3 local (MinIO, moto server)
+o uno real: sube un objeto aleatorio, lo baja con GETs por rango en paralelo,
+compara el sha256 y muestra cuánto creció el RSS máximo del proceso.
+
+Uso (MinIO local):
+    docker run -p 9000:9000 -e MINIO_ROOT_USER=minio -e MINIO_ROOT_PASSWORD=minio123 minio/minio server /data
+    AWS_ACCESS_KEY_ID=minio AWS_SECRET_ACCESS_KEY=minio123 S3_ENDPOINT_URL=http://localhost:9000 \\
+        python scripts/check_s3_download.py --bucket pruebas --mb 200
+
+Con --flaky se simulan cortes (IncompleteRead) a mitad de algunas partes
+para comprobar que se reanuda desde el último byte escrito. Después se baja
+otra vez con S3_DOWNLOAD_CONCURRENCY=1 y varias partes (el camino sin hilos).
+"""
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import resource
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.celery_app import _s3_client  # noqa: E402
+from app.services import s3_download  # noqa: E402
+
+
+class _FlakyBody:
+    """Cuerpo que se corta después de 'limit' bytes (como un IncompleteRead)."""
+
+    def __init__(self, body, limit):
+        self._body, self._left = body, limit
+
+    def read(self, n=-1):
+        if self._left <= 0:
+            from botocore.exceptions import IncompleteReadError
+
+            raise IncompleteReadError(actual_bytes=0, expected_bytes=n)
+        chunk = self._body.read(min(n, self._left) if n and n > 0 else self._left)
+        self._left -= len(chunk)
+        return chunk
+
+    def close(self):
+        self._body.close()
+
+
+class _FlakyClient:
+    def __init__(self, client, rate):
+        self._client, self._rate, self._rnd = client, rate, random.Random(7)
+
+    def head_object(self, **kw):
+        return self._client.head_object(**kw)
+
+    def get_object(self, **kw):
+        resp = self._client.get_object(**kw)
+        if self._rnd.random() < self._rate:
+            resp["Body"] = _FlakyBody(resp["Body"], int(resp["ContentLength"]) // 2)
+        return resp
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bucket", default=os.getenv("S3_BUCKET", "pruebas"))
+    ap.add_argument("--mb", type=int, default=100)
+    ap.add_argument("--flaky", type=float, default=0.0, help="fracción de GETs que se cortan a la mitad")
+    args = ap.parse_args()
+
+    client = _s3_client()
+    try:
+        client.head_bucket(Bucket=args.bucket)
+    except Exception:
+        client.create_bucket(Bucket=args.bucket)
+
+    key = f"check_s3_download/{int(time.time())}.bin"
+    src = os.path.join(s3_download.S3_DOWNLOAD_DIR or "/tmp", "check_s3_download.src")
+    h = hashlib.sha256()
+    with open(src, "wb") as f:
+        for _ in range(args.mb):
+            block = os.urandom(1 << 20)
+            h.update(block)
+            f.write(block)
+    client.upload_file(src, args.bucket, key)
+    os.remove(src)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    source = _FlakyClient(client, args.flaky) if args.flaky else client
+    with s3_download.downloaded(source, args.bucket, key) as path:
+        dt = time.perf_counter() - t0
+        ok = _sha256_file(path) == h.hexdigest()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"{args.mb} MB en {dt:.2f}s ({args.mb / dt:.0f} MB/s), sha256 {'OK' if ok else 'DISTINTO'}")
+    print(f"RSS máximo +{(rss_after - rss_before) / 1024:.1f} MB (partes de {s3_download.S3_DOWNLOAD_PART_MB} MB, "
+          f"{s3_download.S3_DOWNLOAD_CONCURRENCY} hilos)")
+
+    # Un solo hilo con varias partes: tienen que bajarse todas, en orden
+    s3_download.S3_DOWNLOAD_CONCURRENCY = 1
+    s3_download.S3_DOWNLOAD_PART_MB = max(1, args.mb // 4)
+    with s3_download.downloaded(source, args.bucket, key) as path:
+        ok_serial = _sha256_file(path) == h.hexdigest()
+    client.delete_object(Bucket=args.bucket, Key=key)
+
+    print(f"1 hilo, partes de {s3_download.S3_DOWNLOAD_PART_MB} MB: sha256 {'OK' if ok_serial else 'DISTINTO'}")
+    sys.exit(0 if ok and ok_serial else 1)
+
+
+if __name__ == "__main__":
+    main()